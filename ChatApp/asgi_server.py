@@ -0,0 +1,67 @@
+"""asyncio 서버 모드 (python-socketio AsyncServer + ASGI).
+
+SERVER_MODE=asyncio 로 실행하면 threading 모드 대신 이 서버가 뜹니다.
+웹소켓은 이벤트 루프 하나가 들고 있고, 핸들러 코루틴은 SQLite/Gemini 를 건드리는
+기존 동기 핸들러(EVENTS)를 스레드 풀에서 실행하므로 명령어 세트는 그대로입니다.
+HTTP 라우트(/, /upload, /uploads)는 같은 Flask 앱을 WSGI->ASGI 로 감싸서 같은 스레드 풀에서 실행합니다.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import socketio
+import uvicorn
+
+import transport
+from wsgi_asgi import wsgi_to_asgi
+
+
+def _host_url(environ):
+    scheme = environ.get('wsgi.url_scheme', 'http')
+    host = environ.get('HTTP_HOST') or f"{environ.get('SERVER_NAME', 'localhost')}:{environ.get('SERVER_PORT', '80')}"
+    return f"{scheme}://{host}/"
+
+
+def create_app(flask_app, events, workers=32):
+    sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='chat')
+    state = {'loop': None}
+
+    def emit(event, data, room=None, to=None):
+        """어느 스레드에서 불러도 이벤트 루프에서 전송되도록 넘깁니다."""
+        loop = state['loop']
+        if loop is None or loop.is_closed(): return
+        coro = sio.emit(event, data, room=room, to=to)
+        try: running = asyncio.get_running_loop()
+        except RuntimeError: running = None
+        if running is loop: loop.create_task(coro)
+        else: asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def membership(method):
+        """sio.enter_room / leave_room 을 이벤트 루프에서 실행하고 끝날 때까지 기다립니다 (핸들러 스레드용)."""
+        return lambda sid, room: asyncio.run_coroutine_threadsafe(method(sid, room), state['loop']).result(5)
+
+    transport.use(lambda ev, d, room: emit(ev, d, room=room),
+                  room_size=lambda room: len(sio.manager.rooms.get('/', {}).get(room, ())),
+                  enter=membership(sio.enter_room), leave=membership(sio.leave_room))
+
+    async def on_startup():
+        state['loop'] = asyncio.get_running_loop()
+
+    @sio.event
+    async def connect(sid, environ, auth=None):
+        await sio.save_session(sid, {'host_url': _host_url(environ)})
+
+    def register(name, fn):
+        async def handler(sid, data=None, *args):
+            host_url = (await sio.get_session(sid)).get('host_url', '/')
+            reply = lambda ev, d: emit(ev, d, to=sid)
+            # DB/Gemini 등 블로킹 작업은 이벤트 루프 밖 스레드 풀에서
+            await asyncio.get_running_loop().run_in_executor(pool, fn, sid, data, reply, host_url)
+        sio.on(name, handler)
+
+    for name, fn in events.items(): register(name, fn)
+    return socketio.ASGIApp(sio, other_asgi_app=wsgi_to_asgi(flask_app, pool), on_startup=on_startup)
+
+
+def run(flask_app, events, host='0.0.0.0', port=5001):
+    uvicorn.run(create_app(flask_app, events), host=host, port=port, log_level='warning')
@@ -0,0 +1,153 @@
+"""다중 워커용 pub/sub 백플레인 + 리더 선출.
+
+워커 여러 개가 같은 방/시세/뇌절 상태를 보도록 메시지를 주고받는 통로입니다.
+- LocalBackplane : 같은 프로세스 안에서만 동작하는 대역 (단일 워커/테스트용, 기본값)
+- RedisBackplane : redis pub/sub + 키/해시 + 만료 락 (BACKPLANE_URL=redis://...)
+둘 다 publish/subscribe, hset/hdel/hgetall, incr, acquire/release 를 같은 모양으로 제공합니다.
+"""
+import json, threading, time
+from collections import defaultdict
+
+
+class LocalBackplane:
+    def __init__(self):
+        self._subs = defaultdict(list)
+        self._hashes = defaultdict(dict)
+        self._counters = {}
+        self._leases = {}  # 이름 -> (소유자, 만료 시각)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, msg):
+        for fn in list(self._subs[channel]): fn(msg)
+
+    def subscribe(self, channel, fn):
+        self._subs[channel].append(fn)
+
+    def hset(self, name, key, value):
+        with self._lock: self._hashes[name][key] = value
+
+    def hsetnx(self, name, key, value):
+        """없을 때만 넣고 True, 이미 있으면 False."""
+        with self._lock:
+            if key in self._hashes[name]: return False
+            self._hashes[name][key] = value
+            return True
+
+    def hdel(self, name, key):
+        with self._lock: self._hashes[name].pop(key, None)
+
+    def hgetall(self, name):
+        with self._lock: return dict(self._hashes[name])
+
+    def incr(self, name, floor=0):
+        """워커 간 공유 카운터를 올린 값 (floor 보다 항상 큼)."""
+        with self._lock:
+            v = self._counters[name] = max(self._counters.get(name, 0), floor) + 1
+            return v
+
+    def acquire(self, name, owner, ttl_s):
+        """만료 락. 비어 있거나 만료됐거나 내 것이면 (연장하고) True."""
+        now = time.monotonic()
+        with self._lock:
+            cur = self._leases.get(name)
+            if cur and cur[0] != owner and cur[1] > now: return False
+            self._leases[name] = (owner, now + ttl_s)
+            return True
+
+    def release(self, name, owner):
+        with self._lock:
+            if self._leases.get(name, (None,))[0] == owner: del self._leases[name]
+
+    def close(self):
+        pass
+
+
+# 내 락이면 연장, 아니면 비어 있을 때만 획득
+_ACQUIRE_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) end
+if redis.call('set', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then return 1 end
+return 0
+"""
+# floor 보다 작으면 floor 부터 (Redis 가 비워져도 DB 에 있는 id 와 겹치지 않게)
+_INCR_LUA = """
+local v = math.max(tonumber(redis.call('get', KEYS[1]) or '0'), tonumber(ARGV[1])) + 1
+redis.call('set', KEYS[1], v)
+return v
+"""
+_RELEASE_LUA = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+
+class RedisBackplane:
+    def __init__(self, url, prefix="empire:"):
+        import redis  # 다중 워커 모드에서만 필요
+        self.r = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self._pubsub = self.r.pubsub(ignore_subscribe_messages=True)
+        self._thread = None
+        self._acquire = self.r.register_script(_ACQUIRE_LUA)
+        self._release = self.r.register_script(_RELEASE_LUA)
+        self._incr = self.r.register_script(_INCR_LUA)
+
+    def publish(self, channel, msg):
+        self.r.publish(self.prefix + channel, json.dumps(msg, ensure_ascii=False))
+
+    def subscribe(self, channel, fn):
+        self._pubsub.subscribe(**{self.prefix + channel: lambda m: fn(json.loads(m["data"]))})
+        if self._thread is None:
+            self._thread = self._pubsub.run_in_thread(sleep_time=0.01, daemon=True)
+
+    def hset(self, name, key, value):
+        self.r.hset(self.prefix + name, key, json.dumps(value))
+
+    def hsetnx(self, name, key, value):
+        return bool(self.r.hsetnx(self.prefix + name, key, json.dumps(value)))
+
+    def hdel(self, name, key):
+        self.r.hdel(self.prefix + name, key)
+
+    def hgetall(self, name):
+        return {k: json.loads(v) for k, v in self.r.hgetall(self.prefix + name).items()}
+
+    def incr(self, name, floor=0):
+        return int(self._incr(keys=[self.prefix + name], args=[int(floor)]))
+
+    def acquire(self, name, owner, ttl_s):
+        return bool(self._acquire(keys=[self.prefix + name], args=[owner, int(ttl_s * 1000)]))
+
+    def release(self, name, owner):
+        self._release(keys=[self.prefix + name], args=[owner])
+
+    def close(self):
+        if self._thread: self._thread.stop()
+
+
+def connect(url):
+    """BACKPLANE_URL 로 백플레인 생성 (없거나 'local' 이면 프로세스 내 대역)."""
+    if not url or url == "local": return LocalBackplane()
+    return RedisBackplane(url)
+
+
+class Leader:
+    """만료 락을 주기적으로 연장하며 리더 여부를 유지합니다. 리더가 죽으면 ttl 뒤 다른 워커가 이어받습니다."""
+
+    def __init__(self, backplane, name, owner, ttl_s=10.0):
+        self.bp = backplane
+        self.name = name
+        self.owner = owner
+        self.ttl_s = ttl_s
+        self.is_leader = backplane.acquire(name, owner, ttl_s)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="leader", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.ttl_s / 3):
+            try: self.is_leader = self.bp.acquire(self.name, self.owner, self.ttl_s)
+            except Exception as e:
+                self.is_leader = False
+                print(f"Leader Error: {e}")
+
+    def close(self):
+        self._stop.set()
+        if self.is_leader: self.bp.release(self.name, self.owner)
+        self.is_leader = False
@@ -0,0 +1,274 @@
+"""채팅 서버 부하 테스트.
+
+임시 폴더에 서버를 새 DB 로 띄우고 (Gemini 는 GEMINI_FAKE=1 로컬 가짜 모델),
+가상 Socket.IO 클라이언트 N 명이 join / 일반 채팅 / 경제 명령어 / !무한뇌절 / !gemini /
+파일 업로드+다운로드를 섞어서 보내며, 요청마다 응답이 돌아올 때까지의 지연을 잽니다.
+결과: 동작별 처리량, p50/p95/p99 지연(ms), 타임아웃, 서버 로그의 DB lock 오류 수.
+
+    python bench.py --clients 20 --duration 30
+    python bench.py --clients 20 --save before      # bench_baselines/before.json 으로 저장
+    python bench.py --clients 20 --compare before   # 저장된 기준과 비교
+    python bench.py --cold-start 10                 # 서버를 10번 새로 띄워 시작 시간 측정 (serving 이 예산 초과면 종료 코드 1)
+"""
+import argparse, glob, hashlib, json, os, random, shutil, socket, subprocess, sys, tempfile, threading, time
+
+import requests
+import socketio
+
+from outbox import decode
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(HERE, "bench_baselines")
+TIMEOUT_S = 5.0
+
+# 동작: (가중치, 보낼 메시지 또는 None(HTTP), 응답 판별 함수(내 닉네임, 이벤트, 데이터))
+def _mine(nick, ev, d):
+    return ev == "message" and d.get("nickname") == nick
+
+def _system(prefix, mine=False):
+    """mine: 방 전체로 가는 응답이라 다른 클라이언트가 보낸 같은 명령의 응답과 닉네임으로 구분해야 함."""
+    return lambda nick, ev, d: (ev == "message" and d.get("type") == "system" and d.get("msg", "").startswith(prefix)
+                                and (not mine or d.get("nickname") == nick))
+
+ACTIONS = {
+    "chat":     (40, lambda: f"안녕 {random.randint(0, 10**6)}", _mine),
+    "!잔액":     (10, lambda: "!잔액", _system("💰")),
+    "!랭킹":     (8, lambda: "!랭킹", _system("🏆", mine=True)),
+    "!저금":     (6, lambda: "!저금 100", _system("🏦")),
+    "!매수":     (6, lambda: "!매수 비트코인 100", _system("🪙")),
+    "!가위바위보": (6, lambda: f"!가위바위보 {random.choice(['가위', '바위', '보'])} 10", _system("🎮")),
+    "!무한뇌절":   (2, lambda: "!무한뇌절", lambda nick, ev, d: ev == "message" and d.get("type") == "noejul" and nick in d.get("nicks", ())),
+    "!gemini":  (2, lambda: f"!gemini 질문 {random.randint(0, 999)}", lambda nick, ev, d: ev == "bot_stream" and d.get("nickname") == nick and d.get("done")),
+    "upload":   (3, None, None),
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(xs, p):
+    if not xs: return None
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100 * (len(xs) - 1))))]
+
+
+class Server:
+    """ChatApp 사본을 임시 폴더에서 실행 (실제 DB/업로드 폴더는 건드리지 않음)."""
+
+    def __init__(self, mode, env=None, wait=True):
+        self.dir = tempfile.mkdtemp(prefix="chatbench_")
+        for f in glob.glob(os.path.join(HERE, "*.py")): shutil.copy(f, self.dir)
+        shutil.copytree(os.path.join(HERE, "templates"), os.path.join(self.dir, "templates"))
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        main = glob.glob(os.path.join(self.dir, "《*.py"))[0]
+        self.log_path = os.path.join(self.dir, "server.log")
+        env = dict(os.environ, GEMINI_FAKE="1", GEMINI_API_KEY="", FLASK_DEBUG="0", PORT=str(self.port), SERVER_MODE=mode, **(env or {}))
+        self.log = open(self.log_path, "w")
+        self.t0 = time.perf_counter()
+        self.proc = subprocess.Popen([sys.executable, main], cwd=self.dir, env=env, stdout=self.log, stderr=subprocess.STDOUT)
+        if wait: self.wait_ready()
+
+    def wait_ready(self):
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            try:
+                if requests.get(self.url + "/", timeout=1).status_code == 200: return
+            except requests.RequestException: time.sleep(0.2)
+        self.stop(); raise RuntimeError(f"서버가 뜨지 않았습니다: {self.log_path}")
+
+    def lock_errors(self):
+        with open(self.log_path, encoding="utf-8", errors="replace") as f:
+            return sum("database is locked" in line or "database is busy" in line for line in f)
+
+    def stop(self):
+        self.proc.terminate()
+        try: self.proc.wait(10)
+        except subprocess.TimeoutExpired: self.proc.kill()
+        self.log.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+class Client:
+    def __init__(self, url, nick):
+        self.url, self.nick = url, nick
+        self.sio = socketio.Client(reconnection=False)
+        self.http = requests.Session()
+        self._waiter = None  # (판별 함수, threading.Event)
+        self._lock = threading.Lock()
+        self.sio.on("*", self._on_event)
+        self.sio.on("batch", lambda frame: [self._on_event(ev, d) for ev, d in decode(frame)])
+
+    def _on_event(self, ev, d=None):
+        with self._lock: w = self._waiter
+        if w and isinstance(d, dict) and w[0](self.nick, ev, d): w[1].set()
+
+    def request(self, send, match):
+        """send() 후 match 가 참인 이벤트가 올 때까지의 지연(초), 시간 초과면 None."""
+        done = threading.Event()
+        with self._lock: self._waiter = (match, done)
+        t0 = time.perf_counter()
+        send()
+        ok = done.wait(TIMEOUT_S)
+        with self._lock: self._waiter = None
+        return time.perf_counter() - t0 if ok else None
+
+    def join(self):
+        t0 = time.perf_counter()
+        history = threading.Event()
+        self.sio.on("history", lambda h: history.set())
+        self.sio.connect(self.url, transports=["websocket"])
+        self.sio.emit("join", {"nickname": self.nick})
+        return time.perf_counter() - t0 if history.wait(TIMEOUT_S) else None
+
+    def say(self, msg, match):
+        return self.request(lambda: self.sio.emit("send_msg", {"nickname": self.nick, "msg": msg}), match)
+
+    def upload_download(self):
+        """(업로드 지연, 다운로드 지연) - 업로드 응답은 204 이므로 저장 이름은 내용 해시로 계산."""
+        data = os.urandom(random.randint(1, 64) * 1024)
+        t0 = time.perf_counter()
+        r = self.http.post(self.url + "/upload", data={"nickname": self.nick}, files={"file": ("bench.bin", data)}, timeout=TIMEOUT_S * 4)
+        up = time.perf_counter() - t0 if r.status_code == 204 else None
+        t0 = time.perf_counter()
+        r = self.http.get(f"{self.url}/uploads/{hashlib.sha256(data).hexdigest()}.bin", timeout=TIMEOUT_S * 4)
+        down = time.perf_counter() - t0 if r.status_code == 200 and r.content == data else None
+        return up, down
+
+    def close(self):
+        try: self.sio.disconnect()
+        except Exception: pass
+
+
+def run(url, clients, duration, think_ms, mix):
+    lat = {}     # 동작 -> [지연(초)]
+    fails = {}   # 동작 -> 타임아웃/오류 수
+    lock = threading.Lock()
+    names = list(mix); weights = [mix[n] for n in names]
+
+    def record(name, dt):
+        with lock:
+            if dt is None: fails[name] = fails.get(name, 0) + 1
+            else: lat.setdefault(name, []).append(dt)
+
+    def worker(i):
+        c = Client(url, f"bench{i:04d}")
+        try: record("join", c.join())
+        except Exception:
+            record("join", None); return
+        end = time.time() + duration
+        try:
+            while time.time() < end:
+                name = random.choices(names, weights)[0]
+                if name == "upload":
+                    up, down = c.upload_download()
+                    record("upload", up); record("download", down)
+                else:
+                    _, make, match = ACTIONS[name]
+                    record(name, c.say(make(), match))
+                    if name == "!무한뇌절": c.sio.emit("send_msg", {"nickname": c.nick, "msg": "!뇌절중단"})
+                if think_ms: time.sleep(random.uniform(0, 2 * think_ms) / 1000)
+        except Exception as e:
+            print(f"client {i}: {e}")
+        finally: c.close()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(clients)]
+    t0 = time.time()
+    for t in threads: t.start()
+    for t in threads: t.join(duration + 60)
+    elapsed = time.time() - t0
+    report = {}
+    for name in sorted(set(lat) | set(fails)):
+        xs = lat.get(name, [])
+        report[name] = {"count": len(xs), "fail": fails.get(name, 0), "rps": round(len(xs) / elapsed, 2),
+                        **{f"p{p}": round(percentile(xs, p) * 1000, 1) if xs else None for p in (50, 95, 99)}}
+    return report, elapsed
+
+
+def cold_start(runs, mode, budget_ms):
+    """서버를 runs 번 새로 띄워 프로세스 시작부터 각 단계까지의 시간(ms)을 잽니다.
+    listen: 포트가 접속을 받음 / page: 첫 '/' 응답 / join: 첫 join 의 history (DB 준비 포함)
+    ready: 서버 로그의 '시작 준비' (모듈 import ~ create_app, 인터프리터 시작 제외)
+    serving: 서버 로그의 '요청 처리 준비' (모듈 import ~ init_core 끝) - 예산은 이 값으로 판정"""
+    times = {"listen": [], "page": [], "join": [], "ready": [], "serving": []}
+    for i in range(runs):
+        server = Server(mode, wait=False)
+        try:
+            while True:
+                if server.proc.poll() is not None: raise RuntimeError(f"서버가 종료되었습니다: {server.log_path}")
+                try:
+                    socket.create_connection(("127.0.0.1", server.port), timeout=1).close(); break
+                except OSError: time.sleep(0.002)
+            times["listen"].append(time.perf_counter() - server.t0)
+            requests.get(server.url + "/", timeout=TIMEOUT_S).raise_for_status()
+            times["page"].append(time.perf_counter() - server.t0)
+            c = Client(server.url, f"cold{i}")
+            if c.join() is not None: times["join"].append(time.perf_counter() - server.t0)
+            c.close()
+            with open(server.log_path, encoding="utf-8", errors="replace") as f: log = f.read()
+            for name, label in (("ready", "시작 준비 "), ("serving", "요청 처리 준비 ")):
+                found = [line.split(label)[1].split("ms")[0] for line in log.splitlines() if label in line]
+                if found: times[name].append(float(found[0]) / 1000)
+        finally: server.stop()
+    print(f"{'단계':<8}{'p50ms':>9}{'최대ms':>9}   ({runs}회, {mode})")
+    for name, xs in times.items():
+        print(f"{name:<8}{percentile(xs, 50) * 1000 if xs else float('nan'):>9.0f}{max(xs) * 1000 if xs else float('nan'):>9.0f}")
+    serving = percentile(times["serving"], 50)
+    ok = serving is not None and serving * 1000 <= budget_ms
+    print(f"요청 처리 준비(serving) p50 {serving * 1000 if serving else float('nan'):.0f}ms / 예산 {budget_ms:.0f}ms -> {'통과' if ok else '초과'}")
+    return ok
+
+
+def print_report(report, base=None):
+    print(f"{'동작':<12}{'성공':>8}{'실패':>6}{'ops/s':>9}{'p50ms':>9}{'p95ms':>9}{'p99ms':>9}")
+    for name, r in report["actions"].items():
+        line = f"{name:<12}{r['count']:>8}{r['fail']:>6}{r['rps']:>9}" + "".join(f"{r[p] if r[p] is not None else '-':>9}" for p in ("p50", "p95", "p99"))
+        b = (base or {}).get("actions", {}).get(name)
+        if b and b["p95"] and r["p95"]:
+            line += f"   p95 {(r['p95'] / b['p95'] - 1) * 100:+.0f}%  ops/s {(r['rps'] / b['rps'] - 1) * 100 if b['rps'] else 0:+.0f}%"
+        print(line)
+    print(f"총 처리량: {report['total_rps']} ops/s, DB lock 오류: {report['lock_errors']}"
+          + (f" (기준 {base['total_rps']} ops/s, {base['lock_errors']}회)" if base else ""))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--clients", type=int, default=20)
+    ap.add_argument("--duration", type=float, default=30, help="초")
+    ap.add_argument("--think-ms", type=float, default=100, help="클라이언트별 요청 사이 평균 대기")
+    ap.add_argument("--mode", choices=["threading", "asyncio"], default="threading")
+    ap.add_argument("--rate-limit", action="store_true", help="서버 속도 제한을 켠 채로 측정 (기본은 끔)")
+    ap.add_argument("--url", help="이미 떠 있는 서버에 붙기 (이 경우 DB lock 오류는 세지 않음)")
+    ap.add_argument("--only", help="쉼표로 구분한 동작만 (예: chat,!잔액)")
+    ap.add_argument("--save", metavar="NAME", help="결과를 기준으로 저장")
+    ap.add_argument("--compare", metavar="NAME", help="저장된 기준과 비교")
+    ap.add_argument("--cold-start", type=int, metavar="RUNS", help="부하 테스트 대신 서버 시작 시간을 RUNS 번 측정")
+    ap.add_argument("--budget-ms", type=float, default=800, help="--cold-start 예산 (서버의 COLD_START_BUDGET_MS)")
+    args = ap.parse_args()
+    if args.cold_start: sys.exit(0 if cold_start(args.cold_start, args.mode, args.budget_ms) else 1)
+
+    mix = {n: a[0] for n, a in ACTIONS.items() if not args.only or n in args.only.split(",")}
+    server = None if args.url else Server(args.mode, {} if args.rate_limit else {"RATE_LIMIT": "0"})
+    try:
+        actions, elapsed = run(args.url or server.url, args.clients, args.duration, args.think_ms, mix)
+        lock_errors = server.lock_errors() if server else None
+    finally:
+        if server: server.stop()
+    report = {"clients": args.clients, "duration": round(elapsed, 1), "mode": args.mode, "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+              "total_rps": round(sum(r["count"] for r in actions.values()) / elapsed, 1), "lock_errors": lock_errors, "actions": actions}
+    base = None
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, args.compare + ".json"), encoding="utf-8") as f: base = json.load(f)
+    print_report(report, base)
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(os.path.join(BASELINE_DIR, args.save + ".json"), "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"저장: {os.path.join(BASELINE_DIR, args.save + '.json')}")
+
+
+if __name__ == "__main__":
+    main()
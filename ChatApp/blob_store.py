@@ -0,0 +1,52 @@
+"""대용량 채팅 메시지 blob 저장소.
+
+500자를 넘는 메시지는 gzip 으로 압축해 내용 해시 이름(<sha256>.txt.gz)으로 한 번만 저장하고,
+chats 행에는 짧은 미리보기와 링크만 남깁니다.
+다운로드 시 gzip 을 받는 클라이언트에는 압축본을 Content-Encoding: gzip 으로 그대로,
+아니면 서버에서 풀어서 보냅니다.
+"""
+import gzip, hashlib, io, os, tempfile
+from flask import abort, request, send_file
+
+from file_server import IMMUTABLE_CACHE
+
+
+class BlobStore:
+    def __init__(self, root, preview_chars=120, level=6):
+        self.root = root
+        self.preview_chars = preview_chars
+        self.level = level
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key + ".txt.gz")
+
+    def put(self, text):
+        """text 를 저장하고 키(sha256)를 돌려줍니다. 같은 내용은 다시 쓰지 않습니다."""
+        data = text.encode("utf-8")
+        key = hashlib.sha256(data).hexdigest()
+        if not os.path.exists(self._path(key)):
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".blob_")
+            with os.fdopen(fd, "wb") as f: f.write(gzip.compress(data, self.level, mtime=0))
+            os.replace(tmp, self._path(key))
+        return key
+
+    def preview(self, text):
+        t = " ".join(text.split())
+        return t if len(t) <= self.preview_chars else t[:self.preview_chars] + "…"
+
+    def send(self, key):
+        if len(key) != 64 or any(c not in "0123456789abcdef" for c in key): abort(404)
+        path = self._path(key)
+        if not os.path.exists(path): abort(404)
+        if not request.range and "gzip" in request.headers.get("Accept-Encoding", ""):
+            resp = send_file(path, mimetype="text/plain; charset=utf-8", download_name=key + ".txt",
+                             etag=key + "-gz", conditional=True)
+            resp.headers["Content-Encoding"] = "gzip"
+        else:
+            with open(path, "rb") as f: data = gzip.decompress(f.read())
+            resp = send_file(io.BytesIO(data), mimetype="text/plain; charset=utf-8", download_name=key + ".txt",
+                             etag=key, conditional=True)
+        resp.headers["Cache-Control"] = IMMUTABLE_CACHE
+        resp.vary.add("Accept-Encoding")
+        return resp
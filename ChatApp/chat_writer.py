@@ -0,0 +1,104 @@
+"""chats 테이블 write-behind 큐.
+
+send_msg 는 emit 을 먼저 내보내고, 채팅 행은 전용 스레드가 모아서
+(batch_size 개 또는 flush_ms 마다) 한 트랜잭션으로 그룹 커밋합니다.
+id 는 write() 시점에 미리 발급하므로 커밋 전에도 히스토리 페이지네이션에 쓸 수 있습니다.
+워커가 여럿이면 id 는 백플레인의 공유 카운터(allocate)로 발급해야 워커끼리 겹치지 않습니다.
+발급한 id 는 이미 방에 전송됐으므로 기록할 때 다른 id 로 바꾸지 않습니다.
+"""
+import queue, sqlite3, threading, time
+
+INSERT_SQL = "INSERT INTO chats (id, nickname, msg, type, rank, time, room) VALUES (?, ?, ?, ?, ?, ?, ?)"
+MAX_ID_SQL = "SELECT COALESCE(MAX(id), 0) FROM chats"
+_STOP = object()
+_local_ids, _local_lock = {}, threading.Lock()  # DB 파일 -> 이 프로세스의 마지막 발급 id (공유 발급기가 없을 때)
+
+
+def _allocate_local(path, floor):
+    """같은 DB 파일을 쓰는 이 프로세스의 writer 들이 함께 쓰는 기본 발급기 (floor 보다 항상 큼)."""
+    with _local_lock:
+        v = _local_ids[path] = max(_local_ids.get(path, 0), floor) + 1
+        return v
+
+
+class ChatWriter:
+    def __init__(self, storage, batch_size=64, flush_ms=200, sync=False, allocate=None):
+        """allocate(floor): floor 보다 큰 새 id 를 돌려주는 공유 발급기 (없으면 이 프로세스 안에서만 공유, MAX(id)+1 부터)."""
+        self.db = storage
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+        self.sync = sync  # True 면 큐 없이 호출 스레드에서 바로 INSERT (기존 동작)
+        self._q = queue.Queue()
+        self._lock = threading.Lock()
+        self._floor = 0  # 발급 하한 = DB 의 MAX(id) (시작할 때와 id 충돌 뒤에 다시 읽음)
+        self._reseed()
+        self._allocate = allocate or (lambda floor: _allocate_local(storage.path, floor))
+        self._thread = None
+        if not sync:
+            self._thread = threading.Thread(target=self._run, name="chat-writer", daemon=True)
+            self._thread.start()
+
+    def _reseed(self):
+        with self.db.checkout() as conn:
+            top = conn.execute(MAX_ID_SQL).fetchone()[0]
+        with self._lock:
+            self._floor = max(self._floor, top)
+            return self._floor
+
+    def write(self, nickname, msg, mtype, rank, room="main"):
+        """채팅 행을 기록하고 미리 발급한 id 를 돌려줍니다."""
+        row = (self._allocate(self._floor), nickname, msg, mtype, rank, time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime()), room)
+        if self.sync:
+            with self.db.transaction() as conn: conn.execute(INSERT_SQL, row)
+        else:
+            self._q.put(row)
+        return row[0]
+
+    def flush(self, timeout=None):
+        """지금까지 넣은 행이 모두 커밋될 때까지 기다립니다."""
+        if self.sync or not self._thread.is_alive(): return True
+        done = threading.Event()
+        self._q.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=10):
+        """남은 행을 모두 기록하고 writer 스레드를 종료합니다 (서버 종료 시)."""
+        if self.sync or not self._thread.is_alive(): return
+        self._q.put(_STOP)
+        self._thread.join(timeout)
+
+    def _commit(self, rows):
+        if not rows: return
+        try:
+            with self.db.transaction() as conn: conn.executemany(INSERT_SQL, rows)
+        except Exception as e:
+            print(f"ChatWriter Error: {e} ({len(rows)}건을 한 행씩 다시 기록)")
+            for row in rows: self._insert_one(row)  # 한 행 때문에 배치 전체를 버리지 않음
+        rows.clear()
+
+    def _insert_one(self, row):
+        try:
+            with self.db.transaction() as conn: conn.execute(INSERT_SQL, row)
+        except sqlite3.IntegrityError:
+            # 발급기가 DB 보다 뒤처졌음 (공유 카운터 초기화 등) - 전송한 id 를 바꾸지 않고 이 행은 버리되,
+            # 하한을 MAX(id) 로 올려 다음 발급부터는 겹치지 않게 합니다
+            print(f"ChatWriter Error: id {row[0]} 중복 (1건 유실, 발급 하한 -> {self._reseed()})")
+        except Exception as e:
+            print(f"ChatWriter Error: {e} (1건 유실: {row[0]})")
+
+    def _run(self):
+        while True:
+            item = self._q.get()
+            rows, waiter, stop = [], None, False
+            deadline = time.monotonic() + self.flush_ms / 1000
+            # 첫 행이 들어온 뒤 flush_ms 동안 또는 batch_size 개까지 모읍니다
+            while True:
+                if item is _STOP: stop = True; break
+                if isinstance(item, threading.Event): waiter = item; break  # flush 요청은 즉시 커밋
+                rows.append(item)
+                if len(rows) >= self.batch_size: break
+                try: item = self._q.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty: break
+            self._commit(rows)
+            if waiter: waiter.set()
+            if stop: return
@@ -0,0 +1,54 @@
+"""경제 명령어 트랜잭션 API.
+
+!저금/!출금/!매수/!가위바위보 는 각각 조건부 UPDATE ... RETURNING 한 번으로 끝납니다.
+잔액 조건(WHERE)이 DB 안에서 검사되므로 동시에 들어와도 마이너스가 될 수 없습니다.
+옮긴 금액은 바인딩한 :amt 를 RETURNING 으로 돌려받습니다 (전액은 같은 트랜잭션에서 읽은 잔액을 :amt 로).
+"""
+RETURNING = " RETURNING nickname, money, bank_money, btc_amount"
+
+DEPOSIT_SQL = ("UPDATE users SET money = money - :amt, bank_money = bank_money + :amt"
+               " WHERE nickname = :nick AND :amt > 0 AND money >= :amt" + RETURNING + ", :amt AS moved")
+WITHDRAW_SQL = ("UPDATE users SET bank_money = bank_money - :amt, money = money + :amt"
+                " WHERE nickname = :nick AND :amt > 0 AND bank_money >= :amt" + RETURNING + ", :amt AS moved")
+BALANCE_SQL = "SELECT {} FROM users WHERE nickname = ?"
+MAX_AMOUNT = 2 ** 63 - 1  # SQLite INTEGER 상한 (넘는 금액은 바인딩 전에 거절)
+BUY_SQL = ("UPDATE users SET money = money - :amt"
+           " WHERE nickname = :nick AND :amt > 0 AND money >= :amt" + RETURNING)
+HOLDING_SQL = ("INSERT INTO holdings (nickname, asset, amount) VALUES (?, ?, ?)"
+               " ON CONFLICT(nickname, asset) DO UPDATE SET amount = amount + excluded.amount")
+WAGER_SQL = ("UPDATE users SET money = money + :delta"
+             " WHERE nickname = :nick AND :stake > 0 AND money >= :stake" + RETURNING)
+
+
+def _move(ledger, sql, nick, amt, field):
+    if amt is not None and amt > MAX_AMOUNT: return None
+    if amt is None:  # 전액: 트랜잭션 안에서 읽은 field 잔액을 그대로 :amt 로
+        params = lambda conn: {"nick": nick, "amt": conn.execute(BALANCE_SQL.format(field), (nick,)).fetchone()[0]}
+    else: params = {"nick": nick, "amt": amt}
+    after = ledger.transact(nick, sql, params)[1]
+    return None if after is None else (after.pop("moved"), after)
+
+
+def deposit(ledger, nick, amt=None):
+    """현금 -> 은행. amt 가 None 이면 전액. 성공 시 (옮긴 금액, 변경 후 행), 실패 시 None."""
+    return _move(ledger, DEPOSIT_SQL, nick, amt, "money")
+
+
+def withdraw(ledger, nick, amt=None):
+    """은행 -> 현금. amt 가 None 이면 전액."""
+    return _move(ledger, WITHDRAW_SQL, nick, amt, "bank_money")
+
+
+def buy(ledger, nick, asset, amt, price):
+    """현금 amt 로 asset 을 price 에 매수. 현금 차감과 보유량 증가가 한 트랜잭션. 성공 시 (매수 수량, 변경 후 행)."""
+    if amt > MAX_AMOUNT: return None
+    coins = amt / price
+    _, after = ledger.transact(nick, BUY_SQL, {"nick": nick, "amt": amt},
+                               then=lambda conn, row: conn.execute(HOLDING_SQL, (nick, asset, coins)))
+    return None if after is None else (coins, after)
+
+
+def wager(ledger, nick, stake, delta):
+    """stake 이상 보유 시에만 현금에 delta(승리 +, 패배 -, 무승부 0)를 반영. 성공 시 변경 후 행."""
+    if stake > MAX_AMOUNT: return None
+    return ledger.transact(nick, WAGER_SQL, {"nick": nick, "stake": stake, "delta": delta})[1]
@@ -0,0 +1,100 @@
+"""/uploads 다운로드 서빙 (캐시 검증자 + Range + 미리 압축).
+
+- 해시 이름 파일은 내용이 절대 안 바뀌므로 강한 ETag = 해시, 1년 immutable 캐시.
+  업로드는 <sha256> 하나로 저장되고 <sha256>.ext 주소로 요청되므로 확장자는 Content-Type 에만 씁니다.
+- 그 외 파일은 mtime/크기 ETag + no-cache (매번 304 로 재검증).
+- If-None-Match/If-Modified-Since -> 304, Range -> 206 은 werkzeug 의 conditional 응답이 처리합니다.
+- 텍스트류는 백그라운드에서 .gz 를 한 번 만들어 두고, gzip 을 받는 클라이언트에게 그대로 보냅니다.
+"""
+import gzip, mimetypes, os, re, shutil, tempfile
+from concurrent.futures import ThreadPoolExecutor
+from flask import abort, request, send_file
+from werkzeug.utils import safe_join
+
+COMPRESSIBLE = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+CONTENT_NAMED = re.compile(r"^([0-9a-f]{64})(\.[\w-]+)?$")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+def mimetype_of(name):
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+def compressible(name):
+    return mimetype_of(name).startswith(COMPRESSIBLE)
+
+
+def resolve(root, name):
+    """요청 이름 -> 실제 파일 경로 (없으면 None). 그 이름의 파일이 없고 <해시>.ext 형식이면 해시 이름 파일."""
+    path = safe_join(root, name)
+    if path is None or os.path.isfile(path): return path
+    m = CONTENT_NAMED.match(os.path.basename(name))
+    if m and m.group(2):
+        alt = os.path.join(os.path.dirname(path), m.group(1))
+        if os.path.isfile(alt): return alt
+    return None
+
+
+class Precompressor:
+    """압축할 만한 파일의 gzip 사본을 root/.gz/ 아래에 한 번만 만들어 둡니다."""
+
+    def __init__(self, root, min_size=1024, level=9):
+        self.root = os.path.abspath(root)
+        self.dir = os.path.join(self.root, ".gz")
+        self.min_size = min_size
+        self.level = level
+        self._skip = set()  # 압축해도 안 줄어드는 파일
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gzip")
+        os.makedirs(self.dir, exist_ok=True)
+
+    def _gz_path(self, name):
+        return os.path.join(self.dir, name + ".gz")
+
+    def submit(self, name):
+        if name not in self._skip and compressible(name) and not os.path.exists(self._gz_path(name)):
+            self._pool.submit(self._compress, name)
+
+    def warm(self):
+        """서버 시작 시 기존 파일들도 백그라운드에서 압축합니다."""
+        for e in os.scandir(self.root):
+            if e.is_file() and not e.name.startswith("."): self.submit(e.name)
+
+    def _compress(self, name):
+        src = resolve(self.root, name)
+        if src is None: return
+        try:
+            size = os.path.getsize(src)
+            if size < self.min_size or os.path.exists(self._gz_path(name)):
+                self._skip.add(name); return
+            fd, tmp = tempfile.mkstemp(dir=self.dir, prefix=".gz_")
+            with open(src, "rb") as f, os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=self.level, mtime=0) as out:
+                shutil.copyfileobj(f, out, 64 * 1024)
+            if os.path.getsize(tmp) < size * 0.9: os.replace(tmp, self._gz_path(name))
+            else: os.remove(tmp); self._skip.add(name)
+        except OSError as e:
+            print(f"Precompress Error: {name}: {e}")
+
+    def variant(self, name):
+        p = self._gz_path(name)
+        return p if os.path.exists(p) else None
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def send_upload(root, name, precompressed=None):
+    path = resolve(os.path.abspath(root), name)
+    if path is None or os.path.basename(name).startswith("."): abort(404)
+    st = os.stat(path)
+    m = CONTENT_NAMED.match(os.path.basename(name))
+    etag = m.group(1) if m else f"{int(st.st_mtime)}-{st.st_size}"
+    gz = None
+    # Range 요청은 원본 바이트 기준이어야 하므로 압축본은 Range 가 없을 때만
+    if precompressed and not request.range and request.accept_encodings["gzip"] > 0:  # gzip;q=0 은 거절
+        gz = precompressed.variant(name)
+    resp = send_file(gz or path, mimetype=mimetype_of(name), download_name=os.path.basename(name), etag=etag + ("-gz" if gz else ""),
+                     last_modified=st.st_mtime, conditional=True)
+    resp.headers["Cache-Control"] = IMMUTABLE_CACHE if m else "no-cache"
+    if compressible(name): resp.vary.add("Accept-Encoding")
+    if gz: resp.headers["Content-Encoding"] = "gzip"
+    return resp
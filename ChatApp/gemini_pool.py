@@ -0,0 +1,131 @@
+"""!gemini 비동기 워커 풀.
+
+Socket.IO 핸들러 스레드를 붙잡지 않도록 질문을 고정 크기 워커 풀에 넘기고,
+응답은 조각(chunk)이 도착하는 대로 'bot_stream' 이벤트로 방에 흘려보냅니다.
+같은 질문(정규화 기준)은 TTL/LRU 캐시에서 바로 답합니다.
+백엔드는 stream(prompt) 만 있으면 되므로 FakeBackend 로 로컬 테스트가 가능합니다.
+"""
+import itertools, os, socket, threading, time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+GEMINI_SECONDS = metrics.histogram("gemini_seconds", "Gemini 응답 시간 (first_chunk: 첫 조각까지, total: 끝까지)", ("stage",),
+                                   buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+GEMINI_REQUESTS = metrics.counter("gemini_requests_total", "!gemini 접수 결과", ("status",))
+
+
+class GenaiBackend:
+    """google-genai 클라이언트 스트리밍 백엔드."""
+
+    def __init__(self, client, model="gemini-2.0-flash"):
+        self.client = client
+        self.model = model
+
+    def stream(self, prompt):
+        for chunk in self.client.models.generate_content_stream(model=self.model, contents=prompt):
+            if chunk.text: yield chunk.text
+
+
+class FakeBackend:
+    """API 키 없이 쓰는 가짜 모델 (테스트/부하 측정용)."""
+
+    def __init__(self, reply=None, chunk_size=16, delay=0.0):
+        self.reply = reply or (lambda p: f"[가짜 Gemini] '{p}' 에 대한 답변입니다.")
+        self.chunk_size = chunk_size
+        self.delay = delay
+
+    def stream(self, prompt):
+        text = self.reply(prompt)
+        for i in range(0, len(text), self.chunk_size):
+            if self.delay: time.sleep(self.delay)
+            yield text[i:i + self.chunk_size]
+
+
+def normalize(prompt):
+    return " ".join(prompt.lower().split())
+
+
+class GeminiPool:
+    """emit(event, data, room) 은 방 전송 함수 (예: transport.broadcast). 답변은 질문한 방으로 나갑니다.
+    bot_stream id 는 '<id_prefix>-<번호>' - 다중 워커에서 다른 워커의 답변과 섞이지 않도록 워커마다 다른 접두사."""
+
+    def __init__(self, backend, emit, workers=4, max_pending=32, per_user=1, cache_size=256, cache_ttl=600, id_prefix=None):
+        self.backend = backend
+        self.id_prefix = id_prefix or f"{socket.gethostname()}:{os.getpid()}"
+        self.emit = emit
+        self.per_user = per_user
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini")
+        self._slots = threading.BoundedSemaphore(max_pending)  # 대기열 상한
+        self._active = {}          # 닉네임 -> 처리 중인 질문 수
+        self._cache = OrderedDict()  # 정규화된 질문 -> (만료 시각, 답변)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    # --- [캐시] ---
+    def cached(self, prompt):
+        key = normalize(prompt)
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is None: return None
+            if hit[0] < time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return hit[1]
+
+    def _store(self, prompt, text):
+        with self._lock:
+            self._cache[normalize(prompt)] = (time.monotonic() + self.cache_ttl, text)
+            self._cache.move_to_end(normalize(prompt))
+            while len(self._cache) > self.cache_size: self._cache.popitem(last=False)
+
+    # --- [요청 처리] ---
+    def submit(self, nick, prompt, room="main"):
+        """질문을 접수합니다. 'ok' / 'cached' / 'user_busy' / 'busy' 중 하나를 돌려줍니다."""
+        sid = f"{self.id_prefix}-{next(self._ids)}"
+        status = self._submit(sid, nick, prompt, room)
+        GEMINI_REQUESTS.inc(status=status)
+        return status
+
+    def _submit(self, sid, nick, prompt, room):
+        text = self.cached(prompt)
+        if text is not None:
+            self.emit('bot_stream', {'id': sid, 'nickname': nick, 'chunk': text, 'done': True}, room)
+            return 'cached'
+        with self._lock:
+            if self._active.get(nick, 0) >= self.per_user: return 'user_busy'
+            if not self._slots.acquire(blocking=False): return 'busy'
+            self._active[nick] = self._active.get(nick, 0) + 1
+        self._pool.submit(self._run, sid, nick, prompt, room)
+        return 'ok'
+
+    def pending(self):
+        """처리 중이거나 대기 중인 질문 수."""
+        with self._lock: return sum(self._active.values())
+
+    def _run(self, sid, nick, prompt, room):
+        parts = []
+        t0 = time.perf_counter()
+        try:
+            for chunk in self.backend.stream(prompt):
+                if not parts: GEMINI_SECONDS.observe(time.perf_counter() - t0, stage="first_chunk")
+                parts.append(chunk)
+                self.emit('bot_stream', {'id': sid, 'nickname': nick, 'chunk': chunk, 'done': False}, room)
+            self._store(prompt, "".join(parts))
+        except Exception as e:
+            GEMINI_REQUESTS.inc(status="error")
+            self.emit('message', {'msg': f"⚠️ Gemini 오류: {str(e)}", 'type': 'system'}, room)
+        finally:
+            GEMINI_SECONDS.observe(time.perf_counter() - t0, stage="total")
+            self.emit('bot_stream', {'id': sid, 'nickname': nick, 'chunk': '', 'done': True}, room)
+            with self._lock:
+                self._active[nick] -= 1
+                if not self._active[nick]: del self._active[nick]
+            self._slots.release()
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
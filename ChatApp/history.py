@@ -0,0 +1,47 @@
+"""최근 채팅 링 버퍼 (채팅방 하나당 하나).
+
+접속 시마다 DB 를 읽지 않도록 그 방의 마지막 N 개 메시지를 메모리에 들고 있고,
+버퍼보다 오래된 메시지는 id 기준 keyset 페이지네이션으로 DB 에서 읽습니다.
+"""
+import threading
+from collections import deque
+
+OLDER_SQL = "SELECT id, nickname, msg, type, rank FROM chats WHERE room = ? AND id < ? ORDER BY id DESC LIMIT ?"
+
+
+class ChatHistory:
+    def __init__(self, storage, size=100, room="main"):
+        self.db = storage
+        self.room = room
+        self._buf = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def warm(self):
+        """DB 에 있는 그 방의 마지막 N 개로 버퍼를 채웁니다."""
+        with self.db.checkout() as conn:
+            rows = conn.execute(OLDER_SQL, (self.room, 2 ** 63 - 1, self._buf.maxlen)).fetchall()
+        with self._lock:
+            self._buf.clear()
+            self._buf.extend(dict(r) for r in reversed(rows))
+
+    def append(self, msg):
+        """msg: {'id', 'nickname', 'msg', 'type', 'rank'} - warm() 으로 이미 읽어 온 id 면 건너뜀."""
+        with self._lock:
+            if any(m['id'] == msg['id'] for m in self._buf): return
+            self._buf.append(msg)
+
+    def recent(self):
+        with self._lock:
+            return list(self._buf)
+
+    def older(self, before_id, limit=50):
+        """before_id 보다 오래된 메시지 limit 개 (오래된 순)."""
+        with self._lock:
+            hit = [m for m in self._buf if m['id'] < before_id][-limit:]
+            oldest = self._buf[0]['id'] if self._buf else before_id
+        # 버퍼에서 모자라는 만큼만 DB 에서 이어서 읽습니다
+        if len(hit) < limit:
+            with self.db.checkout() as conn:
+                rows = conn.execute(OLDER_SQL, (self.room, min(before_id, oldest), limit - len(hit))).fetchall()
+            hit = [dict(r) for r in reversed(rows)] + hit
+        return hit
@@ -0,0 +1,56 @@
+"""자산 랭킹 인덱스.
+
+총자산 내림차순으로 정렬된 리스트를 유지하고, 잔액이 바뀐 유저만 bisect 로 재배치합니다.
+코인 시세가 바뀌면 rebuild() 로 한 번에 다시 점수를 매깁니다.
+top(k)/page() 는 O(k), rank_of() 는 O(log n).
+"""
+import bisect, threading
+
+
+class Leaderboard:
+    def __init__(self, score):
+        self.score = score      # score(row) -> 총자산
+        self._keys = []         # (-총자산, 닉네임) 오름차순 = 자산 내림차순
+        self._by_nick = {}      # 닉네임 -> 현재 key
+        self._lock = threading.Lock()
+
+    def update(self, row):
+        """유저 한 명의 잔액이 바뀌었을 때 위치만 옮깁니다."""
+        key = (-self.score(row), row['nickname'])
+        with self._lock:
+            old = self._by_nick.get(key[1])
+            if old == key: return
+            if old is not None:
+                del self._keys[bisect.bisect_left(self._keys, old)]
+            bisect.insort(self._keys, key)
+            self._by_nick[key[1]] = key
+
+    def rebuild(self, rows):
+        """시세 변동 등으로 전원의 점수가 바뀌었을 때 전체를 다시 정렬합니다."""
+        self.rebuild_scores([r['nickname'] for r in rows], [self.score(r) for r in rows])
+
+    def rebuild_scores(self, nicks, totals):
+        """이미 계산된 총자산(예: 시장 엔진의 벡터 재평가 결과)으로 전체를 다시 정렬합니다."""
+        keys = sorted(zip([-t for t in totals], nicks))
+        with self._lock:
+            self._keys = keys
+            self._by_nick = {k[1]: k for k in keys}
+
+    def page(self, offset=0, limit=10):
+        """[(순위, 닉네임, 총자산), ...]"""
+        with self._lock:
+            chunk = self._keys[offset:offset + limit]
+        return [(offset + i + 1, n, -s) for i, (s, n) in enumerate(chunk)]
+
+    def top(self, k=5):
+        return self.page(0, k)
+
+    def rank_of(self, nick):
+        """(순위, 총자산) 또는 랭킹에 없으면 None."""
+        with self._lock:
+            key = self._by_nick.get(nick)
+            if key is None: return None
+            return bisect.bisect_left(self._keys, key) + 1, -key[0]
+
+    def __len__(self):
+        return len(self._keys)
@@ -0,0 +1,228 @@
+"""users 테이블 인메모리 장부 (LRU 캐시 + write-back).
+
+자주 쓰는 유저 행(money, bank_money, btc_amount)을 메모리에 들고 있다가
+변경분(delta)만 모아서 주기적으로 한 트랜잭션에 기록합니다.
+"""
+import threading
+from collections import OrderedDict
+
+FIELDS = ("money", "bank_money", "btc_amount")
+SELECT_SQL = "SELECT nickname, money, bank_money, btc_amount FROM users WHERE nickname = ?"
+WRITEBACK_SQL = "UPDATE users SET money = money + ?, bank_money = bank_money + ?, btc_amount = btc_amount + ? WHERE nickname = ?"
+
+
+class _Entry:
+    __slots__ = ("row", "delta", "lock", "evicted")
+
+    def __init__(self, row):
+        self.row = row                           # 현재 잔액 (DB 값 + 미기록 delta)
+        self.delta = dict.fromkeys(FIELDS, 0)    # 아직 DB 에 안 쓴 변경분
+        self.lock = threading.RLock()
+        self.evicted = False
+
+    def dirty(self):
+        return any(self.delta.values())
+
+
+class UserLedger:
+    def __init__(self, storage, capacity=10000, writeback_s=2.0):
+        self.db = storage
+        self.capacity = capacity
+        self.writeback_s = writeback_s
+        self._entries = OrderedDict()
+        self._retired = {}  # 캐시에서 내보냈지만 flusher 가 아직 정리하지 않은 항목 (nick -> entry)
+        self._lock = threading.Lock()  # _entries/_retired 용 - 잡은 채로 DB 를 건드리지 않음
+        # DB 쓰기(flush/transact)와 다시 읽기(reload)를 직렬화: 꺼낸 delta 가 커밋되기 전의 DB 값을 reload 가 읽으면
+        # 그 금액이 캐시에서 사라지므로. 항목 락보다 항상 먼저 잡습니다.
+        self._io = threading.Lock()
+        self._stop = threading.Event()
+        self._listeners = []
+        self._thread = threading.Thread(target=self._run, name="ledger-writeback", daemon=True)
+        self._thread.start()
+
+    # --- [조회/변경] ---
+    def _load(self, conn, nick):
+        conn.execute("INSERT OR IGNORE INTO users (nickname) VALUES (?)", (nick,))
+        return dict(conn.execute(SELECT_SQL, (nick,)).fetchone())
+
+    def _entry(self, nick):
+        with self._lock:
+            e = self._entries.get(nick)
+            if e is None and nick in self._retired:  # 아직 정리 전이면 DB 대신 그 항목을 되살림 (미기록 delta 포함)
+                e = self._entries[nick] = self._retired.pop(nick)
+                e.evicted = False
+            if e is not None:
+                self._entries.move_to_end(nick)
+                return e
+            # 빈 자리만 먼저 넣고 DB 읽기는 전역 락 밖에서 - 같은 nick 의 다른 호출은 항목 락에서 기다림
+            e = self._entries[nick] = _Entry(None)
+            e.lock.acquire()
+            self._evict()
+        try:
+            with self.db.checkout() as conn:
+                e.row = self._load(conn, nick)
+        except BaseException:
+            e.evicted = True
+            with self._lock:
+                if self._entries.get(nick) is e: del self._entries[nick]
+            raise
+        finally:
+            e.lock.release()
+        return e
+
+    def _evict(self):
+        # 오래된 항목부터 내보내되, 다른 스레드가 쓰는 중(락 사용 중)이거나 읽는 중인 항목은 건너뜁니다.
+        # 내보낸 항목은 _retired 로 옮겨 두고 DB 쓰기는 flusher 가 합니다 (_lock 을 잡은 채로 쓰지 않도록)
+        for key in list(self._entries)[:max(0, len(self._entries) - self.capacity) * 2]:
+            if len(self._entries) <= self.capacity: return
+            old = self._entries[key]
+            if not old.lock.acquire(blocking=False): continue
+            try:
+                old.evicted = True
+                del self._entries[key]
+                self._retired[key] = old
+            finally:
+                old.lock.release()
+
+    @staticmethod
+    def _take(e):
+        """entry 의 delta 를 꺼내고 0 으로 되돌립니다 (e.lock 보유 상태에서 호출)."""
+        d = e.delta
+        e.delta = dict.fromkeys(FIELDS, 0)
+        return (d["money"], d["bank_money"], d["btc_amount"], e.row["nickname"])
+
+    def locked(self, nick):
+        """nick 의 장부 항목 락을 잡은 채로 (entry) 를 돌려주는 컨텍스트."""
+        while True:
+            e = self._entry(nick)
+            e.lock.acquire()
+            if not e.evicted: return _Locked(e)
+            e.lock.release()
+
+    def get(self, nick):
+        with self.locked(nick) as e:
+            return dict(e.row)
+
+    def add(self, nick, field, amount):
+        with self.locked(nick) as e:
+            e.row[field] += amount
+            e.delta[field] += amount
+            row = dict(e.row)
+        self._notify(row)
+        return row
+
+    def transact(self, nick, sql, params, then=None):
+        """nick 행에 조건부 UPDATE ... RETURNING 한 문장을 한 트랜잭션으로 실행합니다.
+
+        같은 nick 의 다른 변경과는 락으로 직렬화되고, 미기록 delta 도 같은 트랜잭션에 함께 씁니다.
+        (변경 전 행, 변경 후 행) 을 돌려주며 조건에 걸리면 변경 후 행은 None 입니다.
+        변경 후 행은 RETURNING 의 모든 열이고, 캐시에는 장부 열만 남깁니다.
+        params 가 함수면 같은 트랜잭션 안에서 (delta 를 쓴 뒤) params(conn) 으로 만듭니다 (현재 DB 값으로 정하는 금액용).
+        then(conn, row) 을 주면 성공했을 때 같은 트랜잭션 안에서 이어서 실행합니다.
+        """
+        with self._io, self.locked(nick) as e:
+            before, pending = dict(e.row), self._take(e)
+            try:
+                with self.db.transaction() as conn:
+                    if any(pending[:3]): conn.execute(WRITEBACK_SQL, pending)
+                    if callable(params): params = params(conn)
+                    rows = conn.execute(sql, params).fetchall()  # RETURNING 은 끝까지 읽어야 문장이 완료됨
+                    if rows and then: then(conn, rows[0])
+            except Exception:
+                e.delta = dict(zip(FIELDS, pending[:3]))
+                raise
+            if not rows: return before, None
+            e.row = {k: rows[0][k] for k in e.row}
+            row, after = dict(e.row), dict(rows[0])
+        self._notify(row)
+        return before, after
+
+    def on_change(self, fn):
+        """잔액이 바뀔 때마다 fn(row) 를 호출합니다."""
+        self._listeners.append(fn)
+
+    def _notify(self, row):
+        for fn in self._listeners: fn(row)
+
+    def cached(self):
+        with self._lock:
+            return list(self._entries)
+
+    # --- [write-back] ---
+    def _write(self, rows):
+        with self.db.transaction() as conn:
+            conn.executemany(WRITEBACK_SQL, rows)
+
+    def flush(self):
+        """미기록 delta 를 (캐시에서 내보낸 항목 것까지) 모두 한 트랜잭션으로 DB 에 씁니다."""
+        with self._io:
+            with self._lock:
+                retired = list(self._retired.items())
+                entries = list(self._entries.values()) + [e for _, e in retired]
+            taken = []
+            for e in entries:
+                if e.row is None: continue  # 아직 읽는 중인 빈 자리 (delta 없음)
+                with e.lock:
+                    if e.dirty(): taken.append((e, self._take(e)))
+            try:
+                if taken: self._write([t for _, t in taken])
+            except Exception:
+                for e, (m, b, c, _) in taken:  # 실패하면 delta 를 되돌려 다음 주기에 재시도
+                    with e.lock:
+                        e.delta["money"] += m; e.delta["bank_money"] += b; e.delta["btc_amount"] += c
+                raise
+            # 기록이 끝났으니 내보낸 항목을 버림 - 이제 다시 불러도 DB 에 delta 가 반영돼 있음
+            with self._lock:
+                for nick, e in retired:
+                    if self._retired.get(nick) is not e or not e.lock.acquire(blocking=False): continue
+                    try:
+                        if not e.dirty(): del self._retired[nick]  # 그 사이 되살아나 바뀐 항목은 다음 주기에
+                    finally:
+                        e.lock.release()
+            return len(taken)
+
+    def refresh(self, nick, values):
+        """다른 워커가 알린 잔액(values)으로 캐시 행을 맞춥니다. 이 워커가 아직 쓰지 않은 delta 는 그대로 더합니다.
+        (그 워커의 변경분은 write-back 전이라 DB 를 다시 읽어도 안 보이므로 알림 값을 씁니다) 캐시에 없으면 무시."""
+        with self._lock:
+            e = self._entries.get(nick) or self._retired.get(nick)
+        if e is None: return
+        with self._io, e.lock:
+            if e.row is None: return  # flush 가 꺼내 쓰는 중인 delta 를 빠뜨리지 않도록
+            for k in FIELDS:
+                if k in values: e.row[k] = values[k] + e.delta[k]
+
+    def reload(self, nicks=None):
+        """DB 에서 직접 바뀐 행(은행 이자 등)을 캐시에 다시 반영합니다."""
+        if nicks is None:
+            with self._lock: nicks = list(self._entries) + list(self._retired)  # 되살아날 수 있는 항목도
+        changed = []
+        with self._io, self.db.checkout() as conn:
+            for i in range(0, len(nicks), 500):
+                chunk = nicks[i:i + 500]
+                q = f"SELECT nickname, money, bank_money, btc_amount FROM users WHERE nickname IN ({','.join('?' * len(chunk))})"
+                for r in conn.execute(q, chunk).fetchall():
+                    with self._lock:
+                        e = self._entries.get(r["nickname"]) or self._retired.get(r["nickname"])
+                    if e is None: continue
+                    with e.lock:
+                        if e.row is None: continue
+                        e.row = {k: r[k] + e.delta.get(k, 0) if k in FIELDS else r[k] for k in r.keys()}
+                        changed.append(dict(e.row))
+        for row in changed: self._notify(row)
+
+    def _run(self):
+        while not self._stop.wait(self.writeback_s):
+            try: self.flush()
+            except Exception as ex: print(f"Ledger Error: {ex}")
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(5)
+        self.flush()
+
+
+class _Locked:
+    def __init__(self, e): self.e = e
+    def __enter__(self): return self.e
+    def __exit__(self, *exc): self.e.lock.release()
@@ -0,0 +1,495 @@
+"""Game of Life 엔진 (채팅방 !라이프 와 micro:bit 5x5 화면용).
+
+- DenseLife : 작은 판. NumPy 배열 하나로 8방향 이웃 수를 한 번에 더해 한 세대씩 진행합니다.
+  살아 있는 칸이 가장자리에 닿으면 판을 넓히므로 무한 평면처럼 동작합니다.
+- HashLife : 큰 패턴 / 큰 세대 점프. 같은 모양의 사분면을 한 노드로 공유하는 quadtree 에
+  '2^j 세대 뒤의 가운데' 결과를 메모해 두어, 반복 구조가 많은 패턴은 수백만 세대도 금방 건너뜁니다.
+- Life : 위 둘을 감싼 것. 판이 dense_max 보다 커지거나 한 번에 jump_min 세대 이상 건너뛰면 HashLife 로 바꿉니다.
+  (무작위에 가까운 패턴은 HashLife 메모가 잘 안 맞으므로 판이 감당되는 동안은 NumPy 가 더 빠릅니다)
+- load() : RLE(.rle), Life 1.05/1.06(.life/.lif), plaintext(.cells) 를 읽습니다 (폴더 또는 lookup 으로 찾은 파일).
+  RLE 의 죽은 칸은 'b' 또는 '.', 그 밖의 글자(o, A ...)는 모두 산 칸으로 봅니다 (png to rle 출력 호환).
+- LifeStreams : 방마다 세대를 진행하며 글자 화면('life_frame')과 5x5 micro:bit 화면(IMG)을 정해진 fps 로 보냅니다.
+"""
+import itertools, math, os, re, socket, threading, time
+
+import numpy as np
+
+CONWAY = (frozenset({3}), frozenset({2, 3}))  # (태어나는 이웃 수, 살아남는 이웃 수)
+EXTENSIONS = (".rle", ".life", ".lif", ".cells")
+MAX_CELLS = 1 << 24  # HashLife 로 읽어 들일 때 임시 배열 넓이 상한 (4096 x 4096)
+
+BUILTIN = {  # 이름: RLE
+    "glider": "x = 3, y = 3\nbob$2bo$3o!",
+    "r-pentomino": "x = 3, y = 3\nb2o$2ob$bo!",
+    "acorn": "x = 7, y = 3\nbo5b$3bo3b$2o2b3o!",
+    "diehard": "x = 8, y = 3\n6bob$2o6b$bo3b3o!",
+    "lwss": "x = 5, y = 4\nbo2bo$o4b$o3bo$4o!",
+    "pulsar": "x = 13, y = 13\n2b3o3b3o2b2$o4bobo4bo$o4bobo4bo$o4bobo4bo$2b3o3b3o2b2$2b3o3b3o2b$o4bobo4bo$"
+              "o4bobo4bo$o4bobo4bo2$2b3o3b3o!",
+    "gosper": "x = 36, y = 9\n24bo$22bobo$12b2o6b2o12b2o$11bo3bo4b2o12b2o$2o8bo5bo3b2o$2o8bo3bob2o4bobo$"
+              "10bo5bo7bo$11bo3bo$12b2o!",
+    "empire": "x = 5, y = 5\n5o$o3bo$o3bo$o3bo$5o!",  # 제국 성벽 (micro:bit 기본 IMG 와 같은 모양)
+}
+
+
+# --- [패턴 읽기] ---
+class Pattern:
+    """cells: (N, 2) int64 배열 [x, y] (y 는 아래로 증가), rule: (birth, survive)."""
+
+    def __init__(self, cells, rule=CONWAY, name=""):
+        self.cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        self.rule = rule
+        self.name = name
+
+    def __len__(self):
+        return len(self.cells)
+
+
+def parse_rule(text):
+    """'B3/S23', 'b36/s23', '23/3' (S/B) -> (birth, survive)."""
+    t = text.strip().upper().replace(" ", "")
+    m = re.fullmatch(r"B(\d*)/S(\d*)", t) or re.fullmatch(r"S(\d*)/B(\d*)", t)
+    if m:
+        b, s = (m.group(1), m.group(2)) if t.startswith("B") else (m.group(2), m.group(1))
+    elif re.fullmatch(r"(\d*)/(\d*)", t):
+        s, b = t.split("/")
+    elif re.fullmatch(r"(\d*)/(\d*)/(\d+)", t) or "/G" in t or "/C" in t:
+        raise ValueError(f"여러 상태(Generations) 규칙은 지원하지 않습니다: {text}")
+    else:
+        raise ValueError(f"알 수 없는 규칙: {text}")
+    if "0" in b: raise ValueError("B0 규칙은 지원하지 않습니다.")
+    return frozenset(map(int, b)), frozenset(map(int, s))
+
+
+def parse_rle(text):
+    rule, body, name = CONWAY, [], ""
+    for line in text.splitlines():
+        line = line.strip()
+        if not line: continue
+        if line.startswith("#"):
+            if line[1:2] in ("N", "n"): name = line[2:].strip()
+            continue
+        if not body and re.match(r"x\s*=", line):
+            m = re.search(r"rule\s*=\s*([^\s,]+)", line)
+            if m: rule = parse_rule(m.group(1))
+            continue
+        body.append(line)
+        if "!" in line: break
+    xs, ys, lens = [], [], []
+    x = y = 0
+    for count, tag in re.findall(r"(\d*)([^\d\s])", "".join(body)):
+        n = int(count) if count else 1
+        if tag == "!": break
+        if tag == "$": y += n; x = 0
+        elif tag in "b.": x += n
+        else:
+            xs.append(x); ys.append(y); lens.append(n); x += n
+    lens = np.asarray(lens, dtype=np.int64)
+    starts = np.repeat(np.asarray(xs, dtype=np.int64), lens)
+    offset = np.arange(lens.sum()) - np.repeat(np.cumsum(lens) - lens, lens)  # 구간 안에서 0,1,2...
+    return Pattern(np.stack([starts + offset, np.repeat(np.asarray(ys, dtype=np.int64), lens)], 1), rule, name)
+
+
+def parse_life(text):
+    """Life 1.06 ('x y' 줄), Life 1.05 ('#P x y' 블록 + .*), plaintext (.cells, '!' 주석 + .O)."""
+    lines = text.splitlines()
+    head = lines[0].strip() if lines else ""
+    rule, cells, name = CONWAY, [], ""
+    if head.startswith("#Life 1.06"):
+        for line in lines[1:]:
+            if line.strip() and not line.startswith("#"):
+                x, y = line.split()[:2]
+                cells.append((int(x), int(y)))
+        return Pattern(cells, rule)
+    ox = oy = row = 0
+    for line in lines:
+        s = line.rstrip()
+        if s.startswith("#P"):
+            ox, oy = map(int, s[2:].split()[:2]); row = 0
+        elif s.startswith("#R"): rule = parse_rule(s[2:])
+        elif s.startswith(("#N", "#Life")): continue
+        elif s.startswith(("#D", "#C")): name = name or s[2:].strip()
+        elif s.startswith("!"):
+            if s.startswith("!Name:"): name = s[6:].strip()
+        else:
+            cells += [(ox + i, oy + row) for i, ch in enumerate(s) if ch in "*O"]
+            row += 1
+    return Pattern(cells, rule, name)
+
+
+def parse(text):
+    if re.search(r"^\s*x\s*=", text, re.M) and not text.lstrip().startswith("#Life"): return parse_rle(text)
+    return parse_life(text)
+
+
+def _read(path, name):
+    with open(path, encoding="utf-8", errors="replace") as f: p = parse(f.read())
+    p.name = p.name or name
+    return p
+
+
+def load(name, dirs=(), lookup=None):
+    """내장 패턴 이름 또는 dirs 안의 파일 이름 (경로는 무시하고 파일 이름만).
+    lookup(파일 이름) 을 주면 dirs 에 없을 때 그 함수가 돌려주는 경로도 봅니다 (업로드한 파일처럼 디스크 이름이 다른 경우)."""
+    key = name.lower()
+    if key in BUILTIN:
+        p = parse_rle(BUILTIN[key]); p.name = key
+        return p
+    base = os.path.basename(name)
+    cands = [c for c in [base] + [base + ext for ext in EXTENSIONS] if c.lower().endswith(EXTENSIONS)]
+    for d in dirs:
+        for cand in cands:
+            path = os.path.join(d, cand)
+            if os.path.isfile(path): return _read(path, cand)
+    for cand in cands if lookup else ():
+        path = lookup(cand)
+        if path and os.path.isfile(path): return _read(path, cand)
+    raise FileNotFoundError(name)
+
+
+def available(dirs=()):
+    names = list(BUILTIN)
+    for d in dirs:
+        if os.path.isdir(d): names += sorted(f for f in os.listdir(d) if f.lower().endswith(EXTENSIONS))
+    return names
+
+
+# --- [NumPy 판] ---
+class DenseLife:
+    def __init__(self, cells, rule=CONWAY, origin=(0, 0), grid=None):
+        self.birth = np.zeros(9, bool); self.birth[list(rule[0])] = True
+        self.survive = np.zeros(9, bool); self.survive[list(rule[1])] = True
+        self.rule = rule
+        if grid is None:
+            cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+            lo = cells.min(0) if len(cells) else np.zeros(2, np.int64)
+            hi = cells.max(0) if len(cells) else np.zeros(2, np.int64)
+            grid = np.zeros((hi[1] - lo[1] + 1, hi[0] - lo[0] + 1), bool)
+            grid[cells[:, 1] - lo[1], cells[:, 0] - lo[0]] = True
+            origin = (int(lo[0]), int(lo[1]))
+        self.grid, self.x0, self.y0 = grid, origin[0], origin[1]
+        self.generation = 0
+
+    @property
+    def population(self):
+        return int(self.grid.sum())
+
+    def _fit(self):
+        """가장자리에 산 칸이 있으면 1칸 넓히고, 빈 테두리가 두꺼워지면 줄입니다."""
+        g = self.grid
+        rows, cols = np.flatnonzero(g.any(1)), np.flatnonzero(g.any(0))
+        if not len(rows):
+            self.grid = np.zeros((1, 1), bool); return
+        top, left = rows[0] - 1, cols[0] - 1
+        self.grid = np.pad(g, 1)[top + 1:rows[-1] + 3, left + 1:cols[-1] + 3]  # 산 칸 둘레에 정확히 1칸 여백
+        self.x0 += int(left); self.y0 += int(top)
+
+    def step(self, n=1):
+        for _ in range(n):
+            self._fit()
+            g = self.grid.view(np.uint8)
+            p = np.pad(g, 1)
+            h, w = g.shape
+            nb = (p[:h, :w] + p[:h, 1:w + 1] + p[:h, 2:] + p[1:h + 1, :w] + p[1:h + 1, 2:]
+                  + p[2:, :w] + p[2:, 1:w + 1] + p[2:, 2:])
+            self.grid = np.where(self.grid, self.survive[nb], self.birth[nb])
+            self.generation += 1
+
+    def cells(self):
+        ys, xs = np.nonzero(self.grid)
+        return np.stack([xs + self.x0, ys + self.y0], 1)
+
+    def bbox(self):
+        rows, cols = np.flatnonzero(self.grid.any(1)), np.flatnonzero(self.grid.any(0))
+        if not len(rows): return None
+        return self.x0 + cols[0], self.y0 + rows[0], self.x0 + cols[-1] + 1, self.y0 + rows[-1] + 1
+
+    def size(self):
+        return max(self.grid.shape)
+
+    def density(self, x0, y0, bw, bh, cols, rows):
+        """(x0, y0) 에서 bw x bh 칸씩 cols x rows 블록의 산 칸 비율."""
+        out = np.zeros((rows * bh, cols * bw))
+        gx0, gy0 = x0 - self.x0, y0 - self.y0
+        sy0, sx0 = max(gy0, 0), max(gx0, 0)
+        sy1, sx1 = min(gy0 + rows * bh, self.grid.shape[0]), min(gx0 + cols * bw, self.grid.shape[1])
+        if sy1 > sy0 and sx1 > sx0:
+            out[sy0 - gy0:sy1 - gy0, sx0 - gx0:sx1 - gx0] = self.grid[sy0:sy1, sx0:sx1]
+        return out.reshape(rows, bh, cols, bw).mean((1, 3))
+
+
+# --- [HashLife] ---
+class _Node:
+    __slots__ = ("k", "a", "b", "c", "d", "n")  # a b / c d = 왼위 오위 / 왼아래 오아래
+
+    def __init__(self, k, a, b, c, d, n):
+        self.k, self.a, self.b, self.c, self.d, self.n = k, a, b, c, d, n
+
+
+class HashLife:
+    OFF = _Node(0, None, None, None, None, 0)
+    ON = _Node(0, None, None, None, None, 1)
+
+    def __init__(self, cells, rule=CONWAY, max_nodes=2_000_000):
+        self.rule = rule
+        self.max_nodes = max_nodes
+        self._join, self._succ, self._zero = {}, {}, {0: self.OFF}
+        self.root, self.x0, self.y0 = self._build(np.asarray(cells, dtype=np.int64).reshape(-1, 2))
+        self.generation = 0
+
+    # 노드 만들기 (같은 네 자식이면 같은 노드)
+    def join(self, a, b, c, d):
+        key = (a, b, c, d)
+        node = self._join.get(key)
+        if node is None:
+            node = self._join[key] = _Node(a.k + 1, a, b, c, d, a.n + b.n + c.n + d.n)
+        return node
+
+    def zero(self, k):
+        z = self._zero.get(k)
+        if z is None:
+            s = self.zero(k - 1)
+            z = self._zero[k] = self.join(s, s, s, s)
+        return z
+
+    def _build(self, cells):
+        """산 칸 좌표 -> (루트 노드, 원점 x, 원점 y). 경계 상자를 2^k 정사각형 배열로 만든 뒤 아래에서부터 합칩니다."""
+        if not len(cells): return self.zero(3), -4, -4
+        lo = cells.min(0); span = int((cells.max(0) - lo).max()) + 1
+        k = max(3, math.ceil(math.log2(span)))
+        if (1 << k) ** 2 > MAX_CELLS: raise ValueError("패턴이 너무 큽니다.")
+        grid = np.zeros((1 << k, 1 << k), np.uint8)
+        grid[cells[:, 1] - lo[1], cells[:, 0] - lo[0]] = 1
+        nodes, ids = [self.OFF, self.ON], grid
+        for _ in range(k):
+            quads = np.stack([ids[0::2, 0::2], ids[0::2, 1::2], ids[1::2, 0::2], ids[1::2, 1::2]], -1)
+            uniq, inv = np.unique(quads.reshape(-1, 4), axis=0, return_inverse=True)
+            nodes = [self.join(nodes[a], nodes[b], nodes[c], nodes[d]) for a, b, c, d in uniq]
+            ids = inv.reshape(quads.shape[:2])
+        return nodes[ids[0, 0]], int(lo[0]), int(lo[1])
+
+    # 세대 계산
+    def _cell(self, centre, *around):
+        s = sum(x.n for x in around)
+        return self.ON if s in self.rule[1 if centre.n else 0] else self.OFF
+
+    def _life_4x4(self, m):
+        a, b, c, d = m.a, m.b, m.c, m.d
+        return self.join(
+            self._cell(a.d, a.a, a.b, b.a, a.c, b.c, c.a, c.b, d.a),
+            self._cell(b.c, a.b, b.a, b.b, a.d, b.d, c.b, d.a, d.b),
+            self._cell(c.b, a.c, a.d, b.c, c.a, d.a, c.c, c.d, d.c),
+            self._cell(d.a, a.d, b.c, b.d, c.b, d.b, c.d, d.c, d.d))
+
+    def successor(self, m, j):
+        """m (2^k 칸) 의 가운데 2^(k-1) 칸을 2^j 세대 (j <= k-2) 진행한 노드."""
+        if m.n == 0: return m.a
+        if m.k == 2: return self._life_4x4(m)
+        j = min(j, m.k - 2)
+        key = (m, j)
+        s = self._succ.get(key)
+        if s is not None: return s
+        a, b, c, d, J, S = m.a, m.b, m.c, m.d, self.join, self.successor
+        c1 = S(J(a.a, a.b, a.c, a.d), j); c2 = S(J(a.b, b.a, a.d, b.c), j); c3 = S(J(b.a, b.b, b.c, b.d), j)
+        c4 = S(J(a.c, a.d, c.a, c.b), j); c5 = S(J(a.d, b.c, c.b, d.a), j); c6 = S(J(b.c, b.d, d.a, d.b), j)
+        c7 = S(J(c.a, c.b, c.c, c.d), j); c8 = S(J(c.b, d.a, c.d, d.c), j); c9 = S(J(d.a, d.b, d.c, d.d), j)
+        if j < m.k - 2:  # 이미 2^j 세대 진행됨 -> 가운데만 모음
+            s = J(J(c1.d, c2.c, c4.b, c5.a), J(c2.d, c3.c, c5.b, c6.a),
+                  J(c4.d, c5.c, c7.b, c8.a), J(c5.d, c6.c, c8.b, c9.a))
+        else:  # 반씩 두 번 진행
+            s = J(S(J(c1, c2, c4, c5), j), S(J(c2, c3, c5, c6), j),
+                  S(J(c4, c5, c7, c8), j), S(J(c5, c6, c8, c9), j))
+        self._succ[key] = s
+        return s
+
+    def _pad(self):
+        """루트를 한 단계 키워 기존 내용을 가운데에 둡니다."""
+        r, z = self.root, self.zero(self.root.k - 1)
+        self.root = self.join(self.join(z, z, z, r.a), self.join(z, z, r.b, z),
+                              self.join(z, r.c, z, z), self.join(r.d, z, z, z))
+        half = 1 << (r.k - 1)
+        self.x0 -= half; self.y0 -= half
+
+    def _padded(self):
+        r = self.root
+        return (r.a.n == r.a.d.d.n and r.b.n == r.b.c.c.n and r.c.n == r.c.b.b.n and r.d.n == r.d.a.a.n)
+
+    def step(self, n=1):
+        """n 세대 진행 (n 의 2진수 자리마다 successor 한 번)."""
+        j = 0
+        while n:
+            if n & 1:
+                while self.root.k < j + 2 or not self._padded(): self._pad()  # 패턴이 가운데 1/4 안에 오도록
+                self._pad()
+                quarter = 1 << (self.root.k - 2)
+                self.root = self.successor(self.root, j)
+                self.x0 += quarter; self.y0 += quarter
+                self.generation += 1 << j
+            n >>= 1; j += 1
+        if len(self._join) > self.max_nodes:  # 메모 비우기 (루트는 그대로 유효)
+            self._join.clear(); self._succ.clear(); self._zero = {0: self.OFF}
+
+    @property
+    def population(self):
+        return self.root.n
+
+    def size(self):
+        b = self.bbox()
+        return 0 if b is None else max(b[2] - b[0], b[3] - b[1])
+
+    def bbox(self):
+        if self.root.n == 0: return None
+        box = self._bbox(self.root, 0, 0)
+        return box[0] + self.x0, box[1] + self.y0, box[2] + self.x0, box[3] + self.y0
+
+    def _bbox(self, node, x, y):
+        if node.n == 0: return None
+        if node.k == 0: return x, y, x + 1, y + 1
+        h = 1 << (node.k - 1)
+        boxes = [b for b in (self._bbox(node.a, x, y), self._bbox(node.b, x + h, y),
+                             self._bbox(node.c, x, y + h), self._bbox(node.d, x + h, y + h)) if b]
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+    def _count(self, node, x, y, rx0, ry0, rx1, ry1):
+        """node (원점 x, y) 안에서 [rx0, rx1) x [ry0, ry1) 의 산 칸 수."""
+        size = 1 << node.k
+        if node.n == 0 or rx1 <= x or ry1 <= y or rx0 >= x + size or ry0 >= y + size: return 0
+        if rx0 <= x and ry0 <= y and rx1 >= x + size and ry1 >= y + size: return node.n
+        h = size >> 1
+        return (self._count(node.a, x, y, rx0, ry0, rx1, ry1) + self._count(node.b, x + h, y, rx0, ry0, rx1, ry1)
+                + self._count(node.c, x, y + h, rx0, ry0, rx1, ry1) + self._count(node.d, x + h, y + h, rx0, ry0, rx1, ry1))
+
+    def density(self, x0, y0, bw, bh, cols, rows):
+        out = np.zeros((rows, cols))
+        for r in range(rows):
+            for c in range(cols):
+                bx, by = x0 + c * bw, y0 + r * bh
+                out[r, c] = self._count(self.root, self.x0, self.y0, bx, by, bx + bw, by + bh)
+        return out / (bw * bh)
+
+    def cells(self):
+        out = []
+        def walk(node, x, y):
+            if node.n == 0: return
+            if node.k == 0: out.append((x, y)); return
+            h = 1 << (node.k - 1)
+            walk(node.a, x, y); walk(node.b, x + h, y); walk(node.c, x, y + h); walk(node.d, x + h, y + h)
+        walk(self.root, self.x0, self.y0)
+        return np.asarray(out, dtype=np.int64).reshape(-1, 2)
+
+
+# --- [엔진 선택] ---
+class Life:
+    """작은 판은 DenseLife 로, 커지거나 크게 건너뛰면 HashLife 로 진행합니다."""
+
+    def __init__(self, pattern, dense_max=2048, jump_min=256):
+        self.name = pattern.name
+        self.dense_max = dense_max
+        self.jump_min = jump_min
+        span = int((pattern.cells.max(0) - pattern.cells.min(0)).max()) + 1 if len(pattern) else 1
+        self.engine = DenseLife(pattern.cells, pattern.rule) if span <= dense_max else HashLife(pattern.cells, pattern.rule)
+
+    @property
+    def generation(self):
+        return self.engine.generation
+
+    @property
+    def population(self):
+        return self.engine.population
+
+    @property
+    def hashlife(self):
+        return isinstance(self.engine, HashLife)
+
+    def step(self, n=1):
+        e = self.engine
+        if isinstance(e, DenseLife) and (n >= self.jump_min or e.size() > self.dense_max):
+            gen = e.generation
+            self.engine = HashLife(e.cells(), e.rule); self.engine.generation = gen
+        self.engine.step(n)
+
+    def frame(self, cols, rows, aspect=1):
+        """산 칸 경계 상자를 cols x rows 블록으로 나눈 밀도 (블록 높이 = 너비 x aspect)."""
+        box = self.engine.bbox()
+        if box is None: return np.zeros((rows, cols))
+        w, h = box[2] - box[0], box[3] - box[1]
+        bw = max(1, math.ceil(max(w / cols, h / (rows * aspect))))
+        bh = bw * aspect
+        x0 = box[0] - (cols * bw - w) // 2  # 가운데 정렬
+        y0 = box[1] - (rows * bh - h) // 2
+        return self.engine.density(x0, y0, bw, bh, cols, rows)
+
+
+SHADES = " ░▓█"
+
+
+def to_text(density):
+    """밀도 -> 블록 글자 화면 (빈 칸 / 1/3 미만 / 2/3 미만 / 그 이상)."""
+    idx = np.digitize(density, (1e-9, 1 / 3, 2 / 3))
+    return "\n".join("".join(SHADES[i] for i in row).rstrip() for row in idx)
+
+
+def to_microbit(density):
+    """5x5 밀도 -> micro:bit IMG ('99999/90009/...'). 가장 빽빽한 칸을 밝기 9 로 맞춥니다."""
+    top = density.max()
+    if top <= 0: return "/".join(["00000"] * 5)
+    levels = np.ceil(density / top * 9).astype(int)
+    return "/".join("".join(str(v) for v in row) for row in levels)
+
+
+# --- [방 스트리밍] ---
+class LifeStreams:
+    """방마다 하나씩 Life 를 돌리며 화면을 보냅니다. emit(event, data, room)."""
+
+    def __init__(self, emit, fps=5, microbit_fps=2, max_streams=4, cols=32, rows=16, id_prefix=None):
+        self.emit = emit
+        self.id_prefix = id_prefix or f"{socket.gethostname()}:{os.getpid()}"  # life_frame id 가 워커끼리 겹치지 않도록
+        self.fps = fps
+        self.microbit_fps = microbit_fps
+        self.max_streams = max_streams
+        self.cols, self.rows = cols, rows
+        self._running = {}  # 방 -> 멈춤 Event
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def start(self, room, life, gens, step=1, microbit=True):
+        """'started' / 'busy' (방에서 이미 실행 중) / 'full' (동시 실행 수 초과)."""
+        with self._lock:
+            if room in self._running: return 'busy'
+            if len(self._running) >= self.max_streams: return 'full'
+            stop = self._running[room] = threading.Event()
+        threading.Thread(target=self._run, args=(room, life, gens, step, microbit, stop),
+                         name=f"life-{room}", daemon=True).start()
+        return 'started'
+
+    def stop(self, room):
+        with self._lock: stop = self._running.get(room)
+        if stop: stop.set()
+        return stop is not None
+
+    def __len__(self):
+        return len(self._running)
+
+    def _run(self, room, life, gens, step, microbit, stop):
+        sid = f"{self.id_prefix}-{next(self._ids)}"
+        period, last_mb, done = 1 / self.fps, 0.0, 0
+        try:
+            while True:
+                t0 = time.monotonic()
+                finished = done >= gens or life.population == 0 or stop.is_set()
+                self.emit('life_frame', {'id': sid, 'name': life.name, 'gen': life.generation, 'pop': life.population,
+                                         'engine': "hashlife" if life.hashlife else "numpy",
+                                         'frame': to_text(life.frame(self.cols, self.rows, aspect=2)), 'done': finished}, room)
+                if microbit and (finished or t0 - last_mb >= 1 / self.microbit_fps):
+                    self.emit("microbit_event", {"type": "IMG", "payload": to_microbit(life.frame(5, 5))}, None)
+                    last_mb = t0
+                if finished: return
+                life.step(min(step, gens - done))
+                done += step
+                stop.wait(max(0.0, period - (time.monotonic() - t0)))
+        except Exception as e:
+            print(f"Life Error: {e}")
+            self.emit('life_frame', {'id': sid, 'name': life.name, 'gen': life.generation, 'pop': life.population,
+                                     'frame': f"⚠️ 오류: {e}", 'done': True}, room)
+        finally:
+            with self._lock: self._running.pop(room, None)
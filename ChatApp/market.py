@@ -0,0 +1,101 @@
+"""멀티 코인 시장 엔진 (NumPy 벡터화).
+
+Market      : 모든 종목 시세를 tick 마다 한 번의 벡터 연산으로 움직입니다.
+              변동성 모델은 'gbm'(고정 변동성) 또는 'garch'(GARCH(1,1)).
+PortfolioBook: 전체 유저의 종목별 보유량을 (유저 x 종목) 행렬로 들고 있어서
+              전원 평가액을 holdings @ prices 한 번으로 계산합니다.
+"""
+import threading
+import numpy as np
+
+
+class Market:
+    def __init__(self, assets, vol, model="gbm", drift=0.0, garch=(0.05, 0.90), seed=None):
+        """assets: {종목: 초기가}, vol: {종목: 1초당 로그수익률 표준편차} 또는 공통 float."""
+        self.names = list(assets)
+        self.index = {n: i for i, n in enumerate(self.names)}
+        self.prices = np.array([float(assets[n]) for n in self.names])
+        self.sigma = np.array([vol[n] if isinstance(vol, dict) else vol for n in self.names], dtype=float)
+        self.model = model
+        self.drift = drift
+        self.alpha, self.beta = garch
+        self.var = self.sigma ** 2   # garch 조건부 분산 (1초 기준)
+        self._last_ret = np.zeros(len(self.names))
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+
+    def step(self, dt=1.0):
+        """dt 초만큼 전 종목을 한꺼번에 움직이고 새 시세 배열을 돌려줍니다."""
+        with self._lock:
+            z = self._rng.standard_normal(len(self.names))
+            if self.model == "garch":
+                # 장기 평균 분산이 sigma^2 가 되도록 omega 를 맞춘 GARCH(1,1)
+                omega = self.sigma ** 2 * (1 - self.alpha - self.beta)
+                self.var = omega + self.alpha * self._last_ret ** 2 / dt + self.beta * self.var
+                sig = np.sqrt(self.var)
+            else:
+                sig = self.sigma
+            ret = (self.drift - 0.5 * sig ** 2) * dt + sig * np.sqrt(dt) * z
+            self._last_ret = ret
+            self.prices = np.maximum(self.prices * np.exp(ret), 1.0)
+            return self.prices.copy()
+
+    def set_prices(self, prices):
+        """다른 워커(리더)가 계산한 시세를 그대로 받아 씁니다."""
+        with self._lock:
+            self.prices = np.maximum(np.asarray(prices, dtype=float), 1.0)
+
+    def price(self, name):
+        return int(self.prices[self.index[name]])
+
+    def snapshot(self):
+        """{종목: 정수 시세}"""
+        with self._lock:
+            return {n: int(p) for n, p in zip(self.names, self.prices)}
+
+
+class PortfolioBook:
+    def __init__(self, n_assets, capacity=1024):
+        self.n_assets = n_assets
+        self.index = {}                              # 닉네임 -> 행 번호
+        self.names = []
+        self.holdings = np.zeros((capacity, n_assets))
+        self.base = np.zeros(capacity, dtype=np.int64)  # 현금 + 은행
+        self._lock = threading.Lock()
+
+    def _row(self, nick):
+        i = self.index.get(nick)
+        if i is not None: return i
+        i = self.index[nick] = len(self.names)
+        self.names.append(nick)
+        if i >= len(self.base):  # 용량 2배로 확장
+            self.holdings = np.vstack([self.holdings, np.zeros_like(self.holdings)])
+            self.base = np.concatenate([self.base, np.zeros_like(self.base)])
+        return i
+
+    def set_base(self, nick, amount):
+        with self._lock:
+            i = self._row(nick)  # 확장될 수 있으므로 배열 참조보다 먼저
+            self.base[i] = amount
+
+    def add(self, nick, asset, qty):
+        with self._lock:
+            i = self._row(nick)
+            self.holdings[i, asset] += qty
+
+    def held(self, nick):
+        """종목 번호별 보유량 배열 (없으면 0 배열)."""
+        with self._lock:
+            i = self.index.get(nick)
+            return np.zeros(self.n_assets) if i is None else self.holdings[i].copy()
+
+    def value(self, nick, prices):
+        """코인 평가액 (정수)."""
+        return int(self.held(nick) @ prices)
+
+    def revalue(self, prices):
+        """전체 유저 총자산을 한 번에 계산합니다. (닉네임 리스트, 총자산 int64 배열)"""
+        with self._lock:
+            n = len(self.names)
+            totals = self.base[:n] + (self.holdings[:n] @ prices).astype(np.int64)
+            return list(self.names), totals
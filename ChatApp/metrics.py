@@ -0,0 +1,136 @@
+"""Prometheus 텍스트 형식 지표 (외부 라이브러리 없이).
+
+모듈 전역 REGISTRY 에 Counter / Histogram / Gauge 를 등록하고, /metrics 가 render() 결과를 돌려줍니다.
+값 갱신은 지표마다 락 하나만 잡는 정수/실수 덧셈이라 핫패스에 둬도 부담이 작습니다.
+
+    EVENT_SECONDS = metrics.histogram("chat_event_seconds", "Socket.IO 이벤트 처리 시간", ("event",))
+    with metrics.timer(EVENT_SECONDS, event="join"): ...
+"""
+import bisect, threading, time
+from contextlib import contextmanager
+
+# 1ms ~ 10s (지연 히스토그램 기본 버킷, 초)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _esc(v):
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names: return ""
+    return "{" + ",".join(f'{n}="{_esc(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[n] for n in self.labels)
+        with self._lock: self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels[n] for n in self.labels), 0)
+
+    def samples(self):
+        with self._lock: items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labels, k)} {v}" for k, v in items]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}  # 라벨 -> [버킷별 개수..., 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, **labels):
+        key = tuple(labels[n] for n in self.labels)
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            v = self._values.get(key)
+            if v is None: v = self._values[key] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets): v[i] += 1
+            v[-2] += seconds
+            v[-1] += 1
+
+    def samples(self):
+        with self._lock: items = [(k, list(v)) for k, v in self._values.items()]
+        out = []
+        for key, v in items:
+            acc = 0
+            for le, n in zip(self.buckets, v):
+                acc += n
+                out.append(f"{self.name}_bucket{_labels(self.labels + ('le',), key + (le,))} {acc}")
+            out.append(f"{self.name}_bucket{_labels(self.labels + ('le',), key + ('+Inf',))} {v[-1]}")
+            out.append(f"{self.name}_sum{_labels(self.labels, key)} {v[-2]:.6f}")
+            out.append(f"{self.name}_count{_labels(self.labels, key)} {v[-1]}")
+        return out
+
+
+class Gauge:
+    """읽을 때마다 fn() 을 불러 현재 값을 냅니다."""
+    kind = "gauge"
+
+    def __init__(self, name, help, fn):
+        self.name, self.help, self.fn = name, help, fn
+
+    def samples(self):
+        try: return [f"{self.name} {self.fn()}"]
+        except Exception: return []
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def add(self, metric):
+        with self._lock: return self._metrics.setdefault(metric.name, metric)
+
+    def render(self):
+        with self._lock: metrics = list(self._metrics.values())
+        lines = []
+        for m in metrics:
+            lines += [f"# HELP {m.name} {m.help}", f"# TYPE {m.name} {m.kind}"]
+            lines += m.samples()
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name, help, labels=()):
+    return REGISTRY.add(Counter(name, help, labels))
+
+
+def histogram(name, help, labels=(), buckets=BUCKETS):
+    return REGISTRY.add(Histogram(name, help, labels, buckets))
+
+
+def gauge(name, help, fn):
+    return REGISTRY.add(Gauge(name, help, fn))
+
+
+@contextmanager
+def timer(hist, **labels):
+    t0 = time.perf_counter()
+    try: yield
+    finally: hist.observe(time.perf_counter() - t0, **labels)
+
+
+def timed(hist, **labels):
+    """함수 실행 시간을 hist 에 기록하는 데코레이터."""
+    def wrap(fn):
+        def run(*args, **kwargs):
+            with timer(hist, **labels): return fn(*args, **kwargs)
+        run.__name__, run.__doc__ = fn.__name__, fn.__doc__
+        return run
+    return wrap
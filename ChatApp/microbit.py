@@ -0,0 +1,212 @@
+"""micro:bit 시리얼 브리지 (upload.py 가 사용).
+
+- Device : 포트 하나. 보낼 줄은 상한 있는 큐에 넣고 전용 writer 스레드가 씁니다.
+  큐 끝에 아직 안 나간 IMG 가 있으면 새 IMG 로 덮어써서 최신 화면만 보내고,
+  큐가 가득 차면 가장 오래된 줄을 버립니다. 포트가 끊기면 reconnect_s 마다 다시 엽니다.
+  on_read 를 주면 reader 스레드가 micro:bit 이 보내는 'KEY:VALUE' 줄(센서값, 버튼 등)을 읽어 넘깁니다.
+- Bridge : 여러 Device 에 이벤트를 나눠 줍니다 (data['device'] 가 있으면 그 포트만, 없으면 전부).
+- TelemetryBatcher : 읽은 값을 window_s 동안 장치별로 모아 묶음 하나로 서버에 보냅니다.
+
+포트 이름은 serial.serial_for_url 로 열므로 "COM6", "/dev/ttyACM0" 외에
+"loop://" (보낸 줄이 그대로 읽히는 가짜 포트) 로 하드웨어 없이 시험할 수 있습니다.
+"""
+import re, threading, time
+from collections import deque
+
+import serial
+
+KINDS = ("IMG", "TEXT", "BEEP")
+KEY_RE = re.compile(r"^[A-Za-z][A-Za-z0-9_]{0,15}$")
+MAX_LINE = 256  # 줄바꿈 없이 이보다 길어지면 잡음으로 보고 버림
+
+
+def encode(mtype, payload=""):
+    """micro:bit 이 읽는 한 줄 형식: 'IMG:99999/...' / 'TEXT:HELLO' / 'BEEP'"""
+    if mtype not in KINDS: raise ValueError(f"알 수 없는 micro:bit 이벤트: {mtype}")
+    return (f"{mtype}:{payload}\n" if mtype != "BEEP" else "BEEP\n").encode()
+
+
+def parse(line):
+    """micro:bit 이 보낸 한 줄 -> (키, 값) 또는 None. 'TEMP:23' -> ('TEMP', 23.0), 'BTN:A' -> ('BTN', 'A'), 'SHAKE' -> ('SHAKE', None).
+    내가 보낸 IMG/TEXT/BEEP 가 되돌아온 줄 (loop://) 과 형식이 틀린 줄은 무시합니다."""
+    key, _, value = line.strip().partition(":")
+    if not KEY_RE.match(key) or key.upper() in KINDS: return None
+    value = value.strip()[:64]
+    if not value: return key.upper(), None
+    try: return key.upper(), float(value)
+    except ValueError: return key.upper(), value
+
+
+class Device:
+    def __init__(self, port, baudrate=115200, max_queue=64, reconnect_s=2.0, settle_s=2.0, opener=serial.serial_for_url,
+                 on_read=None):
+        self.port = port
+        self.baudrate = baudrate
+        self.reconnect_s = reconnect_s
+        self.settle_s = settle_s  # 열자마자 micro:bit 이 리셋되므로 잠시 기다림 (loop:// 는 0)
+        self.opener = opener
+        self.ser = None
+        self.on_read = on_read  # on_read(포트, 키, 값)
+        self.stats = {"sent": 0, "coalesced": 0, "dropped": 0, "reconnects": 0, "read": 0}
+        self._q = deque(maxlen=max_queue)  # (종류, 줄)
+        self._cv = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"microbit-{port}", daemon=True)
+        self._thread.start()
+        self._reader = None
+        if on_read:
+            self._reader = threading.Thread(target=self._read_loop, name=f"microbit-{port}-read", daemon=True)
+            self._reader.start()
+
+    def send(self, mtype, payload=""):
+        line = encode(mtype, payload)
+        with self._cv:
+            if mtype == "IMG" and self._q and self._q[-1][0] == "IMG":
+                self._q[-1] = (mtype, line)  # 아직 안 나간 화면은 최신 것으로 교체
+                self.stats["coalesced"] += 1
+            else:
+                if len(self._q) == self._q.maxlen: self.stats["dropped"] += 1  # deque 가 가장 오래된 줄을 밀어냄
+                self._q.append((mtype, line))
+            self._cv.notify()
+
+    def pending(self):
+        with self._cv: return len(self._q)
+
+    def connected(self):
+        return self.ser is not None
+
+    # --- [writer 스레드] ---
+    def _open(self):
+        while not self._stop.is_set():
+            try:
+                ser = self.opener(self.port, baudrate=self.baudrate, timeout=0.1, write_timeout=1)
+                if self.settle_s and not self.port.startswith("loop://"): time.sleep(self.settle_s)
+                print(f"✅ micro:bit 연결 성공 ({self.port})")
+                return ser
+            except Exception as e:  # 없는 포트, 권한, 잘못된 URL 등
+                print(f"❌ micro:bit 연결 실패 ({self.port}): {e} - {self.reconnect_s}초 후 재시도")
+                self._stop.wait(self.reconnect_s)
+        return None
+
+    def _drop(self, ser, e):
+        """끊긴 포트를 닫고 writer 스레드가 다시 열게 합니다 (reader/writer 중 먼저 알아챈 쪽이 한 번만)."""
+        with self._cv:
+            if self.ser is not ser: return
+            print(f"⚠️ micro:bit 연결 끊김 ({self.port}): {e}")
+            try: ser.close()
+            except Exception: pass
+            self.ser = None
+            self.stats["reconnects"] += 1
+            self._cv.notify_all()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.ser is None:
+                self.ser = self._open(); continue
+            with self._cv:
+                while not self._q and self.ser is not None and not self._stop.is_set(): self._cv.wait()
+                if self._stop.is_set(): return
+                if self.ser is None: continue  # reader 가 끊김을 알아챔 -> 다시 열기
+                ser, item = self.ser, self._q.popleft()
+            try:
+                ser.write(item[1])
+                self.stats["sent"] += 1
+            except (serial.SerialException, OSError) as e:
+                self._drop(ser, e)
+                with self._cv:  # 다시 연결되면 이 줄부터 이어서 (더 새 화면이 기다리고 있거나 큐가 가득 차면 버림)
+                    if (item[0] == "IMG" and self._q and self._q[0][0] == "IMG") or len(self._q) == self._q.maxlen:
+                        self.stats["dropped"] += 1
+                    else: self._q.appendleft(item)
+
+    # --- [reader 스레드] ---
+    def _read_loop(self):
+        buf = b""
+        while not self._stop.is_set():
+            ser = self.ser
+            if ser is None:
+                buf = b""; self._stop.wait(0.1); continue
+            try: chunk = ser.read(ser.in_waiting or 1)  # 최대 timeout(0.1초) 동안 기다림
+            except (serial.SerialException, OSError, TypeError, AttributeError) as e:  # 닫히는 도중의 포트 포함
+                self._drop(ser, e); continue
+            if not chunk: continue
+            *lines, buf = (buf + chunk).split(b"\n")
+            if len(buf) > MAX_LINE: buf = b""
+            for line in lines:
+                r = parse(line.decode("utf-8", "replace"))
+                if r is None: continue
+                self.stats["read"] += 1
+                try: self.on_read(self.port, *r)
+                except Exception as e: print(f"micro:bit 읽기 처리 오류: {e}")
+
+    def close(self, timeout=2):
+        self._stop.set()
+        with self._cv: self._cv.notify_all()
+        self._thread.join(timeout)
+        if self._reader: self._reader.join(timeout)
+        if self.ser is not None:
+            try: self.ser.close()
+            except Exception: pass
+            self.ser = None
+
+
+class Bridge:
+    def __init__(self, ports, **opts):
+        """opts 는 Device 인자 (on_read 포함) 그대로."""
+        self.devices = {p: Device(p, **opts) for p in ports}
+
+    def dispatch(self, data):
+        """서버의 microbit_event 한 건: {type, payload, device(선택)}. 넣은 장치 수를 돌려줍니다."""
+        mtype = data.get("type")
+        if mtype not in KINDS: return 0
+        target = data.get("device")
+        devices = [self.devices[target]] if target in self.devices else [] if target else list(self.devices.values())
+        for d in devices: d.send(mtype, str(data.get("payload", "")))
+        return len(devices)
+
+    def stats(self):
+        return {p: dict(d.stats, pending=d.pending(), connected=d.connected()) for p, d in self.devices.items()}
+
+    def close(self):
+        for d in self.devices.values(): d.close()
+
+
+class TelemetryBatcher:
+    """읽은 값을 장치별로 window_s 동안 모아 send(묶음) 한 번으로 보냅니다.
+    묶음: {'device', 't' (시작 시각, epoch 초), 'window_s', 'readings': {키: [값, ...]}, 'dropped'}
+    키 하나에 max_per_key 개가 넘으면 최근 값만 남기고 버린 수를 dropped 에 셉니다."""
+
+    def __init__(self, send, window_s=0.5, max_per_key=100):
+        self.send = send
+        self.window_s = window_s
+        self.max_per_key = max_per_key
+        self._batches = {}  # 장치 -> 묶음
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="microbit-telemetry", daemon=True)
+        self._thread.start()
+
+    def add(self, device, key, value):
+        with self._lock:
+            b = self._batches.get(device)
+            if b is None:
+                b = self._batches[device] = {'device': device, 't': round(time.time(), 3), 'window_s': self.window_s,
+                                             'readings': {}, 'dropped': 0}
+            vals = b['readings'].setdefault(key, deque(maxlen=self.max_per_key))
+            if len(vals) == vals.maxlen: b['dropped'] += 1
+            vals.append(value)
+
+    def flush(self):
+        with self._lock:
+            batches, self._batches = list(self._batches.values()), {}
+        for b in batches:
+            b['readings'] = {k: list(v) for k, v in b['readings'].items()}
+            try: self.send(b)
+            except Exception as e: print(f"micro:bit 측정값 전송 실패: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.window_s): self.flush()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(self.window_s + 1)
+        self.flush()
@@ -0,0 +1,60 @@
+"""!무한뇌절 중앙 스케줄러 (타이머 휠).
+
+루프마다 스레드를 만들지 않고, 스레드 하나가 tick 마다 휠을 한 칸씩 돌면서
+그 칸에 걸린 닉네임들을 한꺼번에 on_fire(nicks) 로 넘깁니다.
+각 루프는 같은 칸에 남아 있으므로 period 초마다 한 번씩 적립됩니다.
+"""
+import threading, time
+
+
+class NoejulScheduler:
+    def __init__(self, on_fire, period=2.0, tick=0.1):
+        self.on_fire = on_fire
+        self.tick = tick
+        self._wheel = [set() for _ in range(max(1, round(period / tick)))]
+        self._slot_of = {}   # 닉네임 -> 휠 칸
+        self._cursor = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="noejul-wheel", daemon=True)
+        self._thread.start()
+
+    def start(self, nick):
+        """루프 등록. 이미 돌고 있으면 False."""
+        with self._lock:
+            if nick in self._slot_of: return False
+            slot = (self._cursor + 1) % len(self._wheel)  # 다음 tick 에 첫 적립
+            self._wheel[slot].add(nick)
+            self._slot_of[nick] = slot
+            return True
+
+    def stop(self, nick):
+        with self._lock:
+            slot = self._slot_of.pop(nick, None)
+            if slot is None: return False
+            self._wheel[slot].discard(nick)
+            return True
+
+    def get(self, nick):
+        return nick in self._slot_of
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def _run(self):
+        next_at = time.monotonic()
+        while not self._stop.is_set():
+            next_at += self.tick
+            delay = next_at - time.monotonic()
+            if delay > 0: self._stop.wait(delay)
+            else: next_at = time.monotonic()  # 밀렸으면 따라잡지 않고 다시 맞춤
+            with self._lock:
+                self._cursor = (self._cursor + 1) % len(self._wheel)
+                due = list(self._wheel[self._cursor])
+            if not due: continue
+            try: self.on_fire(due)
+            except Exception as e: print(f"Noejul Error: {e}")
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(2)
@@ -0,0 +1,73 @@
+"""방 전송 묶음(micro-batch) 발송기.
+
+broadcast 마다 접속자 전원에게 JSON 프레임을 하나씩 보내는 대신, interval 동안 쌓인 이벤트를
+방마다 'batch' 프레임 하나로 묶어 보냅니다 (접속자 한 명이 받는 프레임 수 = 주기당 최대 1개).
+- latest_only 이벤트(시세)는 아직 안 나간 이전 값을 버리고 마지막 값만 보냅니다.
+- passthrough 이벤트는 묶지 않고 바로 보냅니다 (micro:bit 브리지처럼 batch 를 모르는 클라이언트용).
+- binary=True 면 묶음을 바이너리로 보냅니다: 첫 바이트 0 = UTF-8 JSON, 1 = deflate 압축 JSON.
+  templates/index.html 의 decodeBatch() 가 같은 형식을 풉니다.
+"""
+import json, threading, zlib
+
+RAW, DEFLATE = 0, 1
+
+
+def encode(items, compress_min=512):
+    """[[event, data], ...] -> 바이너리 프레임."""
+    data = json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(data) >= compress_min:
+        packed = zlib.compress(data, 6)
+        if len(packed) < len(data): return bytes([DEFLATE]) + packed
+    return bytes([RAW]) + data
+
+
+def decode(frame):
+    if isinstance(frame, list): return frame
+    body = frame[1:] if frame[0] == RAW else zlib.decompress(frame[1:])
+    return json.loads(body)
+
+
+class Outbox:
+    def __init__(self, emit, interval_ms=50, binary=False, compress_min=512,
+                 latest_only=("price_update",), passthrough=("microbit_event",)):
+        self.emit = emit  # emit(event, data, room)
+        self.interval = interval_ms / 1000
+        self.binary = binary
+        self.compress_min = compress_min
+        self.latest_only = set(latest_only)
+        self.passthrough = set(passthrough)
+        self.stats = {"events": 0, "dropped": 0, "frames": 0}
+        self._pending = {}  # room -> [[event, data], ...]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="outbox", daemon=True)
+        self._thread.start()
+
+    def put(self, event, data, room):
+        if event in self.passthrough:
+            self.emit(event, data, room); return
+        with self._lock:
+            q = self._pending.setdefault(room, [])
+            if event in self.latest_only:
+                n = len(q)
+                q[:] = [e for e in q if e[0] != event]
+                self.stats["dropped"] += n - len(q)
+            q.append([event, data])
+            self.stats["events"] += 1
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for room, items in pending.items():
+            frame = encode(items, self.compress_min) if self.binary else items
+            try: self.emit("batch", frame, room)
+            except Exception as e: print(f"Outbox Error: {e}")
+            self.stats["frames"] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval): self.flush()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(2)
+        self.flush()
@@ -0,0 +1,46 @@
+"""샘플링 프로파일러 (PROFILER=1 일 때 /debug/profile 로 켜짐).
+
+정해진 시간 동안 hz 번/초씩 모든 스레드의 현재 스택을 찍어서 같은 스택끼리 센 다음,
+flamegraph.pl / speedscope 가 읽는 collapsed 형식("스레드;파일:함수;... 횟수")으로 돌려줍니다.
+계측 코드를 넣지 않으므로 켜져 있는 동안에만 샘플링 스레드 하나만큼의 부담이 생깁니다.
+"""
+import os, sys, threading, time
+from collections import Counter
+
+
+class SamplingProfiler:
+    def __init__(self, hz=100, max_seconds=60):
+        self.hz = hz
+        self.max_seconds = max_seconds
+        self._busy = threading.Lock()  # 한 번에 하나만
+
+    @staticmethod
+    def _stack(frame):
+        parts = []
+        while frame is not None:
+            co = frame.f_code
+            parts.append(f"{os.path.basename(co.co_filename)}:{co.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(parts))
+
+    def sample(self, seconds):
+        """seconds 동안 샘플링한 {collapsed 스택: 횟수}. 이미 다른 요청이 돌리는 중이면 None."""
+        if not self._busy.acquire(blocking=False): return None
+        try:
+            counts = Counter()
+            me = threading.get_ident()
+            names = {}
+            end = time.monotonic() + min(seconds, self.max_seconds)
+            while time.monotonic() < end:
+                for t in threading.enumerate(): names[t.ident] = t.name
+                for ident, frame in sys._current_frames().items():
+                    if ident != me: counts[f"{names.get(ident, ident)};{self._stack(frame)}"] += 1
+                time.sleep(1 / self.hz)
+            return counts
+        finally:
+            self._busy.release()
+
+    def collapsed(self, seconds, top=None):
+        counts = self.sample(seconds)
+        if counts is None: return None
+        return "".join(f"{stack} {n}\n" for stack, n in counts.most_common(top))
@@ -0,0 +1,83 @@
+"""send_msg / 업로드 속도 제한과 접속별 입력 큐 (backpressure).
+
+- RateLimiter : (닉네임, 명령 종류) 마다 토큰 버킷. 초당 rate 개씩 채워지고 burst 개까지 모입니다.
+- InboundQueues : 접속(sid)마다 처리 대기열을 max_pending 개로 제한합니다.
+  같은 접속의 메시지는 한 번에 하나씩 순서대로 처리되고, 대기열이 차면 새 메시지는 버립니다.
+"""
+import threading, time
+from collections import deque
+
+import metrics
+
+ALLOWED = metrics.counter("ratelimit_allowed_total", "속도 제한 통과", ("kind",))
+REJECTED = metrics.counter("ratelimit_rejected_total", "토큰 부족으로 거절", ("kind",))
+SHED = metrics.counter("inbound_shed_total", "접속별 입력 큐가 가득 차서 버린 메시지")
+
+
+class RateLimiter:
+    def __init__(self, quotas, prune_s=60.0):
+        """quotas: {종류: (초당 토큰, 버스트)}. 없는 종류는 제한하지 않습니다."""
+        self.quotas = quotas
+        self.prune_s = prune_s
+        self._buckets = {}  # (키, 종류) -> [토큰, 마지막 갱신 시각]
+        self._notified = {}  # 키 -> 마지막 '천천히' 안내 시각
+        self._lock = threading.Lock()
+        self._pruned = time.monotonic()
+
+    def allow(self, key, kind, cost=1.0):
+        q = self.quotas.get(kind)
+        if q is None: return True
+        rate, burst = q
+        now = time.monotonic()
+        with self._lock:
+            b = self._buckets.get((key, kind))
+            if b is None: b = self._buckets[(key, kind)] = [float(burst), now]
+            else: b[0], b[1] = min(burst, b[0] + (now - b[1]) * rate), now
+            ok = b[0] >= cost
+            if ok: b[0] -= cost
+            if now - self._pruned > self.prune_s: self._prune(now)
+        (ALLOWED if ok else REJECTED).inc(kind=kind)
+        return ok
+
+    def _prune(self, now):
+        """이미 가득 찼을 버킷은 지웁니다 (다시 만들면 가득 찬 상태라 결과가 같음)."""
+        for k, (tokens, last) in list(self._buckets.items()):
+            rate, burst = self.quotas[k[1]]
+            if tokens + (now - last) * rate >= burst: del self._buckets[k]
+        self._notified = {k: t for k, t in self._notified.items() if now - t < self.prune_s}
+        self._pruned = now
+
+    def should_notify(self, key, every=3.0):
+        """거절 안내는 키마다 every 초에 한 번만 (안내 자체가 폭주하지 않도록)."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._notified.get(key, -every) < every: return False
+            self._notified[key] = now
+            return True
+
+
+class InboundQueues:
+    def __init__(self, max_pending=8):
+        self.max_pending = max_pending
+        self._queues = {}  # sid -> deque (키가 있으면 누군가 그 접속을 처리 중)
+        self._lock = threading.Lock()
+
+    def submit(self, sid, fn):
+        """fn 을 sid 의 순서대로 실행합니다. 대기열이 가득 차면 실행하지 않고 False."""
+        with self._lock:
+            q = self._queues.get(sid)
+            if q is not None:
+                if len(q) >= self.max_pending:
+                    SHED.inc(); return False
+                q.append(fn); return True  # 처리 중인 스레드가 이어서 실행
+            q = self._queues[sid] = deque()
+        while True:
+            try: fn()
+            except Exception as e: print(f"Inbound Error: {e}")
+            with self._lock:
+                if not q:
+                    del self._queues[sid]; return True
+                fn = q.popleft()
+
+    def pending(self):
+        with self._lock: return sum(len(q) for q in self._queues.values())
@@ -0,0 +1,111 @@
+"""채팅방 목록 / 접속별 현재 방 / 방별 최근 히스토리.
+
+접속(sid)은 항상 채팅방 하나에만 들어가 있고 (기본 'main'), 방 전송은 그 방 멤버에게만 갑니다.
+시세·속보 같은 전역 이벤트는 'topic:<이름>' 방으로 나가고, 구독한 접속만 받습니다.
+방 목록은 DB(rooms)에, 멤버/구독은 이 워커 메모리에, 최근 메시지는 방마다 ChatHistory 링 버퍼에 둡니다.
+"""
+import re, threading
+
+from history import ChatHistory
+
+DEFAULT_ROOM = "main"
+TOPICS = ("prices", "news")
+NAME_RE = re.compile(r"^[\w-]{1,20}$")
+
+
+def topic_room(topic):
+    return f"topic:{topic}"
+
+
+class Rooms:
+    def __init__(self, storage, history_size=100):
+        self.db = storage
+        self.history_size = history_size
+        self._names = set()
+        self._histories = {}
+        self._room_of = {}   # sid -> 방
+        self._members = {}   # 방 -> {sid}
+        self._topics = {}    # sid -> {토픽}
+        self._lock = threading.Lock()
+
+    def init(self, conn):
+        """init_db 트랜잭션 안에서 호출."""
+        conn.execute("CREATE TABLE IF NOT EXISTS rooms (name TEXT PRIMARY KEY, owner TEXT, time TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_chats_room_id ON chats (room, id)")  # 방별 히스토리/이전 메시지
+        conn.execute("INSERT OR IGNORE INTO rooms (name, owner) VALUES (?, '시스템')", (DEFAULT_ROOM,))
+
+    # --- [방 목록] ---
+    def exists(self, name):
+        if name in self._names: return True
+        with self.db.checkout() as conn:
+            found = conn.execute("SELECT 1 FROM rooms WHERE name = ?", (name,)).fetchone() is not None
+        if found: self._names.add(name)  # 다른 워커가 만든 방도 DB 에서 확인
+        return found
+
+    def create(self, name, owner):
+        """새 방을 만들면 True, 이름이 잘못됐거나 이미 있으면 False."""
+        if not NAME_RE.match(name) or name.startswith("topic"): return False
+        with self.db.transaction() as conn:
+            created = conn.execute("INSERT OR IGNORE INTO rooms (name, owner) VALUES (?, ?)", (name, owner)).rowcount == 1
+        if created: self._names.add(name)
+        return created
+
+    def history(self, name):
+        """방 히스토리 버퍼 (처음 쓸 때 DB 에서 채움)."""
+        h = self._histories.get(name)
+        if h is not None: return h
+        with self._lock:  # 채우는 도중에 다른 스레드가 append 하지 않도록 다 채운 뒤에 등록
+            h = self._histories.get(name)
+            if h is None:
+                h = ChatHistory(self.db, self.history_size, room=name)
+                h.warm()
+                self._histories[name] = h
+            return h
+
+    # --- [멤버/구독] ---
+    def move(self, sid, room):
+        """sid 를 room 으로 옮기고 이전 방을 돌려줍니다 (없었으면 None)."""
+        with self._lock:
+            old = self._room_of.get(sid)
+            if old is not None: self._members[old].discard(sid)
+            self._room_of[sid] = room
+            self._members.setdefault(room, set()).add(sid)
+            return old
+
+    def room_of(self, sid):
+        return self._room_of.get(sid, DEFAULT_ROOM)
+
+    def subscribe(self, sid, topic, on=True):
+        """구독 상태가 바뀌었으면 True."""
+        with self._lock:
+            subs = self._topics.setdefault(sid, set())
+            if (topic in subs) == on: return False
+            subs.add(topic) if on else subs.discard(topic)
+            return True
+
+    def topics_of(self, sid):
+        return set(self._topics.get(sid, ()))
+
+    def leave(self, sid):
+        """접속 종료: 방/구독 정보를 지우고 있던 방을 돌려줍니다."""
+        with self._lock:
+            self._topics.pop(sid, None)
+            room = self._room_of.pop(sid, None)
+            if room is not None:
+                self._members[room].discard(sid)
+                if not self._members[room] and room != DEFAULT_ROOM: del self._members[room]
+            return room
+
+    def count(self, room):
+        return len(self._members.get(room, ()))
+
+    def listing(self, limit=10):
+        """[(방, 이 워커의 접속 수)] 접속 많은 순, 남는 자리는 최근 만든 빈 방으로 채웁니다."""
+        with self._lock:
+            counts = {r: len(m) for r, m in self._members.items() if m}
+        top = sorted(counts.items(), key=lambda x: -x[1])[:limit]
+        if len(top) < limit:
+            with self.db.checkout() as conn:
+                for (name,) in conn.execute("SELECT name FROM rooms ORDER BY time DESC LIMIT ?", (limit,)):
+                    if name not in counts and len(top) < limit: top.append((name, 0))
+        return top
@@ -0,0 +1,76 @@
+"""채팅 전문 검색 (FTS5) + 방/닉네임/기간 필터 + keyset 페이지네이션.
+
+chats_fts 는 chats 를 내용 테이블로 쓰는 외부 콘텐츠 FTS5 인덱스이고, 트리거로 chats 와 같이 갱신됩니다.
+한국어는 조사가 붙어 띄어쓰기 단위 토큰으로는 잘 안 찾아지므로 trigram 토크나이저(부분 문자열 검색)를 씁니다.
+trigram 은 3글자 이상만 인덱스를 타므로, 더 짧은 검색어나 FTS5 가 없는 SQLite 에서는 LIKE 로 찾습니다.
+결과는 항상 id 내림차순(최신순)이고, 다음 페이지는 마지막 id 를 before 로 넘겨 이어서 읽습니다.
+chats.time 은 id 와 같은 순서로 늘어나므로 (ChatWriter 가 함께 매김) 기간 조건은 time 인덱스로 찾은
+id 범위로도 걸어서, 수백만 행에서도 id 역순 스캔이 기간 밖을 훑지 않게 합니다 (경계는 1분 여유).
+"""
+import sqlite3
+
+SCHEMA = (
+    "CREATE INDEX IF NOT EXISTS idx_chats_nickname_id ON chats (nickname, id)",
+    "CREATE INDEX IF NOT EXISTS idx_chats_time ON chats (time)",
+)
+FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS chats_fts USING fts5(msg, content='chats', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS chats_fts_ai AFTER INSERT ON chats BEGIN"
+    " INSERT INTO chats_fts (rowid, msg) VALUES (new.id, new.msg); END",
+    "CREATE TRIGGER IF NOT EXISTS chats_fts_ad AFTER DELETE ON chats BEGIN"
+    " INSERT INTO chats_fts (chats_fts, rowid, msg) VALUES ('delete', old.id, old.msg); END",
+    "CREATE TRIGGER IF NOT EXISTS chats_fts_au AFTER UPDATE OF msg ON chats BEGIN"
+    " INSERT INTO chats_fts (chats_fts, rowid, msg) VALUES ('delete', old.id, old.msg);"
+    " INSERT INTO chats_fts (rowid, msg) VALUES (new.id, new.msg); END",
+)
+COLUMNS = "c.id, c.nickname, c.msg, c.type, c.rank, c.time, c.room"
+ID_AT = "(SELECT id FROM chats WHERE time >= datetime(?, ?) ORDER BY time LIMIT 1)"  # 그 시각 이후 첫 행 id
+
+
+class ChatSearch:
+    def __init__(self, storage):
+        self.db = storage
+        self.fts = False
+
+    def init(self, conn):
+        """init_db 트랜잭션 안에서 호출: 인덱스/트리거를 만들고, FTS 인덱스가 새로 생겼으면 기존 행으로 채웁니다."""
+        for sql in SCHEMA: conn.execute(sql)
+        existed = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'chats_fts'").fetchone()
+        try:
+            for sql in FTS_SCHEMA: conn.execute(sql)
+        except sqlite3.OperationalError as e:  # FTS5/trigram 미지원 빌드
+            print(f"Search: FTS5 사용 불가, LIKE 검색으로 대체 ({e})")
+            return
+        if not existed: conn.execute("INSERT INTO chats_fts (chats_fts) VALUES ('rebuild')")
+        self.fts = True
+
+    def search(self, text=None, nickname=None, since=None, until=None, before=None, limit=20, room=None):
+        """(결과 목록(최신순), 다음 페이지 before 또는 None). since/until 은 'YYYY-MM-DD[ HH:MM:SS]' (UTC).
+        room 을 주면 그 채팅방 메시지만 ((room, id) 인덱스)."""
+        where, params = [], []
+        text = (text or "").strip()
+        if text and self.fts and len(text) >= 3:
+            src = "chats_fts f JOIN chats c ON c.id = f.rowid"
+            where.append("chats_fts MATCH ?"); params.append('"' + text.replace('"', '""') + '"')
+            key = "f.rowid"
+        else:
+            src, key = "chats c", "c.id"
+            if text:
+                where.append("c.msg LIKE ? ESCAPE '\\'")
+                params.append("%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if before is not None: where.append(f"{key} < ?"); params.append(int(before))
+        if nickname: where.append("c.nickname = ?"); params.append(nickname)
+        if room: where.append("c.room = ?"); params.append(room)
+        if since:
+            where.append("c.time >= ?"); params.append(since)
+            where.append(f"{key} >= coalesce({ID_AT}, 0)"); params += [since, "-60 seconds"]
+        if until:
+            where.append("c.time < ?"); params.append(until)
+            where.append(f"{key} < coalesce({ID_AT}, 9223372036854775807)"); params += [until, "+60 seconds"]
+        sql = (f"SELECT {COLUMNS} FROM {src}" + (" WHERE " + " AND ".join(where) if where else "")
+               + f" ORDER BY {key} DESC LIMIT ?")
+        with self.db.checkout() as conn:
+            rows = [dict(r) for r in conn.execute(sql, params + [limit + 1]).fetchall()]
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return rows, (rows[-1]["id"] if more else None)
@@ -0,0 +1,129 @@
+"""멀티버스 제국 SQLite 저장소 계층.
+
+크기가 정해진 커넥션 풀에서 커넥션을 빌려 쓰고 돌려주며(WAL + busy_timeout),
+sqlite3 내장 statement 캐시로 같은 SQL 은 한 번만 준비(prepare)합니다.
+모든 execute 시간과 쓰기 락(BEGIN IMMEDIATE) 대기는 metrics 로 집계됩니다.
+"""
+import queue, sqlite3, threading, time
+from contextlib import contextmanager
+
+import metrics
+
+QUERY_SECONDS = metrics.histogram("sqlite_query_seconds", "SQLite execute 시간 (SELECT 는 첫 행까지)", ("op",))
+LOCK_WAIT_SECONDS = metrics.histogram("sqlite_lock_wait_seconds", "BEGIN IMMEDIATE 쓰기 락 획득 대기 시간")
+LOCK_WAITS = metrics.counter("sqlite_lock_waits_total", "쓰기 락을 1ms 이상 기다린 트랜잭션 수")
+LOCK_ERRORS = metrics.counter("sqlite_lock_errors_total", "busy_timeout 을 넘겨 실패한 문 (database is locked)")
+
+# 커넥션을 열 때마다 적용되는 PRAGMA (journal_mode=WAL 은 DB 파일에 영구 저장됨)
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",   # WAL 에서는 NORMAL 로도 커밋 내구성 충분
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",     # 약 8MB 페이지 캐시
+)
+
+
+def _timed(fn):
+    def run(self, sql, *args):
+        t0 = time.perf_counter()
+        try: return fn(self, sql, *args)
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e): LOCK_ERRORS.inc()
+            raise
+        finally:
+            QUERY_SECONDS.observe(time.perf_counter() - t0, op=sql.lstrip()[:8].split()[0].upper())
+    return run
+
+
+class _TimedConnection(sqlite3.Connection):
+    execute = _timed(sqlite3.Connection.execute)
+    executemany = _timed(sqlite3.Connection.executemany)
+    depth = 0  # 이 커넥션에서 열려 있는 transaction() 중첩 깊이
+
+
+class Storage:
+    """크기가 정해진 커넥션 풀. checkout()/transaction() 은 풀에서 커넥션을 빌렸다가 끝나면 돌려주고,
+    같은 스레드 안의 중첩 호출은 이미 빌린 커넥션을 그대로 씁니다.
+    (threading 모드는 이벤트/요청마다 새 스레드라 스레드별 커넥션은 이벤트마다 새로 연결하게 됨)"""
+
+    def __init__(self, path, busy_timeout_ms=5000, cached_statements=256, pool_size=16):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self.pool_size = pool_size
+        self._idle = queue.LifoQueue()  # 쉬는 커넥션 (None 은 아직 안 연 자리) - 최근에 쓴 것부터 다시 빌려줌
+        for _ in range(pool_size): self._idle.put(None)
+        self._held = threading.local()  # 현재 스레드가 빌리고 있는 커넥션 (중첩 호출용)
+        self._lock = threading.Lock()
+        self._conns = []  # 연 커넥션 전부 - close() 용
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None,
+                               check_same_thread=False, cached_statements=self.cached_statements,
+                               factory=_TimedConnection)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        for p in PRAGMAS: conn.execute(p)
+        with self._lock: self._conns.append(conn)
+        return conn
+
+    @contextmanager
+    def _borrow(self):
+        conn = getattr(self._held, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+        try: conn = self._idle.get(timeout=self.busy_timeout_ms / 1000)
+        except queue.Empty:
+            LOCK_ERRORS.inc()
+            raise sqlite3.OperationalError(f"connection pool exhausted ({self.pool_size})") from None
+        try:
+            if conn is None: conn = self._connect()
+        except BaseException:
+            self._idle.put(None)
+            raise
+        self._held.conn = conn
+        try: yield conn
+        finally:
+            self._held.conn = None
+            self._idle.put(conn)
+
+    @contextmanager
+    def checkout(self):
+        """풀에서 커넥션을 빌려줍니다 (autocommit, 읽기/단일 쓰기용)."""
+        with self._borrow() as conn: yield conn
+
+    @contextmanager
+    def transaction(self):
+        """BEGIN IMMEDIATE ~ COMMIT. 중첩 호출 시 가장 바깥 트랜잭션에 합쳐집니다."""
+        with self._borrow() as conn:
+            if conn.depth:
+                conn.depth += 1
+                try: yield conn
+                finally: conn.depth -= 1
+                return
+            t0 = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            waited = time.perf_counter() - t0
+            LOCK_WAIT_SECONDS.observe(waited)
+            if waited >= 0.001: LOCK_WAITS.inc()
+            conn.depth = 1
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+            finally:
+                conn.depth = 0
+
+    def close(self):
+        """열어 둔 커넥션을 모두 닫고 풀을 비웁니다 (서버 종료 시)."""
+        with self._lock:
+            for c in self._conns:
+                try: c.close()
+                except sqlite3.Error: pass
+            self._conns = []
+            self._idle = queue.LifoQueue()
+            for _ in range(self.pool_size): self._idle.put(None)
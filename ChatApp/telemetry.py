@@ -0,0 +1,64 @@
+"""micro:bit 측정값 집계 (upload.py 브리지가 보내는 'microbit_telemetry' 묶음).
+
+브리지는 장치별로 0.5초치 측정값을 한 묶음으로 보내고, 서버는 묶음을 받을 때마다 방/장치별 요약에 더하기만 합니다.
+방에는 drain() 주기마다 바뀐 방에만 요약 한 프레임('microbit_telemetry')을 보내므로
+측정값이 아무리 많아도 방 전송 수는 (방 수 x 주기) 로 고정됩니다.
+- 숫자 값(TEMP:23) : 개수, 최소, 최대, 평균, 마지막 값
+- 문자/빈 값(BTN:A, SHAKE) : 값별 횟수
+"""
+import threading, time
+
+import metrics
+
+READINGS = metrics.counter("microbit_readings_total", "micro:bit 에서 받은 측정값 수")
+BATCHES = metrics.counter("microbit_batches_total", "micro:bit 브리지에서 받은 측정값 묶음 수")
+
+MAX_KEYS = 32         # 묶음 하나에서 받는 키 수
+MAX_VALUES = 500      # 키 하나에서 받는 값 수
+MAX_DEVICES = 16      # 방 하나에 보여주는 장치 수
+
+
+class TelemetryBoard:
+    def __init__(self):
+        self._rooms = {}  # 방 -> {장치: {키: 요약}}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def add(self, room, batch):
+        """묶음 하나를 방 요약에 더합니다. 받은 측정값 수를 돌려줍니다."""
+        device = str(batch.get('device', '?'))[:40]
+        readings = batch.get('readings') or {}
+        if not isinstance(readings, dict): return 0
+        n = 0
+        with self._lock:
+            devices = self._rooms.setdefault(room, {})
+            if device not in devices and len(devices) >= MAX_DEVICES: return 0
+            stats = devices.setdefault(device, {})
+            for key, values in list(readings.items())[:MAX_KEYS]:
+                if not isinstance(values, list): continue
+                s = stats.setdefault(str(key)[:16], {})
+                for v in values[:MAX_VALUES]:
+                    if isinstance(v, (int, float)) and not isinstance(v, bool):
+                        if 'n' not in s: s.update(n=0, sum=0.0, min=v, max=v)
+                        s['n'] += 1; s['sum'] += v; s['last'] = v
+                        s['min'], s['max'] = min(s['min'], v), max(s['max'], v)
+                    else:
+                        counts = s.setdefault('counts', {})
+                        label = "" if v is None else str(v)[:32]
+                        counts[label] = counts.get(label, 0) + 1
+                    n += 1
+            if n: self._dirty.add(room)
+        BATCHES.inc(); READINGS.inc(n)
+        return n
+
+    def drain(self):
+        """[(방, 요약)] - 지난 drain 이후 값이 들어온 방만. 요약은 비우고 다음 주기를 새로 셉니다."""
+        with self._lock:
+            out = [(room, self._rooms.pop(room, {})) for room in self._dirty]
+            self._dirty.clear()
+        now = round(time.time(), 3)
+        return [(room, {'t': now, 'devices': [
+            {'device': dev, 'sensors': {k: ({'n': s['n'], 'min': s['min'], 'max': s['max'], 'avg': round(s['sum'] / s['n'], 3),
+                                            'last': s['last']} if 'n' in s else {'counts': s.get('counts', {})})
+                                        for k, s in stats.items()}}
+            for dev, stats in devices.items()]}) for room, devices in out]
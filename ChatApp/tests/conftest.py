@@ -0,0 +1,25 @@
+"""ChatApp 모듈 테스트 공통 설정.
+
+서버 모듈들은 ChatApp 폴더 안에서 서로 이름으로 import 하므로 (import metrics 등) 그 폴더를 경로에 넣습니다.
+"""
+import os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import Storage  # noqa: E402
+
+USERS_SQL = "CREATE TABLE IF NOT EXISTS users (nickname TEXT PRIMARY KEY, money INTEGER DEFAULT 1000, bank_money INTEGER DEFAULT 0, btc_amount REAL DEFAULT 0)"
+CHATS_SQL = ("CREATE TABLE IF NOT EXISTS chats (id INTEGER PRIMARY KEY AUTOINCREMENT, nickname TEXT, msg TEXT, type TEXT, rank TEXT,"
+             " time TIMESTAMP DEFAULT CURRENT_TIMESTAMP, room TEXT NOT NULL DEFAULT 'main')")
+
+
+@pytest.fixture
+def db(tmp_path):
+    """임시 파일 DB (users, chats 테이블 - 서버 init_db 와 같은 스키마)."""
+    storage = Storage(str(tmp_path / "test.sqlite"))
+    with storage.transaction() as conn:
+        conn.execute(USERS_SQL)
+        conn.execute(CHATS_SQL)
+    return storage
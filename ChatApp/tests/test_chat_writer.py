@@ -0,0 +1,50 @@
+from backplane import LocalBackplane
+from chat_writer import ChatWriter
+
+
+def rows(db):
+    with db.checkout() as conn:
+        return [tuple(r) for r in conn.execute("SELECT id, nickname, msg FROM chats ORDER BY id")]
+
+
+def test_flush_commits_queued_rows_with_issued_ids(db):
+    w = ChatWriter(db, batch_size=100, flush_ms=10_000)
+    ids = [w.write("a", f"m{i}", "chat", "평민") for i in range(5)]
+    assert w.flush(5)
+    assert rows(db) == [(mid, "a", f"m{i}") for i, mid in enumerate(ids)]
+    w.close()
+
+
+def test_shared_allocator_keeps_ids_unique_across_workers(db):
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO chats (id, nickname, msg) VALUES (7, 'old', 'x')")
+    bp = LocalBackplane()
+    w1, w2 = (ChatWriter(db, flush_ms=5, allocate=lambda floor: bp.incr('chat_id', floor)) for _ in range(2))
+    ids = [w.write("a", "m", "chat", "평민") for _ in range(10) for w in (w1, w2)]
+    assert len(set(ids)) == 20 and min(ids) == 8
+    assert w1.flush(5) and w2.flush(5)
+    assert len(rows(db)) == 21
+    w1.close(); w2.close()
+
+
+def test_writers_without_shared_allocator_do_not_collide(db):
+    w1, w2 = ChatWriter(db, sync=True), ChatWriter(db, batch_size=100, flush_ms=10_000)
+    ids = [w.write("a", f"m{i}", "chat", "평민") for i in range(3) for w in (w1, w2)]
+    assert len(set(ids)) == 6
+    assert w2.flush(5)
+    assert sorted(i for i, _, _ in rows(db)) == sorted(ids)
+    w2.close()
+
+
+def test_stale_allocator_collision_keeps_ids_and_reseeds(db):
+    bp = LocalBackplane()
+    w = ChatWriter(db, batch_size=100, flush_ms=10_000, allocate=lambda floor: bp.incr('chat_id', floor))
+    with db.transaction() as conn:  # 다른 워커가 먼저 1, 2, 10 을 기록 (이 워커의 카운터는 모름)
+        conn.executemany("INSERT INTO chats (id, nickname, msg) VALUES (?, 'other', ?)", [(1, "x1"), (2, "x2"), (10, "x10")])
+    ids = [w.write("a", f"m{i}", "chat", "평민") for i in range(3)]
+    assert ids == [1, 2, 3]
+    assert w.flush(5)
+    # 겹친 두 행은 다른 id 로 바뀌어 기록되지 않고, 나머지 행은 배치에서 살아남음
+    assert rows(db) == [(1, "other", "x1"), (2, "other", "x2"), (3, "a", "m2"), (10, "other", "x10")]
+    assert w.write("a", "next", "chat", "평민") == 11  # 하한을 다시 읽어 이후 발급은 MAX(id) 위로
+    w.close()
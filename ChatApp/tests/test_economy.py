@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+import economy
+from ledger import UserLedger
+
+HOLDINGS_SQL = "CREATE TABLE IF NOT EXISTS holdings (nickname TEXT, asset TEXT, amount REAL DEFAULT 0, PRIMARY KEY (nickname, asset))"
+
+
+@pytest.fixture
+def ledger(db):
+    with db.transaction() as conn:
+        conn.execute(HOLDINGS_SQL)
+    ledger = UserLedger(db, writeback_s=3600)
+    yield ledger
+    ledger.close()
+
+
+def db_row(db, nick):
+    with db.checkout() as conn:
+        return dict(conn.execute("SELECT money, bank_money FROM users WHERE nickname = ?", (nick,)).fetchone())
+
+
+def test_deposit_and_withdraw_return_the_amount_moved(ledger, db):
+    ledger.add("a", "money", 500)  # 아직 DB 에 안 쓴 delta 도 같은 트랜잭션에 반영
+    amt, u = economy.deposit(ledger, "a", 300)
+    assert amt == 300 and (u["money"], u["bank_money"]) == (1200, 300) and "moved" not in u
+    amt, u = economy.withdraw(ledger, "a", 100)
+    assert amt == 100 and (u["money"], u["bank_money"]) == (1300, 200)
+    assert db_row(db, "a") == {"money": 1300, "bank_money": 200}
+    assert "moved" not in ledger.get("a")
+
+
+def test_all_variants_move_the_whole_db_balance(ledger, db):
+    ledger.get("a")
+    with db.transaction() as conn:  # 캐시가 모르는 DB 직접 변경 (은행 이자 등)
+        conn.execute("UPDATE users SET money = money + 7 WHERE nickname = 'a'")
+    amt, u = economy.deposit(ledger, "a")
+    assert amt == 1007 and (u["money"], u["bank_money"]) == (0, 1007)
+    assert economy.deposit(ledger, "a") is None  # 옮길 현금 없음
+    amt, u = economy.withdraw(ledger, "a")
+    assert amt == 1007 and (u["money"], u["bank_money"]) == (1007, 0)
+    assert economy.withdraw(ledger, "a") is None
+
+
+@pytest.mark.parametrize("amt", [0, -5, 1001, 10 ** 30])
+def test_bad_amounts_are_rejected_and_leave_the_balance_unchanged(ledger, db, amt):
+    before = ledger.get("a")
+    assert economy.deposit(ledger, "a", amt) is None
+    assert economy.withdraw(ledger, "a", amt) is None
+    assert economy.buy(ledger, "a", "비트코인", amt, 100) is None
+    assert economy.wager(ledger, "a", amt, -amt) is None
+    assert ledger.get("a") == before
+    assert db_row(db, "a") == {"money": 1000, "bank_money": 0}
+    with db.checkout() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM holdings").fetchone()[0] == 0
+
+
+def test_concurrent_spending_never_goes_negative(ledger, db):
+    economy.deposit(ledger, "a", 400)  # 현금 600, 은행 400
+    ops = [lambda: economy.withdraw(ledger, "a", 300),
+           lambda: economy.buy(ledger, "a", "비트코인", 300, 100),
+           lambda: economy.wager(ledger, "a", 300, -300)]
+    results, start = [[] for _ in ops], threading.Barrier(30)
+
+    def run(i):
+        start.wait(5)
+        results[i % 3].append(ops[i % 3]())
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(30)]
+    for t in threads: t.start()
+    for t in threads: t.join(5)
+    withdrawn, bought, lost = (sum(r is not None for r in rs) for rs in results)
+    assert withdrawn == 1  # 은행 400 에서 300 은 한 번만
+    assert bought + lost == 3  # 현금 600 + 출금 300 = 900 -> 300 씩 세 번
+    u = ledger.get("a")
+    assert (u["money"], u["bank_money"]) == (0, 100)
+    assert db_row(db, "a") == {"money": 0, "bank_money": 100}
+    with db.checkout() as conn:
+        held = conn.execute("SELECT COALESCE(SUM(amount), 0) FROM holdings").fetchone()[0]
+    assert held == pytest.approx(bought * 3)
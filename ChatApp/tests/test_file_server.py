@@ -0,0 +1,58 @@
+import gzip, hashlib
+
+import pytest
+from flask import Flask
+
+from file_server import Precompressor, send_upload
+
+DATA = b"".join(b"line %05d of some compressible text\n" % i for i in range(400))
+DIGEST = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture
+def client(tmp_path):
+    root = tmp_path / "uploads"
+    root.mkdir()
+    (root / DIGEST).write_bytes(DATA)
+    pre = Precompressor(str(root))
+    pre._compress(DIGEST + ".txt")  # 백그라운드 대신 바로 압축본 생성
+    assert pre.variant(DIGEST + ".txt")
+    app = Flask(__name__)
+    app.add_url_rule("/uploads/<path:name>", "uploads", lambda name: send_upload(str(root), name, pre))
+    yield app.test_client()
+    pre.close()
+
+
+URL = f"/uploads/{DIGEST}.txt"
+
+
+def test_matching_etag_is_not_modified(client):
+    first = client.get(URL)
+    assert first.status_code == 200 and first.headers["ETag"] == f'"{DIGEST}"'
+    resp = client.get(URL, headers={"If-None-Match": first.headers["ETag"]})
+    assert resp.status_code == 304 and resp.data == b""
+    assert resp.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert client.get(URL, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_single_range_is_partial_content(client):
+    resp = client.get(URL, headers={"Range": "bytes=10-49"})
+    assert resp.status_code == 206
+    assert resp.headers["Content-Range"] == f"bytes 10-49/{len(DATA)}"
+    assert resp.data == DATA[10:50] and resp.headers["Content-Length"] == "40"
+
+
+def test_range_request_gets_the_identity_body_even_with_gzip(client):
+    resp = client.get(URL, headers={"Range": "bytes=0-99", "Accept-Encoding": "gzip"})
+    assert resp.status_code == 206 and "Content-Encoding" not in resp.headers
+    assert resp.data == DATA[:100]
+
+
+@pytest.mark.parametrize("accept, gz", [("gzip, deflate, br", True), ("br;q=1, gzip;q=0.5", True),
+                                        ("identity", False), ("gzip;q=0", False), (None, False)])
+def test_gzip_variant_only_when_accepted(client, accept, gz):
+    resp = client.get(URL, headers={"Accept-Encoding": accept} if accept else {})
+    assert resp.status_code == 200 and "Accept-Encoding" in resp.headers["Vary"]
+    assert (resp.headers.get("Content-Encoding") == "gzip") is gz
+    assert (gzip.decompress(resp.data) if gz else resp.data) == DATA
+    assert resp.headers["ETag"] == (f'"{DIGEST}-gz"' if gz else f'"{DIGEST}"')
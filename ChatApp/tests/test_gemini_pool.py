@@ -0,0 +1,33 @@
+import threading
+
+from gemini_pool import GeminiPool, FakeBackend
+
+
+def collect():
+    events, done = [], threading.Event()
+    def emit(ev, data, room):
+        events.append((ev, data, room))
+        if data.get('done'): done.set()
+    return events, done, emit
+
+
+def test_stream_ids_carry_the_worker_prefix():
+    a_events, a_done, a_emit = collect()
+    b_events, b_done, b_emit = collect()
+    a = GeminiPool(FakeBackend(), a_emit, id_prefix="w1")
+    b = GeminiPool(FakeBackend(), b_emit, id_prefix="w2")
+    try:
+        assert a.submit("n", "질문 하나", "r1") == 'ok'
+        assert b.submit("n", "질문 둘", "r1") == 'ok'
+        assert a_done.wait(5) and b_done.wait(5)
+        ids = {d['id'] for _, d, _ in a_events} | {d['id'] for _, d, _ in b_events}
+        assert ids == {"w1-1", "w2-1"}  # 두 워커의 첫 답변이 같은 말풍선으로 합쳐지지 않음
+        assert all(room == "r1" for _, _, room in a_events)
+    finally:
+        a.close(); b.close()
+
+
+def test_default_prefix_is_unique_per_process():
+    pool = GeminiPool(FakeBackend(), lambda *a: None)
+    try: assert pool.id_prefix
+    finally: pool.close()
@@ -0,0 +1,41 @@
+import random
+
+from leaderboard import Leaderboard
+
+
+def total(row):
+    return row['money'] + row['bank_money']
+
+
+def test_update_keeps_descending_order_and_ranks():
+    lb = Leaderboard(total)
+    lb.update({'nickname': 'a', 'money': 100, 'bank_money': 0})
+    lb.update({'nickname': 'b', 'money': 300, 'bank_money': 0})
+    lb.update({'nickname': 'c', 'money': 200, 'bank_money': 50})
+    assert lb.top(3) == [(1, 'b', 300), (2, 'c', 250), (3, 'a', 100)]
+    lb.update({'nickname': 'a', 'money': 1000, 'bank_money': 0})  # 자리만 옮김
+    assert lb.top(1) == [(1, 'a', 1000)]
+    assert lb.rank_of('c') == (3, 250)
+    assert lb.rank_of('없음') is None
+    assert len(lb) == 3
+
+
+def test_ties_are_ordered_by_nickname_and_pages_continue():
+    lb = Leaderboard(total)
+    for n in ('d', 'b', 'c', 'a'): lb.update({'nickname': n, 'money': 10, 'bank_money': 0})
+    assert [n for _, n, _ in lb.page(0, 2)] == ['a', 'b']
+    assert lb.page(2, 2) == [(3, 'c', 10), (4, 'd', 10)]
+
+
+def test_incremental_updates_match_full_rebuild():
+    rng = random.Random(1)
+    lb = Leaderboard(total)
+    rows = {}
+    for _ in range(500):
+        n = f"u{rng.randrange(60)}"
+        rows[n] = {'nickname': n, 'money': rng.randrange(10**6), 'bank_money': rng.randrange(1000)}
+        lb.update(rows[n])
+    full = Leaderboard(total)
+    full.rebuild(list(rows.values()))
+    assert lb.page(0, 100) == full.page(0, 100)
+    assert all(lb.rank_of(n) == full.rank_of(n) for n in rows)
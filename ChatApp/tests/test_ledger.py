@@ -0,0 +1,116 @@
+import threading, time
+
+from ledger import UserLedger
+
+
+def db_row(db, nick):
+    with db.checkout() as conn:
+        return dict(conn.execute("SELECT money, bank_money FROM users WHERE nickname = ?", (nick,)).fetchone())
+
+
+def test_add_is_written_back_on_flush(db):
+    ledger = UserLedger(db, writeback_s=3600)
+    try:
+        ledger.add("a", "money", 500)
+        ledger.add("a", "bank_money", 7)
+        assert db_row(db, "a") == {"money": 1000, "bank_money": 0}  # 아직 메모리에만
+        assert ledger.flush() == 1
+        assert db_row(db, "a") == {"money": 1500, "bank_money": 7}
+        assert ledger.flush() == 0
+    finally:
+        ledger.close()
+
+
+def test_reload_picks_up_direct_db_changes(db):
+    ledger = UserLedger(db, writeback_s=3600)
+    try:
+        ledger.add("a", "money", 100)
+        with db.transaction() as conn:
+            conn.execute("UPDATE users SET money = money + 5 WHERE nickname = 'a'")  # 은행 이자처럼 DB 에서 직접
+        ledger.reload()
+        assert ledger.get("a")["money"] == 1105  # DB 1005 + 미기록 100
+    finally:
+        ledger.close()
+
+
+def test_reload_during_flush_keeps_in_flight_delta(db):
+    class SlowLedger(UserLedger):
+        def _write(self, rows):
+            time.sleep(0.2)  # 꺼낸 delta 가 아직 커밋되지 않은 구간
+            super()._write(rows)
+
+    ledger = SlowLedger(db, writeback_s=3600)
+    try:
+        ledger.add("a", "money", 300)
+        t = threading.Thread(target=ledger.flush)
+        t.start()
+        time.sleep(0.05)
+        ledger.reload()
+        t.join()
+        assert ledger.get("a")["money"] == 1300
+        assert db_row(db, "a")["money"] == 1300
+    finally:
+        ledger.close()
+
+
+def test_eviction_writes_back_dirty_rows(db):
+    ledger = UserLedger(db, capacity=2, writeback_s=3600)
+    try:
+        for nick in ("a", "b", "c", "d"): ledger.add(nick, "money", 1)
+        assert len(ledger.cached()) <= 2 and "a" not in ledger.cached()
+        assert ledger.flush() == 4  # 내보낸 항목의 delta 도 flusher 가 기록
+        assert db_row(db, "a")["money"] == 1001
+        assert ledger.get("a")["money"] == 1001
+    finally:
+        ledger.close()
+
+
+def test_evicted_row_is_revived_with_its_unwritten_delta(db):
+    ledger = UserLedger(db, capacity=1, writeback_s=3600)
+    try:
+        ledger.add("a", "money", 5)
+        ledger.add("b", "money", 1)  # a 를 내보냄 (아직 DB 에는 안 씀)
+        assert db_row(db, "a")["money"] == 1000
+        assert ledger.get("a")["money"] == 1005
+        ledger.flush()
+        assert db_row(db, "a")["money"] == 1005
+    finally:
+        ledger.close()
+
+
+def test_slow_load_does_not_block_other_users(db):
+    entered, release = threading.Event(), threading.Event()
+
+    class SlowLedger(UserLedger):
+        def _load(self, conn, nick):
+            if nick == "slow":
+                entered.set(); release.wait(5)
+            return super()._load(conn, nick)
+
+    ledger = SlowLedger(db, writeback_s=3600)
+    try:
+        ledger.add("fast", "money", 1)
+        t = threading.Thread(target=ledger.get, args=("slow",))
+        t.start()
+        assert entered.wait(5)
+        t0 = time.monotonic()
+        assert ledger.get("fast")["money"] == 1001  # 캐시에 있는 유저
+        assert ledger.get("new")["money"] == 1000   # 처음 읽는 다른 유저
+        assert ledger.flush() == 1
+        assert time.monotonic() - t0 < 1 and t.is_alive()
+        release.set(); t.join(5)
+        assert ledger.get("slow")["money"] == 1000
+    finally:
+        release.set(); ledger.close()
+
+
+def test_refresh_applies_remote_values_and_keeps_local_delta(db):
+    ledger = UserLedger(db, writeback_s=3600)
+    try:
+        ledger.add("a", "money", 50)  # 아직 flush 하지 않은 이 워커의 변경분
+        ledger.refresh("a", {"nickname": "a", "money": 5000, "bank_money": 7})
+        assert (ledger.get("a")["money"], ledger.get("a")["bank_money"]) == (5050, 7)
+        ledger.refresh("nobody", {"money": 1})  # 캐시에 없는 유저는 무시
+        assert "nobody" not in ledger.cached()
+    finally:
+        ledger.close()
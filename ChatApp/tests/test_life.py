@@ -0,0 +1,54 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+import life  # noqa: E402
+from life import DenseLife, HashLife, Life  # noqa: E402
+
+
+def cellset(engine):
+    return set(map(tuple, engine.cells().tolist()))
+
+
+def soup(seed=7, size=24, p=0.35):
+    rng = np.random.default_rng(seed)
+    ys, xs = np.nonzero(rng.random((size, size)) < p)
+    return np.stack([xs, ys], 1)
+
+
+@pytest.mark.parametrize("name", sorted(life.BUILTIN))
+def test_hashlife_matches_dense_on_builtin_patterns(name):
+    cells = life.load(name).cells
+    dense, hashed = DenseLife(cells), HashLife(cells)
+    for n in (1, 3, 16, 100):  # 2의 거듭제곱이 아닌 점프도 (successor 여러 번)
+        dense.step(n); hashed.step(n)
+        assert cellset(hashed) == cellset(dense), (name, dense.generation)
+        assert hashed.population == dense.population and hashed.generation == dense.generation
+
+
+def test_hashlife_matches_dense_on_random_soup_with_other_rule():
+    rule = life.parse_rule("B36/S23")  # HighLife
+    dense, hashed = DenseLife(soup(), rule), HashLife(soup(), rule)
+    dense.step(150); hashed.step(150)
+    assert cellset(hashed) == cellset(dense)
+    assert hashed.bbox() == dense.bbox()
+
+
+def test_life_switches_to_hashlife_without_changing_the_result():
+    pattern = life.Pattern(soup(seed=3))
+    board, dense = Life(pattern, jump_min=64), DenseLife(pattern.cells)
+    board.step(10); dense.step(10)
+    assert not board.hashlife
+    board.step(200); dense.step(200)  # jump_min 이상 한 번에 -> HashLife 로 전환
+    assert board.hashlife and board.generation == 210
+    assert cellset(board.engine) == cellset(dense)
+
+
+def test_load_finds_files_in_dirs_and_through_lookup(tmp_path):
+    (tmp_path / "line.cells").write_text("!Name: line\nOOO\n")
+    assert life.load("line", [str(tmp_path)]).name == "line"
+    stored = tmp_path / "3f1a"  # 업로드처럼 디스크 이름이 해시인 파일
+    stored.write_text("x = 2, y = 2\n2o$2o!")
+    lookup = {"block.rle": str(stored)}.get
+    assert len(life.load("block", [], lookup=lookup)) == 4
+    assert len(life.load("../block.rle", [], lookup=lookup)) == 4  # 경로는 무시
+    with pytest.raises(FileNotFoundError): life.load("nothing", [str(tmp_path)], lookup=lookup)
@@ -0,0 +1,143 @@
+import threading, time
+
+import pytest
+
+serial = pytest.importorskip("serial")
+import microbit  # noqa: E402
+from microbit import Bridge, Device  # noqa: E402
+
+
+class FakePort:
+    """write 를 gate 로 붙잡아 둘 수 있고, fail 번째까지의 write 는 포트가 뽑힌 것처럼 실패합니다."""
+
+    def __init__(self, fail=0):
+        self.lines, self.fail, self.closed = [], fail, False
+        self.writing = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def write(self, data):
+        self.writing.set()
+        self.gate.wait(5)
+        if self.fail:
+            self.fail -= 1
+            raise serial.SerialException("unplugged")
+        self.lines.append(data)
+
+    def close(self):
+        self.closed = True
+
+
+def opener(*ports):
+    """열 때마다 ports 를 차례로 돌려주는 가짜 serial_for_url."""
+    it = iter(ports)
+    return lambda port, **kw: next(it)
+
+
+def wait_for(cond, timeout=5):
+    end = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < end, "timeout"
+        time.sleep(0.005)
+
+
+def busy_device(port, **opts):
+    """writer 가 TEXT:busy 를 쓰는 도중에 멈춰 있는 Device (그동안 보낸 줄은 큐에 쌓임)."""
+    port.gate.clear()
+    dev = Device("FAKE", opener=opener(port), settle_s=0, **opts)
+    dev.send("TEXT", "busy")
+    assert port.writing.wait(5)
+    wait_for(lambda: dev.pending() == 0)
+    return dev
+
+
+def test_unsent_images_are_coalesced_to_the_latest():
+    port = FakePort()
+    dev = busy_device(port)
+    try:
+        for i in range(5): dev.send("IMG", f"{i}")
+        dev.send("BEEP")
+        dev.send("IMG", "new")  # BEEP 뒤의 IMG 는 따로
+        assert dev.pending() == 3 and dev.stats["coalesced"] == 4
+        port.gate.set()
+        wait_for(lambda: len(port.lines) == 4)
+        assert port.lines == [b"TEXT:busy\n", b"IMG:4\n", b"BEEP\n", b"IMG:new\n"]
+    finally:
+        port.gate.set(); dev.close()
+
+
+def test_full_queue_drops_the_oldest_lines():
+    port = FakePort()
+    dev = busy_device(port, max_queue=3)
+    try:
+        for i in range(5): dev.send("TEXT", f"{i}")
+        assert dev.pending() == 3 and dev.stats["dropped"] == 2
+        port.gate.set()
+        wait_for(lambda: len(port.lines) == 4)
+        assert port.lines[1:] == [b"TEXT:2\n", b"TEXT:3\n", b"TEXT:4\n"]
+    finally:
+        port.gate.set(); dev.close()
+
+
+def test_write_error_reconnects_and_resends_the_line():
+    first, second = FakePort(fail=1), FakePort()
+    dev = Device("FAKE", opener=opener(first, second), settle_s=0, reconnect_s=0.01)
+    try:
+        dev.send("TEXT", "hello")
+        wait_for(lambda: second.lines)
+        assert first.closed and first.lines == []
+        assert second.lines == [b"TEXT:hello\n"]
+        assert dev.stats["reconnects"] == 1 and dev.connected()
+    finally:
+        dev.close()
+
+
+def test_failed_open_is_retried():
+    port = FakePort()
+    calls = []
+
+    def flaky(name, **kw):
+        calls.append(name)
+        if len(calls) < 3: raise serial.SerialException("no such port")
+        return port
+
+    dev = Device("COM99", opener=flaky, settle_s=0, reconnect_s=0.01)
+    try:
+        dev.send("BEEP")
+        wait_for(lambda: port.lines == [b"BEEP\n"])
+        assert len(calls) == 3
+    finally:
+        dev.close()
+
+
+def test_bridge_routes_by_device():
+    ports = {"A": FakePort(), "B": FakePort()}
+    bridge = Bridge(list(ports), opener=lambda name, **kw: ports[name], settle_s=0)
+    try:
+        assert bridge.dispatch({"type": "TEXT", "payload": "a", "device": "A"}) == 1
+        assert bridge.dispatch({"type": "TEXT", "payload": "all"}) == 2
+        assert bridge.dispatch({"type": "TEXT", "payload": "x", "device": "C"}) == 0  # 없는 장치
+        assert bridge.dispatch({"type": "HACK", "payload": "x"}) == 0
+        wait_for(lambda: len(ports["A"].lines) == 2 and len(ports["B"].lines) == 1)
+        assert ports["A"].lines == [b"TEXT:a\n", b"TEXT:all\n"] and ports["B"].lines == [b"TEXT:all\n"]
+    finally:
+        bridge.close()
+
+
+def test_loop_port_reads_sensor_lines_and_ignores_echoed_commands():
+    got = []
+    dev = Device("loop://", on_read=lambda port, k, v: got.append((k, v)))
+    try:
+        wait_for(dev.connected)
+        dev.send("TEXT", "HELLO")  # loop:// 는 보낸 줄이 되돌아오지만 명령 줄이라 무시
+        dev.ser.write(b"TEMP:23\nBTN:A\nSHAKE\n")
+        wait_for(lambda: len(got) == 3)
+        assert got == [("TEMP", 23.0), ("BTN", "A"), ("SHAKE", None)]
+    finally:
+        dev.close()
+
+
+def test_parse_rejects_bad_keys():
+    assert microbit.parse("not a key: 1") is None
+    assert microbit.parse("IMG:99999") is None
+    assert microbit.parse("light: 12.5 ") == ("LIGHT", 12.5)
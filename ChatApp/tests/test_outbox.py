@@ -0,0 +1,59 @@
+import outbox
+from outbox import Outbox
+
+
+def make(**opts):
+    sent = []
+    box = Outbox(lambda ev, d, room: sent.append((ev, d, room)), interval_ms=3_600_000, **opts)
+    return box, sent
+
+
+def test_latest_only_keeps_last_value_per_room():
+    box, sent = make(latest_only=("price_update",))
+    try:
+        box.put("price_update", {"p": 1}, "topic:prices")
+        box.put("message", {"msg": "a"}, "topic:prices")
+        box.put("price_update", {"p": 2}, "topic:prices")
+        box.put("price_update", {"p": 9}, "other")
+        box.flush()
+        frames = {room: d for ev, d, room in sent}
+        assert frames["topic:prices"] == [["message", {"msg": "a"}], ["price_update", {"p": 2}]]
+        assert frames["other"] == [["price_update", {"p": 9}]]  # 다른 방 값은 건드리지 않음
+        assert box.stats == {"events": 4, "dropped": 1, "frames": 2}
+    finally:
+        box.close()
+
+
+def test_other_events_are_all_kept_in_order():
+    box, sent = make()
+    try:
+        for i in range(3): box.put("message", i, "main")
+        box.flush()
+        assert sent == [("batch", [["message", 0], ["message", 1], ["message", 2]], "main")]
+        box.flush()
+        assert len(sent) == 1  # 쌓인 게 없으면 프레임도 없음
+    finally:
+        box.close()
+
+
+def test_passthrough_is_sent_immediately():
+    box, sent = make()
+    try:
+        box.put("microbit_event", {"type": "IMG"}, None)
+        assert sent == [("microbit_event", {"type": "IMG"}, None)]
+    finally:
+        box.close()
+
+
+def test_binary_frames_round_trip():
+    box, sent = make(binary=True, compress_min=64)
+    try:
+        box.put("message", "짧음", "a")
+        box.put("message", "x" * 1000, "b")
+        box.flush()
+        frames = {room: d for _, d, room in sent}
+        assert frames["a"][0] == outbox.RAW and frames["b"][0] == outbox.DEFLATE
+        assert outbox.decode(frames["b"]) == [["message", "x" * 1000]]
+        assert outbox.decode(frames["a"]) == [["message", "짧음"]]
+    finally:
+        box.close()
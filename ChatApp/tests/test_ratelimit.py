@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+import ratelimit
+from ratelimit import InboundQueues, RateLimiter
+
+
+class Clock:
+    def __init__(self): self.now = 1000.0
+    def monotonic(self): return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(ratelimit, "time", c)
+    return c
+
+
+def test_bucket_allows_burst_then_refills_at_rate(clock):
+    rl = RateLimiter({"msg": (2.0, 3)})
+    assert [rl.allow("a", "msg") for _ in range(4)] == [True, True, True, False]
+    assert rl.allow("b", "msg")  # 키마다 따로
+    clock.now += 0.5  # 0.5초 x 초당 2개 = 1개
+    assert rl.allow("a", "msg") and not rl.allow("a", "msg")
+    clock.now += 100
+    assert sum(rl.allow("a", "msg") for _ in range(10)) == 3  # 버스트 이상은 모이지 않음
+
+
+def test_unknown_kind_is_not_limited_and_full_buckets_are_pruned(clock):
+    rl = RateLimiter({"msg": (1.0, 2)}, prune_s=10)
+    assert all(rl.allow("a", "other") for _ in range(100))
+    rl.allow("a", "msg")
+    clock.now += 11
+    rl.allow("b", "msg")  # prune 주기가 지나면 다 찬 버킷 ('a') 은 지움
+    assert list(rl._buckets) == [("b", "msg")]
+
+
+def test_should_notify_once_per_interval(clock):
+    rl = RateLimiter({})
+    assert rl.should_notify("a", every=3) and not rl.should_notify("a", every=3)
+    clock.now += 3
+    assert rl.should_notify("a", every=3)
+
+
+def test_inbound_runs_in_order_and_sheds_when_full():
+    q = InboundQueues(max_pending=2)
+    gate, started, done = threading.Event(), threading.Event(), []
+
+    def first():
+        started.set(); gate.wait(5); done.append(0)
+
+    t = threading.Thread(target=q.submit, args=("s", first))
+    t.start()
+    assert started.wait(5)
+    assert q.submit("s", lambda: done.append(1)) and q.submit("s", lambda: done.append(2))
+    assert not q.submit("s", lambda: done.append(3))  # 대기열 2개가 차서 버림
+    assert q.pending() == 2
+    assert q.submit("other", lambda: done.append("o"))  # 다른 접속은 바로 실행
+    gate.set(); t.join(5)
+    assert done == ["o", 0, 1, 2] and q.pending() == 0
+
+
+def test_inbound_error_does_not_stall_the_queue():
+    q = InboundQueues()
+    done = []
+    assert q.submit("s", lambda: 1 / 0)
+    assert q.submit("s", lambda: done.append(1))
+    assert done == [1]
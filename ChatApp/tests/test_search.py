@@ -0,0 +1,55 @@
+import pytest
+
+from search import ChatSearch
+
+
+@pytest.fixture(params=[True, False], ids=["fts", "like"])
+def search(db, request):
+    s = ChatSearch(db)
+    with db.transaction() as conn:
+        s.init(conn)
+        for i in range(25):
+            conn.execute("INSERT INTO chats (nickname, msg, type, rank, time) VALUES (?, ?, 'chat', '평민', ?)",
+                         ("a" if i % 2 else "b", f"비트코인 떡상 {i}", f"2026-01-01 00:{i:02d}:00"))
+    s.fts = s.fts and request.param  # like: FTS 없는 SQLite 와 같은 경로
+    return s
+
+
+def pages(s, **kw):
+    out, before = [], None
+    while True:
+        rows, before = s.search(before=before, **kw)
+        out.append([r["id"] for r in rows])
+        if before is None: return out
+
+
+def test_pages_cover_every_match_once_newest_first(search):
+    got = pages(search, text="비트코인", limit=10)
+    assert [len(p) for p in got] == [10, 10, 5]
+    ids = [i for p in got for i in p]
+    assert ids == sorted(ids, reverse=True) and len(set(ids)) == 25
+
+
+def test_exact_multiple_of_limit_has_no_empty_extra_page(search):
+    rows, nxt = search.search("떡상", before=6, limit=5)
+    assert [r["id"] for r in rows] == [5, 4, 3, 2, 1] and nxt is None
+
+
+def test_filters_combine_with_paging(search):
+    got = pages(search, text="떡상", nickname="a", since="2026-01-01 00:05:00", until="2026-01-01 00:15:00", limit=2)
+    rows = [i for p in got for i in p]
+    assert rows == [14, 12, 10, 8, 6]  # id = i + 1, 닉네임 a 는 홀수 i, 시각 00:05 ≤ i분 < 00:15
+
+
+def test_short_text_and_special_characters_use_like(search):
+    assert len(search.search("상", limit=100)[0]) == 25
+    assert search.search("100%", limit=100)[0] == []
+
+
+def test_room_filter_only_returns_that_rooms_messages(search, db):
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO chats (nickname, msg, type, rank, room) VALUES ('a', '비트코인 비밀방', 'chat', '평민', 'secret')")
+    rows, _ = search.search("비트코인", room="secret")
+    assert [(r["msg"], r["room"]) for r in rows] == [("비트코인 비밀방", "secret")]
+    assert len(pages(search, text="비트코인", room="main", limit=10)) == 3  # main 25개만
+    assert len(search.search("비트코인", limit=100)[0]) == 26  # room 없으면 전체
@@ -0,0 +1,46 @@
+import glob, importlib.util, os
+
+import pytest
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def server():
+    """채팅 서버 모듈 (import 는 부작용 없음 - init_core 전이라 DB/서비스는 건드리지 않음)."""
+    pytest.importorskip("flask_socketio")
+    spec = importlib.util.spec_from_file_location("chat_server", glob.glob(os.path.join(HERE, "《*.py"))[0])
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class FakeHistory:
+    def __init__(self): self.calls = []
+    def older(self, before, limit):
+        self.calls.append(before)
+        return [{'id': before - 1}]
+
+
+class FakeRooms:
+    def __init__(self): self.hist = FakeHistory()
+    def room_of(self, sid): return "main"
+    def history(self, room): return self.hist
+
+
+@pytest.mark.parametrize("payload", [None, "12", [12], {}, {'before': None}, {'before': "abc"},
+                                     {'before': [1]}, {'before': float("inf")}])
+def test_malformed_load_older_is_ignored(server, monkeypatch, payload):
+    fake, replies = FakeRooms(), []
+    monkeypatch.setattr(server, "rooms", fake)
+    server.on_load_older("sid", payload, lambda ev, d: replies.append((ev, d)), "/")
+    assert replies == [] and fake.hist.calls == []
+
+
+def test_load_older_pages_before_the_given_id(server, monkeypatch):
+    fake, replies = FakeRooms(), []
+    monkeypatch.setattr(server, "rooms", fake)
+    server.on_load_older("sid", {'before': "42"}, lambda ev, d: replies.append((ev, d)), "/")
+    server.on_load_older("sid", {'before': 10 ** 30}, lambda ev, d: None, "/")
+    assert fake.hist.calls == [42, 2 ** 63 - 1]
+    assert replies == [('history', {'messages': [{'id': 41}], 'older': True, 'has_more': False})]
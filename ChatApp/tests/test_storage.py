@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+
+from storage import Storage
+
+
+def in_thread(fn):
+    t = threading.Thread(target=fn)
+    t.start(); t.join(5)
+
+
+def test_short_lived_threads_reuse_pooled_connections(db):
+    seen = []
+
+    def event():
+        with db.checkout() as conn:
+            seen.append(id(conn))
+            conn.execute("SELECT 1").fetchone()
+
+    for _ in range(20): in_thread(event)  # threading 모드: 이벤트마다 새 스레드
+    assert len(set(seen)) == 1 and len(db._conns) == 1
+
+
+def test_pool_is_bounded_and_blocks_until_a_connection_is_returned(tmp_path):
+    s = Storage(str(tmp_path / "p.sqlite"), busy_timeout_ms=200, pool_size=2)
+    held, release = threading.Barrier(3), threading.Event()
+
+    def hold():
+        with s.checkout():
+            held.wait(5); release.wait(5)
+
+    threads = [threading.Thread(target=hold) for _ in range(2)]
+    for t in threads: t.start()
+    held.wait(5)
+    try:
+        with pytest.raises(Exception, match="pool exhausted"):
+            with s.checkout(): pass
+    finally:
+        release.set()
+        for t in threads: t.join(5)
+    with s.checkout() as conn: assert conn.execute("SELECT 1").fetchone()[0] == 1
+    assert len(s._conns) == 2
+    s.close()
+
+
+def test_nested_calls_share_the_borrowed_connection_and_transaction(db):
+    with db.transaction() as outer:
+        outer.execute("INSERT INTO users (nickname) VALUES ('a')")
+        with db.checkout() as inner, db.transaction() as nested:
+            assert inner is outer is nested and outer.depth == 2
+        assert outer.depth == 1
+    assert outer.depth == 0
+    with pytest.raises(RuntimeError):
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO users (nickname) VALUES ('b')")
+            raise RuntimeError
+    with db.checkout() as conn:
+        assert [r[0] for r in conn.execute("SELECT nickname FROM users")] == ["a"]
@@ -0,0 +1,40 @@
+import telemetry
+from telemetry import TelemetryBoard
+
+
+def summary(board):
+    return {room: {d['device']: d['sensors'] for d in s['devices']} for room, s in board.drain()}
+
+
+def test_numeric_and_label_readings_are_aggregated_per_device():
+    board = TelemetryBoard()
+    assert board.add("main", {'device': "COM6", 'readings': {"TEMP": [20, 22.5], "BTN": ["A", "B", "A"], "SHAKE": [None]}}) == 6
+    assert board.add("main", {'device': "COM6", 'readings': {"TEMP": [18]}}) == 1
+    board.add("main", {'device': "COM7", 'readings': {"TEMP": [30]}})
+    s = summary(board)["main"]
+    assert s["COM6"]["TEMP"] == {'n': 3, 'min': 18, 'max': 22.5, 'avg': 20.167, 'last': 18}
+    assert s["COM6"]["BTN"] == {'counts': {"A": 2, "B": 1}}
+    assert s["COM6"]["SHAKE"] == {'counts': {"": 1}}
+    assert s["COM7"]["TEMP"]["n"] == 1
+
+
+def test_drain_returns_only_changed_rooms_and_starts_a_new_window():
+    board = TelemetryBoard()
+    board.add("a", {'device': "x", 'readings': {"T": [1]}})
+    board.add("b", {'device': "x", 'readings': {"T": [2]}})
+    assert set(summary(board)) == {"a", "b"}
+    assert board.drain() == []
+    board.add("a", {'device': "x", 'readings': {"T": [5]}})
+    assert summary(board) == {"a": {"x": {"T": {'n': 1, 'min': 5, 'max': 5, 'avg': 5.0, 'last': 5}}}}
+
+
+def test_malformed_batches_and_limits():
+    board = TelemetryBoard()
+    assert board.add("main", {'device': "x", 'readings': "TEMP:1"}) == 0
+    assert board.add("main", {'device': "x", 'readings': {"T": 5, "U": [True, 1]}}) == 2  # bool 은 숫자가 아님
+    assert board.add("main", {'device': "x", 'readings': {"N": list(range(telemetry.MAX_VALUES + 10))}}) == telemetry.MAX_VALUES
+    for i in range(telemetry.MAX_DEVICES): board.add("crowd", {'device': f"d{i}", 'readings': {"T": [1]}})
+    assert board.add("crowd", {'device': "extra", 'readings': {"T": [1]}}) == 0
+    s = summary(board)
+    assert s["main"]["x"]["U"] == {'n': 1, 'min': 1, 'max': 1, 'avg': 1.0, 'last': 1}  # 숫자 요약이 우선
+    assert len(s["crowd"]) == telemetry.MAX_DEVICES
@@ -0,0 +1,74 @@
+import hashlib, io, os
+
+import pytest
+from flask import Flask
+
+from file_server import send_upload
+from upload_store import UploadStore, UploadTooLarge
+
+
+class OneShot(io.RawIOBase):
+    """되감을 수 없는 업로드 스트림."""
+    def __init__(self, data): self.buf = io.BytesIO(data)
+    def readable(self): return True
+    def seekable(self): return False
+    def read(self, n=-1): return self.buf.read(n)
+
+
+@pytest.fixture
+def store(db, tmp_path):
+    with db.transaction() as conn:
+        conn.execute("CREATE TABLE files (hash TEXT PRIMARY KEY, stored_name TEXT, size INTEGER, time TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("CREATE TABLE file_names (id INTEGER PRIMARY KEY AUTOINCREMENT, hash TEXT, filename TEXT, nickname TEXT, time TIMESTAMP)")
+    root = tmp_path / "uploads"
+    root.mkdir()
+    return UploadStore(str(root), db, max_bytes=1024 * 1024)
+
+
+def test_same_bytes_with_different_extensions_are_stored_once(store, db):
+    data = os.urandom(200 * 1024)
+    digest = hashlib.sha256(data).hexdigest()
+    a = store.save(io.BytesIO(data), "a.png", "n1")
+    b = store.save(OneShot(data), "a.PNG.bin", "n2")
+    assert a == (digest + ".png", len(data), True)
+    assert b == (digest + ".bin", len(data), False)
+    assert sorted(os.listdir(store.root)) == [digest]
+    with db.checkout() as conn:
+        assert conn.execute("SELECT stored_name FROM files").fetchall()[0][0] == digest
+        assert [r[0] for r in conn.execute("SELECT filename FROM file_names ORDER BY id")] == ["a.png", "a.PNG.bin"]
+
+
+def test_too_large_upload_leaves_nothing_behind(store):
+    with pytest.raises(UploadTooLarge):
+        store.save(OneShot(b"x" * (store.max_bytes + 1)), "big.bin", "n")
+    assert os.listdir(store.root) == []
+
+
+def test_legacy_extension_named_file_is_adopted(store, db):
+    data = b"legacy" * 100
+    digest = hashlib.sha256(data).hexdigest()
+    with open(os.path.join(store.root, digest + ".txt"), "wb") as f: f.write(data)
+    with db.transaction() as conn:
+        conn.execute("INSERT INTO files (hash, stored_name, size) VALUES (?, ?, ?)", (digest, digest + ".txt", len(data)))
+    assert store.save(io.BytesIO(data), "again.txt", "n")[2] is False
+    assert os.listdir(store.root) == [digest]
+
+
+def test_download_by_any_extension_serves_the_digest_file(store):
+    data = b"hello world\n" * 10
+    name = store.save(io.BytesIO(data), "note.txt", "n")[0]
+    digest = name.split(".")[0]
+    app = Flask(__name__)
+    for url_name, mimetype in ((name, "text/plain"), (digest + ".bin", "application/octet-stream")):
+        with app.test_request_context("/uploads/" + url_name):
+            resp = send_upload(store.root, url_name)
+            resp.direct_passthrough = False
+            assert resp.status_code == 200 and resp.get_data() == data
+            assert resp.mimetype == mimetype and resp.get_etag()[0] == digest
+
+
+def test_find_returns_latest_upload_by_original_name(store):
+    assert store.find("glider.rle") is None
+    store.save(io.BytesIO(b"old"), "glider.rle", "a")
+    store.save(io.BytesIO(b"x = 3, y = 1\n3o!"), "glider.rle", "b")
+    with open(store.find("glider.rle"), "rb") as f: assert f.read() == b"x = 3, y = 1\n3o!"
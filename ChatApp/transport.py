@@ -0,0 +1,68 @@
+"""방 전송 연결점.
+
+엔진/스케줄러/라우트는 transport.broadcast() 만 부르고, 실제 전송은 서버 모드가 등록한 함수가 합니다.
+threading 모드는 Flask-SocketIO, asyncio 모드는 asgi_server 의 AsyncServer 가 use() 로 등록합니다.
+bridge() 로 백플레인을 연결하면 broadcast 는 백플레인에 발행되고, 모든 워커가 받아서 자기 접속자에게 보냅니다.
+coalesce() 를 켜면 각 워커는 받은 전송을 Outbox 에 모아 방마다 'batch' 프레임으로 보냅니다.
+방 입장/퇴장(enter/leave)도 서버 모드마다 다르므로 use() 로 함께 등록합니다.
+"""
+import metrics
+from outbox import Outbox
+
+EMITS = metrics.counter("socketio_events_total", "방 전송 이벤트 수 (묶기 전)", ("event",))
+FRAMES = metrics.counter("socketio_frames_total", "실제로 보낸 방 전송 프레임 수", ("event",))
+FANOUT = metrics.counter("socketio_fanout_total", "방 전송 프레임 x 받은 접속자 수", ("event",))
+
+_emit = None
+_room_size = None
+_enter = _leave = None
+_bp = None
+_outbox = None
+
+
+def use(fn, room_size=None, enter=None, leave=None):
+    """fn(event, data, room) 을 방 전송 함수로 등록합니다. room_size(room) 은 fan-out 집계용,
+    enter(sid, room) / leave(sid, room) 은 접속을 방에 넣고 빼는 함수."""
+    global _emit, _room_size, _enter, _leave
+    _emit, _room_size, _enter, _leave = fn, room_size, enter, leave
+
+
+def enter(sid, room):
+    if _enter: _enter(sid, room)
+
+
+def leave(sid, room):
+    if _leave: _leave(sid, room)
+
+
+def _send(event, data, room):
+    if not _emit: return
+    FRAMES.inc(event=event)
+    if _room_size: FANOUT.inc(_room_size(room), event=event)
+    _emit(event, data, room)
+
+
+def bridge(backplane):
+    """방 전송을 backplane 의 'emit' 채널로 돌립니다 (자기 자신 포함 전 워커가 수신)."""
+    global _bp
+    _bp = backplane
+    backplane.subscribe('emit', lambda m: _deliver(m['event'], m['data'], m['room']))
+
+
+def coalesce(**opts):
+    """방 전송을 Outbox(opts) 로 묶어 보냅니다."""
+    global _outbox
+    _outbox = Outbox(_send, **opts)
+    return _outbox
+
+
+def _deliver(event, data, room):
+    EMITS.inc(event=event)
+    if _outbox: _outbox.put(event, data, room)
+    else: _send(event, data, room)
+
+
+def broadcast(event, data, room='main'):
+    """room 에 전송 (room=None 이면 접속자 전체)."""
+    if _bp: _bp.publish('emit', {'event': event, 'data': data, 'room': room})
+    else: _deliver(event, data, room)
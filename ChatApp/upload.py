@@ -1,58 +1,58 @@
-import socketio
-import serial
-import time
-
-SERVER_URL = "https://crispiest-crunchingly-dani.ngrok-free.dev"
-SERIAL_PORT = "COM6"
-BAUDRATE = 115200
-
-# ======================
-# micro:bit 연결
-# ======================
-ser = None
-
-try:
-    ser = serial.Serial(SERIAL_PORT, BAUDRATE, timeout=0.1)
-    time.sleep(2)
-    print("✅ micro:bit 연결 성공")
-except Exception as e:
-    print("❌ micro:bit 연결 실패:", e)
-
-
-# ======================
-# Socket.IO 클라이언트
-# ======================
-socketio= socketio.Client()
-
-@socketio.event
-def connect():
-    print("🌐 서버 연결 성공")
-
-@socketio.event
-def disconnect():
-    print("⚠️ 서버 연결 끊김")
-
-@socketio.on("microbit_event")
-def on_microbit_event(data):
-    if not ser:
-        return
-
-    mtype = data.get("type")
-    payload = data.get("payload", "")
-
-    if mtype == "IMG":
-        ser.write(f"IMG:{payload}\n".encode())
-
-    elif mtype == "TEXT":
-        ser.write(f"TEXT:{payload}\n".encode())
-
-    elif mtype == "BEEP":
-        ser.write(b"BEEP\n")
-
-    print("➡ micro:bit 전송:", mtype, payload)
-
-print("🔌 서버 연결 중...")
-socketio.connect(SERVER_URL)
-
-while True:
-    time.sleep(1)
+import os
+import socketio
+import time
+from microbit import Bridge, TelemetryBatcher
+
+SERVER_URL = os.environ.get("SERVER_URL", "https://crispiest-crunchingly-dani.ngrok-free.dev")
+SERIAL_PORTS = os.environ.get("MICROBIT_PORTS", "COM6").split(",")  # 여러 대: "COM6,COM7" / 하드웨어 없이: "loop://"
+BAUDRATE = 115200
+MAX_QUEUE = 64       # 장치별 보낼 줄 대기열 상한 (넘치면 가장 오래된 줄부터 버림)
+RECONNECT_S = 2.0    # 시리얼이 끊기면 다시 열어보는 주기 (초)
+STATS_S = 30         # 전송 통계 출력 주기 (초)
+TELEMETRY_WINDOW_S = 0.5  # micro:bit 측정값(센서/버튼)을 모아 서버에 한 번에 보내는 주기 (초)
+MICROBIT_ROOM = os.environ.get("MICROBIT_ROOM", "main")  # 측정값을 보여줄 채팅방
+
+# ======================
+# micro:bit 연결 (장치마다 전용 writer/reader 스레드 + 자동 재연결)
+# ======================
+def send_telemetry(batch):
+    # 서버가 끊겨 있는 동안의 측정값은 버립니다 (다시 연결되면 새 값부터)
+    if sio.connected: sio.emit("microbit_telemetry", dict(batch, room=MICROBIT_ROOM))
+
+telemetry = TelemetryBatcher(send_telemetry, TELEMETRY_WINDOW_S)
+bridge = Bridge([p.strip() for p in SERIAL_PORTS if p.strip()], baudrate=BAUDRATE,
+                max_queue=MAX_QUEUE, reconnect_s=RECONNECT_S, on_read=telemetry.add)
+
+
+# ======================
+# Socket.IO 클라이언트
+# ======================
+sio = socketio.Client()  # 서버가 끊기면 자동으로 다시 연결
+
+@sio.event
+def connect():
+    print("🌐 서버 연결 성공")
+
+@sio.event
+def disconnect():
+    print("⚠️ 서버 연결 끊김")
+
+@sio.on("microbit_event")
+def on_microbit_event(data):
+    # 큐에 넣기만 하고 바로 반환 - 시리얼 쓰기는 장치별 writer 스레드가 (연속 IMG 는 마지막 화면만)
+    n = bridge.dispatch(data)
+    print("➡ micro:bit 전송 대기:", data.get("type"), data.get("payload", ""), f"({n}대)")
+
+print("🔌 서버 연결 중...")
+sio.connect(SERVER_URL)
+
+try:
+    while True:
+        time.sleep(STATS_S)
+        print("📊 micro:bit:", bridge.stats())
+except KeyboardInterrupt:
+    pass
+finally:
+    bridge.close()
+    telemetry.close()
+    sio.disconnect()
@@ -0,0 +1,85 @@
+"""내용 주소(content-addressed) 업로드 저장소.
+
+업로드 스트림을 청크 단위로 읽으면서 SHA-256 을 계산하고, 파일은 해시 이름(확장자 없음)으로 한 번만 저장합니다.
+같은 내용이 다시 올라오면 (확장자가 달라도) 디스크에 아무것도 쓰지 않고 이름 색인(file_names)에만 기록합니다.
+다운로드 주소는 <해시><확장자> 로 돌려주고, 확장자는 Content-Type 에만 쓰입니다 (file_server.resolve).
+최대 크기는 읽는 도중에 검사하므로 큰 파일을 끝까지 받지 않습니다.
+"""
+import hashlib, os, tempfile, time
+
+CHUNK = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class UploadStore:
+    def __init__(self, root, storage, max_bytes=50 * 1024 * 1024):
+        self.root = root
+        self.db = storage
+        self.max_bytes = max_bytes
+
+    def _chunks(self, stream):
+        size = 0
+        while True:
+            buf = stream.read(CHUNK)
+            if not buf: return
+            size += len(buf)
+            if size > self.max_bytes: raise UploadTooLarge(f"최대 {self.max_bytes:,} bytes")
+            yield buf
+
+    @staticmethod
+    def url_name(digest, filename):
+        ext = os.path.splitext(filename)[1].lower()[:16]
+        return digest + ext
+
+    def _present(self, digest):
+        """해시 이름 파일이 이미 있으면 True. 예전 방식(<해시>.ext)으로 저장된 파일은 해시 이름으로 옮깁니다."""
+        path = os.path.join(self.root, digest)
+        if os.path.exists(path): return True
+        with self.db.checkout() as conn:
+            row = conn.execute("SELECT stored_name FROM files WHERE hash = ?", (digest,)).fetchone()
+        old = os.path.join(self.root, row[0]) if row else None
+        if old and old != path and os.path.exists(old):
+            os.replace(old, path)
+            return True
+        return False
+
+    def find(self, filename):
+        """그 원래 이름으로 가장 최근에 올라온 파일의 디스크 경로 (없으면 None)."""
+        with self.db.checkout() as conn:
+            row = conn.execute("SELECT hash FROM file_names WHERE filename = ? ORDER BY id DESC LIMIT 1", (filename,)).fetchone()
+        if row is None or not self._present(row[0]): return None
+        return os.path.join(self.root, row[0])
+
+    def save(self, stream, filename, nickname):
+        """(다운로드 이름 <해시><확장자>, 바이트 수, 새 파일 여부) 를 돌려줍니다."""
+        h, size, tmp = hashlib.sha256(), 0, None
+        try:
+            if stream.seekable():
+                # 1차: 해시만 계산 (이미 있는 내용이면 쓰기 없이 끝)
+                for buf in self._chunks(stream):
+                    h.update(buf); size += len(buf)
+                is_new = not self._present(h.hexdigest())
+                if is_new:
+                    stream.seek(0)
+                    fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".up_")
+                    with os.fdopen(fd, "wb") as out:
+                        for buf in self._chunks(stream): out.write(buf)
+            else:
+                # 되감을 수 없는 스트림은 쓰면서 해시를 계산하고, 중복이면 임시 파일을 버립니다
+                fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".up_")
+                with os.fdopen(fd, "wb") as out:
+                    for buf in self._chunks(stream):
+                        h.update(buf); size += len(buf); out.write(buf)
+                is_new = not self._present(h.hexdigest())
+            if tmp and is_new: os.replace(tmp, os.path.join(self.root, h.hexdigest())); tmp = None
+        finally:
+            if tmp and os.path.exists(tmp): os.remove(tmp)
+        with self.db.transaction() as conn:
+            conn.execute("INSERT INTO files (hash, stored_name, size) VALUES (?, ?, ?)"
+                         " ON CONFLICT(hash) DO UPDATE SET stored_name = excluded.stored_name", (h.hexdigest(), h.hexdigest(), size))
+            conn.execute("INSERT INTO file_names (hash, filename, nickname, time) VALUES (?, ?, ?, ?)",
+                         (h.hexdigest(), filename, nickname, time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())))
+        return self.url_name(h.hexdigest(), filename), size, is_new
@@ -0,0 +1,52 @@
+"""WSGI 앱(Flask)을 ASGI HTTP 앱으로 감싸는 어댑터 (asyncio 서버 모드용).
+
+asgiref.wsgi.WsgiToAsgi 는 요청마다 CurrentThreadExecutor 를 만들어 그 스레드에서 WSGI 앱을 돌리는데,
+동시 요청이 몰리면 'CurrentThreadExecutor already quit' 로 500 을 냅니다.
+여기서는 소켓 핸들러와 같은 ThreadPoolExecutor 에서 Flask 를 직접 실행합니다.
+"""
+import asyncio, sys, tempfile
+
+
+def wsgi_to_asgi(wsgi_app, pool, spool_bytes=1024 * 1024):
+    """WSGI 앱을 pool 에서 실행하는 ASGI HTTP 앱을 돌려줍니다.
+    요청 본문은 spool_bytes 까지 메모리, 넘으면 임시 파일에 받고, 응답은 청크 단위로 내보냅니다."""
+    async def app(scope, receive, send):
+        if scope['type'] != 'http': return
+        loop = asyncio.get_running_loop()
+        body = tempfile.SpooledTemporaryFile(spool_bytes)
+        while True:
+            m = await receive()
+            body.write(m.get('body', b''))
+            if not m.get('more_body'): break
+        body.seek(0)
+        server = scope.get('server') or ('localhost', 80)
+        environ = {
+            'REQUEST_METHOD': scope['method'], 'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope['query_string'].decode('latin-1'),
+            'SERVER_NAME': server[0], 'SERVER_PORT': str(server[1] or 80),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+            'wsgi.version': (1, 0), 'wsgi.url_scheme': scope.get('scheme', 'http'), 'wsgi.input': body,
+            'wsgi.errors': sys.stderr, 'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+        }
+        for k, v in scope['headers']:
+            k, v = k.decode('latin-1').upper().replace('-', '_'), v.decode('latin-1')
+            k = k if k in ('CONTENT_TYPE', 'CONTENT_LENGTH') else 'HTTP_' + k
+            environ[k] = environ[k] + ',' + v if k in environ else v
+        started = {}
+        def start_response(status, headers, exc_info=None):
+            started['status'], started['headers'] = int(status.split()[0]), headers
+            return lambda data: None
+        try:
+            it = await loop.run_in_executor(pool, wsgi_app, environ, start_response)
+            chunks = iter(it)
+            await send({'type': 'http.response.start', 'status': started['status'],
+                        'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in started['headers']]})
+            while (chunk := await loop.run_in_executor(pool, next, chunks, None)) is not None:
+                if chunk: await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+            if hasattr(it, 'close'): await loop.run_in_executor(pool, it.close)
+        finally:
+            body.close()
+    return app
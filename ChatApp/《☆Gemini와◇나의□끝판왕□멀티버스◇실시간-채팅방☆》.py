@@ -1,130 +1,520 @@
-import sqlite3, os, time, threading, random
-from flask import Flask, render_template, request, send_from_directory
-from flask_socketio import SocketIO, emit, join_room
+import os, time, threading, random, atexit, socket
+_T_IMPORT = time.perf_counter()  # 콜드 스타트 측정 기준 (이 모듈 import 시작)
+from flask import Flask, render_template, request, g, abort
+from flask_socketio import SocketIO, emit
 from werkzeug.utils import secure_filename
+from werkzeug.middleware.proxy_fix import ProxyFix
+from storage import Storage
+from chat_writer import ChatWriter
+from ledger import UserLedger
+import economy
+from leaderboard import Leaderboard
+from rooms import Rooms, DEFAULT_ROOM, TOPICS, topic_room
+from gemini_pool import GeminiPool, GenaiBackend, FakeBackend
+from noejul import NoejulScheduler
+from upload_store import UploadStore, UploadTooLarge
+from file_server import Precompressor, send_upload
+from blob_store import BlobStore
+from search import ChatSearch
+from telemetry import TelemetryBoard
+import transport
+import backplane
+import metrics
+from profiler import SamplingProfiler
+from ratelimit import RateLimiter, InboundQueues
 
 # --- [설정 및 DB] ---
-PORT = 5001
+PORT = int(os.environ.get("PORT", 5001))  # 다중 워커는 워커마다 다른 포트
+SERVER_MODE = os.environ.get("SERVER_MODE", "threading")  # "threading" (Flask-SocketIO) / "asyncio" (ASGI)
+DEBUG = os.environ.get("FLASK_DEBUG", "1") == "1"  # 0 이면 리로더 없이 (부하 테스트/백그라운드 실행)
 UPLOAD_FOLDER = 'uploads'
 DB_FILE = "multiverse_ultimate_empire.sqlite"
-if not os.path.exists(UPLOAD_FOLDER): os.makedirs(UPLOAD_FOLDER)
+CHAT_BATCH_SIZE = 64      # 채팅 행 그룹 커밋 최대 개수
+CHAT_FLUSH_MS = 200       # 채팅 행 그룹 커밋 주기 (ms)
+CHAT_SYNC_WRITES = os.environ.get("CHAT_SYNC_WRITES") == "1"  # 1 이면 메시지마다 즉시 INSERT
+LEDGER_CAPACITY = 10000   # 메모리에 들고 있을 유저 수 (LRU)
+LEDGER_WRITEBACK_S = 2.0  # 잔액 변경분 DB 기록 주기 (초)
+HISTORY_SIZE = 100        # 방 입장 시 보내는 최근 메시지 수 (방마다 메모리 링 버퍼)
+HISTORY_PAGE = 50         # '이전 메시지 더 보기' 한 번에 읽는 수
+SEARCH_PAGE = 5           # !검색 한 번에 보여주는 결과 수 (/api/search 는 limit 파라미터, 최대 100)
+GEMINI_WORKERS = 4        # Gemini 동시 호출 수
+GEMINI_PER_USER = 1       # 유저 한 명이 동시에 걸 수 있는 질문 수
+NOEJUL_REWARD = 5000      # !무한뇌절 1회 적립금
+NOEJUL_PERIOD = 2.0       # !무한뇌절 적립 주기 (초)
+NOEJUL_LEASE_S = 10.0     # 뇌절 루프 소유 락 만료 (적립 때마다 연장 - 워커가 죽으면 이 시간 뒤 다른 워커가 다시 시작 가능)
+MARKET_ASSETS = {"비트코인": 50000000, "이더리움": 4000000, "도지코인": 200, "제국코인": 10000}  # 종목: 초기가
+MARKET_VOL = {"비트코인": 0.004, "이더리움": 0.005, "도지코인": 0.01, "제국코인": 0.008}       # 1초당 변동성
+MARKET_MODEL = "gbm"      # 변동성 모델: "gbm" (고정) / "garch"
+MARKET_TICK_S = 0.5       # 시세 tick 주기 (초)
+UPLOAD_MAX_BYTES = 50 * 1024 * 1024  # 업로드 최대 크기
+BACKPLANE_URL = os.environ.get("BACKPLANE_URL")  # 다중 워커: redis://... (없으면 프로세스 내 백플레인)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+LEADER_TTL_S = 10.0       # 리더 락 만료 (리더가 죽으면 이 시간 뒤 다른 워커가 엔진을 이어받음)
+OUTBOX_MS = 50            # 방 전송을 묶어 보내는 주기 (ms, 0 이면 이벤트마다 즉시 전송)
+OUTBOX_BINARY = os.environ.get("OUTBOX_BINARY") == "1"  # 1 이면 묶음을 바이너리(JSON/deflate)로 전송
+RATE_LIMIT = os.environ.get("RATE_LIMIT", "1") == "1"  # 0 이면 속도 제한 끔 (부하 테스트용)
+RATE_LIMITS = {"chat": (3, 8), "economy": (2, 6), "gemini": (0.1, 2), "upload": (0.2, 3), "search": (1, 4), "life": (0.2, 2)}  # 종류: (초당 허용, 연속 허용)
+PROXY_HOPS = int(os.environ.get("PROXY_HOPS", 0))  # 앞단 리버스 프록시 수 (ngrok 뒤면 1) - 그만큼 X-Forwarded-For 를 믿고 접속 IP 로 씀 (기본 0 = 끔, 켜는 쪽이 선택)
+INBOUND_QUEUE = 8         # 접속별 처리 대기 메시지 상한 (넘치면 버리고 '천천히' 안내)
+LIFE_DIR = 'patterns'     # !라이프 패턴 파일 폴더 (.rle / .life / .lif / .cells, 업로드한 파일은 올린 파일 이름으로 찾음)
+LIFE_FPS = 5              # !라이프 화면 전송 주기 (초당)
+LIFE_MICROBIT_FPS = 2     # !라이프 micro:bit 5x5 화면 전송 주기 (초당)
+LIFE_MAX_GENS = 100000    # !라이프 한 번에 진행할 수 있는 최대 세대
+LIFE_MAX_STREAMS = 4      # 동시에 돌아가는 !라이프 수 (방마다 하나)
+TELEMETRY_EMIT_S = 2.0    # micro:bit 측정값 요약을 방에 보내는 주기 (초, 측정값 개수와 무관하게 방마다 한 번)
+PROFILER = os.environ.get("PROFILER") == "1"  # 1 이면 /debug/profile?seconds=N 샘플링 프로파일러 사용 가능
+COLD_START_BUDGET_MS = 800  # import 부터 init_core 가 끝나 요청을 처리할 수 있을 때까지 허용 시간 (넘으면 시작 로그에 경고, bench.py --cold-start 로 측정)
+DB_POOL_SIZE = 16         # SQLite 커넥션 풀 크기 (동시에 DB 를 쓰는 이벤트 수 상한 - 넘으면 반납될 때까지 대기)
+db = Storage(DB_FILE, pool_size=DB_POOL_SIZE)  # 풀링 커넥션 (WAL, 처음 빌릴 때 연결)
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config['MAX_CONTENT_LENGTH'] = UPLOAD_MAX_BYTES + 1024 * 1024  # 폼 헤더 여유분
+if PROXY_HOPS: app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_HOPS)  # ngrok 뒤에서는 remote_addr 가 모두 127.0.0.1 이므로
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+transport.use(lambda ev, d, room: socketio.emit(ev, d, room=room),  # asyncio 모드에서는 asgi_server 가 교체
+              room_size=lambda room: len(socketio.server.manager.rooms.get('/', {}).get(room, ())),
+              enter=lambda sid, room: socketio.server.enter_room(sid, room, namespace='/'),
+              leave=lambda sid, room: socketio.server.leave_room(sid, room, namespace='/'))
 
-@socketio.on("microbit_event")
-def on_microbit_event(data):
-    # data 예: {type:"IMG", payload:"99999/90009/90009/90009/99999"}
-    emit("microbit_event", data, broadcast=True)
+# --- [지표] --- (/metrics 에서 Prometheus 형식으로 노출)
+EVENT_SECONDS = metrics.histogram("chat_event_seconds", "Socket.IO 이벤트 처리 시간", ("event",))
+COMMAND_SECONDS = metrics.histogram("chat_command_seconds", "send_msg 명령어별 처리 시간 (일반 채팅은 chat)", ("command",))
+HTTP_SECONDS = metrics.histogram("http_request_seconds", "HTTP 요청 처리 시간", ("endpoint", "status"))
+ENGINE_SECONDS = metrics.histogram("engine_tick_seconds", "배경 엔진 tick 처리 시간", ("engine",))
+ENGINE_ERRORS = metrics.counter("engine_errors_total", "배경 엔진 tick 오류", ("engine",))
+metrics.gauge("process_threads", "살아 있는 스레드 수", threading.active_count)
+profiler = SamplingProfiler() if PROFILER else None
+STARTUP = {}  # 시작 단계 -> 걸린 시간(초): ready (import~create_app), core (init_core), serving (import~init_core 끝), services (start_services)
+metrics.gauge("startup_ready_seconds", "모듈 import 부터 create_app 이 끝나 접속을 받을 준비까지", lambda: STARTUP['ready'])
+metrics.gauge("startup_serving_seconds", "모듈 import 부터 init_core 까지 끝나 요청을 처리할 수 있을 때까지 (예산 기준)", lambda: STARTUP['serving'])
+metrics.gauge("startup_core_seconds", "DB/장부/백플레인 준비 (init_core)", lambda: STARTUP['core'])
+metrics.gauge("startup_services_seconds", "배경 서비스 시작 (start_services, init_core 제외)", lambda: STARTUP['services'])
+
+# --- [지연 초기화] ---
+# import 만으로는 DB, 스레드, Gemini 를 건드리지 않습니다 (테스트나 다른 스크립트가 import 해도 엔진이 뜨지 않음).
+# - init_core()      : DB 스키마, 장부, 채팅 기록기, 백플레인, 시세/랭킹 - 첫 요청/이벤트 때 한 번
+# - start_services() : 리더 선출, 시세/이자/측정값 엔진 등 - create_app() 이 명시적으로 (백그라운드 스레드에서)
+# - get_gemini()     : google-genai import 와 클라이언트 - 첫 !gemini 때
+bp = leader = None  # 다중 워커 백플레인 / 엔진 리더 선출
+market = portfolios = leaderboard = ledger = chat_writer = None
+uploads = precompressed = blobs = noejul_loops = life_streams = None
+_core_lock = threading.Lock()
+_core_ready = threading.Event()
+_services_started = False
+
+def share(channel, **msg):
+    """다른 워커에 상태 변경을 알립니다."""
+    bp.publish(channel, dict(msg, origin=WORKER_ID))
+
+def on_share(channel, fn):
+    """다른 워커가 보낸 상태 변경만 처리합니다 (내 변경은 이미 반영됨)."""
+    bp.subscribe(channel, lambda m: m['origin'] != WORKER_ID and fn(m))
+
+sessions = {}  # Socket.IO sid -> 닉네임 (접속 종료 시 뇌절 루프 정리용)
+PRICES_ROOM, NEWS_ROOM = topic_room("prices"), topic_room("news")  # 시세/속보는 구독한 접속만
 
-crypto_prices = {"비트코인": 50000000}
-noejul_loops = {}
+# Gemini AI 로드 (첫 !gemini 때 - google-genai import 만 수백 ms)
+gemini = None
+_gemini_lock = threading.Lock()
+_gemini_loaded = False
 
-# Gemini AI 로드
-client = None
-try:
-    from google import genai
-    api_key = os.environ.get("GEMINI_API_KEY")
-    if api_key: client = genai.Client(api_key=api_key)
-except: pass
+def get_gemini():
+    """Gemini 워커 풀, 연결할 수 없으면 None. 처음 부를 때만 클라이언트를 만듭니다."""
+    global gemini, _gemini_loaded
+    if _gemini_loaded: return gemini
+    with _gemini_lock:
+        if _gemini_loaded: return gemini
+        client = None
+        try:
+            api_key = os.environ.get("GEMINI_API_KEY")
+            if api_key:
+                from google import genai
+                client = genai.Client(api_key=api_key)
+        except Exception as e: print(f"Gemini 로드 실패: {e}")
+        # GEMINI_FAKE=1 이면 API 키 없이 로컬 가짜 모델로 동작 (테스트용)
+        backend = GenaiBackend(client) if client else FakeBackend() if os.environ.get("GEMINI_FAKE") == "1" else None
+        if backend:
+            gemini = GeminiPool(backend, transport.broadcast, workers=GEMINI_WORKERS, per_user=GEMINI_PER_USER, id_prefix=WORKER_ID)
+            atexit.register(gemini.close)
+            metrics.gauge("gemini_pending", "처리 중이거나 대기 중인 !gemini 질문 수", gemini.pending)
+        _gemini_loaded = True
+    return gemini
+
+chat_search = ChatSearch(db)
+rooms = Rooms(db, HISTORY_SIZE)  # 방 목록(DB) + 접속별 현재 방 + 방별 최근 메시지 버퍼
 
 def init_db():
-    with sqlite3.connect(DB_FILE) as conn:
+    with db.transaction() as conn:
         conn.execute("CREATE TABLE IF NOT EXISTS users (nickname TEXT PRIMARY KEY, money INTEGER DEFAULT 1000, bank_money INTEGER DEFAULT 0, btc_amount REAL DEFAULT 0)")
-        conn.execute("CREATE TABLE IF NOT EXISTS chats (id INTEGER PRIMARY KEY AUTOINCREMENT, nickname TEXT, msg TEXT, type TEXT, rank TEXT, time TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
-init_db()
+        conn.execute("CREATE TABLE IF NOT EXISTS chats (id INTEGER PRIMARY KEY AUTOINCREMENT, nickname TEXT, msg TEXT, type TEXT, rank TEXT, time TIMESTAMP DEFAULT CURRENT_TIMESTAMP, room TEXT NOT NULL DEFAULT 'main')")
+        # 방 기능 이전에 쌓인 채팅은 모두 'main' 방으로
+        if "room" not in [c[1] for c in conn.execute("PRAGMA table_info(chats)")]:
+            conn.execute("ALTER TABLE chats ADD COLUMN room TEXT NOT NULL DEFAULT 'main'")
+        conn.execute("CREATE TABLE IF NOT EXISTS holdings (nickname TEXT, asset TEXT, amount REAL DEFAULT 0, PRIMARY KEY (nickname, asset))")
+        # 예전 users.btc_amount 보유분을 holdings 로 옮깁니다
+        conn.execute("INSERT INTO holdings SELECT nickname, '비트코인', btc_amount FROM users WHERE btc_amount > 0"
+                     " ON CONFLICT(nickname, asset) DO UPDATE SET amount = amount + excluded.amount")
+        conn.execute("UPDATE users SET btc_amount = 0 WHERE btc_amount > 0")
+        # 업로드: 내용 해시당 파일 하나 + 원래 이름 색인
+        conn.execute("CREATE TABLE IF NOT EXISTS files (hash TEXT PRIMARY KEY, stored_name TEXT, size INTEGER, time TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+        conn.execute("CREATE TABLE IF NOT EXISTS file_names (id INTEGER PRIMARY KEY AUTOINCREMENT, hash TEXT, filename TEXT, nickname TEXT, time TIMESTAMP)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_file_names_filename ON file_names (filename)")  # !라이프 가 업로드 이름으로 찾음
+        chat_search.init(conn)  # (nickname, id)/time 인덱스 + FTS5 검색 인덱스와 동기화 트리거
+        rooms.init(conn)  # rooms 테이블 + (room, id) 인덱스
+
+def save_chat(data, room=DEFAULT_ROOM):
+    """채팅 행을 write-behind 큐에 넣고, 발급한 id 를 붙인 data 를 돌려줍니다 (그대로 방에 전송).
+    방 히스토리 버퍼는 전송을 받은 모든 워커의 'emit' 구독자(_remember_chat)가 채웁니다."""
+    data['id'] = chat_writer.write(data['nickname'], data['msg'], data['type'], data['rank'], room)
+    return data
+
+def _remember_chat(m):
+    """저장된 채팅(id 가 붙은 'message')을 그 방 히스토리 버퍼에 넣습니다 - 다른 워커에서 보낸 것도."""
+    d = m['data']
+    if m['event'] == 'message' and m['room'] and 'id' in d:
+        rooms.history(m['room']).append({k: d.get(k) for k in ('id', 'nickname', 'msg', 'type', 'rank')})
 
 def get_user(nick):
-    with sqlite3.connect(DB_FILE) as conn:
-        conn.row_factory = sqlite3.Row
-        u = conn.execute("SELECT * FROM users WHERE nickname = ?", (nick,)).fetchone()
-        if not u:
-            conn.execute("INSERT INTO users (nickname) VALUES (?)", (nick,))
-            u = conn.execute("SELECT * FROM users WHERE nickname = ?", (nick,)).fetchone()
-        return dict(u)
+    return ledger.get(nick)
 
 def update_db(nick, field, amount):
-    with sqlite3.connect(DB_FILE) as conn:
-        conn.execute(f"UPDATE users SET {field} = {field} + ? WHERE nickname = ?", (amount, nick))
+    return ledger.add(nick, field, amount)
+
+def coin_value(nick):
+    return portfolios.value(nick, market.prices)
+
+def total_asset(u):
+    return u['money'] + u['bank_money'] + coin_value(u['nickname'])
+
+def revalue():
+    """전체 유저 총자산을 벡터 연산 한 번으로 계산합니다."""
+    names, totals = portfolios.revalue(market.prices)
+    return names, totals.tolist()
+
+def load_portfolios(holdings=True):
+    """DB 의 현금+은행 잔액(과 코인 보유량)으로 포트폴리오 행렬을 채우고 랭킹을 다시 정렬합니다."""
+    with db.checkout() as conn:
+        for nick, base in conn.execute("SELECT nickname, money + bank_money FROM users"):
+            portfolios.set_base(nick, base)
+        if holdings:
+            for nick, asset, amount in conn.execute("SELECT nickname, asset, amount FROM holdings"):
+                if asset in market.index: portfolios.add(nick, market.index[asset], amount)
+    leaderboard.rebuild_scores(*revalue())
+
+# --- [워커 간 상태 동기화] ---
+# 잔액/보유량 변경은 다른 워커의 랭킹에, 리더의 시세와 이자 정산은 모든 워커에 반영합니다 (init_core 에서 구독).
+
+def _remote_user(m):
+    ledger.refresh(m['nickname'], m)  # 이 워커 캐시의 잔액도 (안 그러면 !잔액/!저금 이 옛 값으로 판단)
+    portfolios.set_base(m['nickname'], m['money'] + m['bank_money'])
+    leaderboard.update(m)
+
+def _remote_prices(m):
+    market.set_prices(m['prices'])
+    leaderboard.rebuild_scores(*revalue())
+
+def _remote_interest(m):
+    load_portfolios(holdings=False)
+    ledger.reload()
 
 def broadcast_news(msg):
-    """실시간 제국 속보를 전송합니다."""
-    socketio.emit('message', {'msg': f"🚨 [제국 속보] {msg}", 'type': 'system'}, room='main')
+    """실시간 제국 속보를 속보 구독자 전체에 전송합니다."""
+    transport.broadcast('message', {'msg': f"🚨 [제국 속보] {msg}", 'type': 'system'}, room=NEWS_ROOM)
+
+@metrics.timed(ENGINE_SECONDS, engine="noejul")
+def noejul_fire(nicks):
+    """이번 tick 에 걸린 모든 뇌절 루프를 한 번에 적립하고, 시작한 방마다 한 줄로 묶어 알립니다."""
+    by_room = {}
+    for n in list(nicks):
+        if not bp.acquire(f"noejul:{n}", WORKER_ID, NOEJUL_LEASE_S):  # 소유 락 연장 (놓쳤으면 이 워커에서는 그만)
+            noejul_loops.stop(n); nicks.remove(n)
+            continue
+        update_db(n, "money", NOEJUL_REWARD)  # 장부 write-back 때 한 번의 배치 UPDATE 로 기록
+        by_room.setdefault(noejul_rooms.get(n, DEFAULT_ROOM), []).append(n)
+    for room, ns in by_room.items():
+        names = ", ".join(ns[:5]) + (f" 외 {len(ns) - 5}명" if len(ns) > 5 else "")
+        transport.broadcast('message', {'nickname': ns[0], 'nicks': ns, 'msg': f"🌀 뇌절 적립중... ({names})", 'type': 'noejul'}, room=room)
+    lucky = [n for n in nicks if random.random() < 0.1]
+    if lucky:
+        broadcast_news(f"{random.choice(lucky)}님이 멈추지 않는 '무한 뇌절'로 시장 경제를 뒤흔들고 있습니다!")
+
+noejul_rooms = {}  # 닉네임 -> 루프를 시작한 방 (적립 알림을 보낼 곳)
+
+# 뇌절 루프는 시작한 워커가 돌리고, 닉네임마다 만료 락(noejul:<닉네임>)으로 워커 간 중복 실행을 막습니다.
+# 락은 적립할 때마다 연장하므로 워커가 죽으면 NOEJUL_LEASE_S 뒤에 풀립니다.
+def noejul_start(nick, room=DEFAULT_ROOM):
+    if noejul_loops.get(nick): return
+    if bp.acquire(f"noejul:{nick}", WORKER_ID, NOEJUL_LEASE_S):
+        noejul_rooms[nick] = room
+        noejul_loops.start(nick)
+
+def noejul_stop(nick):
+    bp.publish('noejul_stop', nick)  # 어느 워커에서 돌고 있든 멈춤 (락은 돌리던 워커가 놓음)
+
+def _stop_noejul_here(nick):
+    if noejul_loops.stop(nick): bp.release(f"noejul:{nick}", WORKER_ID)
+
+def _release_noejul():
+    for nick in list(noejul_rooms):
+        _stop_noejul_here(nick)
+
+def init_core():
+    """DB/장부/백플레인 등 요청 처리에 필요한 것을 한 번 준비합니다 (첫 요청/이벤트 또는 start_services 가 부름)."""
+    if _core_ready.is_set(): return
+    with _core_lock:  # 동시에 들어온 첫 요청들은 준비가 끝날 때까지 기다림
+        if _core_ready.is_set(): return
+        t0 = time.perf_counter()
+        _init_core()
+        STARTUP['core'] = time.perf_counter() - t0
+        _core_ready.set()
+
+def _init_core():
+    global bp, market, portfolios, leaderboard, ledger, chat_writer, uploads, precompressed, blobs, noejul_loops, life_streams
+    from market import Market, PortfolioBook  # numpy
+    from life import LifeStreams
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    os.makedirs(LIFE_DIR, exist_ok=True)
+
+    # 다중 워커: 방 전송은 백플레인을 거쳐 모든 워커로, 시세/이자 엔진은 리더 워커 하나만 실행
+    # (Socket.IO 폴링 때문에 리버스 프록시는 sticky session 이어야 합니다)
+    bp = backplane.connect(BACKPLANE_URL)
+    transport.bridge(bp)
+    bp.subscribe('emit', _remember_chat)
+    if OUTBOX_MS:  # 방 전송을 접속자당 주기마다 'batch' 프레임 하나로 (지난 시세는 버림)
+        outbox = transport.coalesce(interval_ms=OUTBOX_MS, binary=OUTBOX_BINARY, latest_only=("price_update", "life_frame"))
+        atexit.register(outbox.close)
+
+    market = Market(MARKET_ASSETS, MARKET_VOL, model=MARKET_MODEL)
+    portfolios = PortfolioBook(len(market.names))  # 전체 유저 (유저 x 종목) 보유량 행렬
+    init_db()
+    uploads = UploadStore(UPLOAD_FOLDER, db, UPLOAD_MAX_BYTES)
+    precompressed = Precompressor(UPLOAD_FOLDER)  # 텍스트류 .gz 사본을 백그라운드에서 생성
+    atexit.register(precompressed.close)
+    blobs = BlobStore(os.path.join(UPLOAD_FOLDER, "msg"))  # 500자 넘는 메시지 (gzip, 해시 이름)
+    # 채팅 id 는 백플레인 공유 카운터로 (워커마다 MAX(id)+1 로 매기면 서로 겹침)
+    chat_writer = ChatWriter(db, CHAT_BATCH_SIZE, CHAT_FLUSH_MS, sync=CHAT_SYNC_WRITES,
+                             allocate=lambda floor: bp.incr('chat_id', floor))
+    atexit.register(chat_writer.close)  # 종료 시 남은 채팅 행 flush
+    rooms.history(DEFAULT_ROOM)  # 메인 방 버퍼는 미리 채워 둠 (다른 방은 처음 입장할 때)
+    ledger = UserLedger(db, LEDGER_CAPACITY, LEDGER_WRITEBACK_S)
+    atexit.register(ledger.close)  # 종료 시 남은 잔액 변경분 flush
+
+    # 자산 랭킹: 잔액 변경 시 해당 유저만 재배치, 시세 tick 마다 벡터 재평가 결과로 전체 재정렬
+    leaderboard = Leaderboard(total_asset)
+    load_portfolios()
+    metrics.gauge("ledger_cached_users", "메모리 장부에 올라온 유저 수", lambda: len(ledger.cached()))
+    metrics.gauge("leaderboard_users", "랭킹에 있는 유저 수", lambda: len(leaderboard))
+    ledger.on_change(lambda u: portfolios.set_base(u['nickname'], u['money'] + u['bank_money']))
+    ledger.on_change(leaderboard.update)
+
+    ledger.on_change(lambda u: share('user', nickname=u['nickname'], money=u['money'], bank_money=u['bank_money']))
+    on_share('user', _remote_user)
+    on_share('holding', lambda m: portfolios.add(m['nickname'], m['asset'], m['qty']))
+    on_share('prices', _remote_prices)
+    on_share('interest', _remote_interest)
+    if bp.hgetall('state').get('prices'): market.set_prices(bp.hgetall('state')['prices'])  # 늦게 뜬 워커도 현재 시세부터
+
+    noejul_loops = NoejulScheduler(noejul_fire, NOEJUL_PERIOD)  # 모든 !무한뇌절 루프를 스레드 하나가 관리
+    metrics.gauge("noejul_active_loops", "이 워커에서 도는 !무한뇌절 루프 수", lambda: len(noejul_loops))
+    bp.subscribe('noejul_stop', _stop_noejul_here)
+    atexit.register(_release_noejul)
+
+    # Game of Life: 방마다 세대를 진행하며 글자 화면과 micro:bit 5x5 화면을 보냄 (!라이프)
+    life_streams = LifeStreams(transport.broadcast, LIFE_FPS, LIFE_MICROBIT_FPS, LIFE_MAX_STREAMS, id_prefix=WORKER_ID)
+    metrics.gauge("life_streams", "이 워커에서 돌아가는 !라이프 수", lambda: len(life_streams))
+
+# 시세 엔진: tick 마다 전 종목 시세를 한 번에 움직이고 전체 자산을 벡터 재평가
+def market_engine():
+    while True:
+        time.sleep(MARKET_TICK_S)
+        if not leader.is_leader: continue  # 리더가 보낸 'prices' 로 갱신
+        t0 = time.perf_counter()
+        try:
+            market.step(MARKET_TICK_S)
+            leaderboard.rebuild_scores(*revalue())
+            shared = market.prices.tolist()
+            bp.hset('state', 'prices', shared)
+            share('prices', prices=shared)
+            prices = market.snapshot()
+            transport.broadcast('price_update', {'btc': prices["비트코인"], 'prices': prices}, room=PRICES_ROOM)
+        except Exception as e:
+            ENGINE_ERRORS.inc(engine="market")
+            print(f"Market Error: {e}")
+        ENGINE_SECONDS.observe(time.perf_counter() - t0, engine="market")
 
 # 수정된 배경 엔진 로직
 def empire_background_engine():
-    global crypto_prices
+    last = market.snapshot()
     while True:
         time.sleep(60)
+        if not leader.is_leader:
+            last = market.snapshot(); continue
+        t0 = time.perf_counter()
         try:
-            with sqlite3.connect(DB_FILE, timeout=10) as conn: # timeout 추가
-                # 1. 비트코인 시세 변동
-                change = random.uniform(0.95, 1.05)
-                crypto_prices["비트코인"] = int(crypto_prices["비트코인"] * change)
-                
-                # 2. 은행 이자 '돈 복사' (일괄 업데이트로 속도 향상)
+            ledger.flush()  # 이자 계산 전에 메모리 장부를 DB 에 반영
+            with db.transaction() as conn:
+                # 은행 이자 '돈 복사' (일괄 업데이트로 속도 향상)
                 conn.execute("UPDATE users SET money = money + CAST(bank_money * 0.001 AS INTEGER) WHERE bank_money > 0")
-                conn.commit()
-                
-                # 3. 실시간 전송
-                socketio.emit('price_update', {'btc': crypto_prices["비트코인"]}, room='main')
-                
+            load_portfolios(holdings=False)  # 이자 붙은 잔액으로 랭킹 재계산
+            ledger.reload()  # DB 에서 붙은 이자를 캐시에 다시 반영
+            share('interest')  # 다른 워커도 캐시/랭킹 갱신
+            
+            # 1분 동안의 시세 변동 속보
+            now = market.snapshot()
+            for name, price in now.items():
+                change = price / last[name]
                 if change > 1.04:
-                    broadcast_news(f"📈 비트코인 폭등! 현재가: {crypto_prices['비트코인']:,}₩")
+                    broadcast_news(f"📈 {name} 폭등! 현재가: {price:,}₩")
                 elif change < 0.96:
-                    broadcast_news(f"📉 비트코인 대폭락! 현재가: {crypto_prices['비트코인']:,}₩")
+                    broadcast_news(f"📉 {name} 대폭락! 현재가: {price:,}₩")
+            last = now
         except Exception as e:
+            ENGINE_ERRORS.inc(engine="interest")
             print(f"Engine Error: {e}")
+        ENGINE_SECONDS.observe(time.perf_counter() - t0, engine="interest")
 
-threading.Thread(target=empire_background_engine, daemon=True).start()
+# micro:bit 측정값: 브리지가 보낸 묶음을 방별로 모아 두었다가 주기마다 요약 한 프레임으로
+telemetry = TelemetryBoard()
+
+def telemetry_engine():
+    while True:
+        time.sleep(TELEMETRY_EMIT_S)
+        t0 = time.perf_counter()
+        try:
+            for room, summary in telemetry.drain():
+                transport.broadcast('microbit_telemetry', summary, room=room)
+        except Exception as e:
+            ENGINE_ERRORS.inc(engine="telemetry")
+            print(f"Telemetry Error: {e}")
+        ENGINE_SECONDS.observe(time.perf_counter() - t0, engine="telemetry")
+
+@app.before_request
+def _start_timer():
+    g.t0 = time.perf_counter()
+    init_core()
+
+@app.after_request
+def _observe(resp):
+    if 't0' in g: HTTP_SECONDS.observe(time.perf_counter() - g.t0, endpoint=request.endpoint or "404", status=resp.status_code)
+    return resp
 
 @app.route('/')
 def index(): return render_template('index.html')
 
+@app.route('/metrics')
+def metrics_page():
+    return metrics.REGISTRY.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+@app.route('/api/search')
+def api_search():
+    """?q=텍스트&room=&nickname=&since=&until=&before=<id>&limit= -> 최신순 결과와 다음 페이지 before (q 없으면 기록 조회)."""
+    if not limiter.allow(request.remote_addr, "search"): return {'error': "검색이 너무 잦습니다."}, 429
+    a = request.args
+    chat_writer.flush(1)  # 방금 보낸 메시지도 검색되도록
+    rows, nxt = chat_search.search(a.get('q'), a.get('nickname'), a.get('since'), a.get('until'),
+                                   a.get('before', type=int), max(1, min(a.get('limit', 20, type=int), 100)), a.get('room'))
+    return {'results': rows, 'next_before': nxt}
+
+@app.route('/debug/profile')
+def debug_profile():
+    """PROFILER=1 일 때만: ?seconds=N 동안 전 스레드 스택을 샘플링해 collapsed 형식으로 돌려줍니다."""
+    if profiler is None: abort(404)
+    out = profiler.collapsed(request.args.get('seconds', 10, type=float), top=request.args.get('top', type=int))
+    if out is None: return "이미 프로파일링 중입니다.", 409
+    return out, 200, {'Content-Type': 'text/plain; charset=utf-8'}
+
 @app.route('/uploads/<path:filename>')
-def download(filename): return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+def download(filename):
+    if filename.startswith("msg/"): return blobs.send(filename[4:].removesuffix(".txt"))
+    return send_upload(app.config['UPLOAD_FOLDER'], filename, precompressed)
 
 @app.route('/upload', methods=['POST'])
 def upload():
-    file = request.files.get('file'); nick = request.form.get('nickname', '익명')
+    nick = request.form.get('nickname', '익명')
+    room = request.form.get('room', DEFAULT_ROOM)
+    if not rooms.exists(room): room = DEFAULT_ROOM
+    if not limiter.allow(nick, "upload"): return "업로드가 너무 잦습니다. 잠시 후 다시 시도해주세요.", 429
+    file = request.files.get('file')
     if file:
-        fname = f"{int(time.time())}_{secure_filename(file.filename)}"
-        path = os.path.join(app.config['UPLOAD_FOLDER'], fname)
-        file.save(path)
-        reward = 10000 + (os.path.getsize(path) // 5)
+        # 청크 단위로 해시하며 저장 - 같은 내용은 한 번만 디스크에 기록
+        try: fname, size, is_new = uploads.save(file.stream, secure_filename(file.filename) or "file", nick)
+        except UploadTooLarge as e: return f"파일이 너무 큽니다 ({e})", 413
+        precompressed.submit(fname)  # 확장자(Content-Type)별 .gz 사본 - 이미 있으면 건너뜀
+        reward = 10000 + (size // 5)
         update_db(nick, "money", reward)
         if reward >= 50000:
             broadcast_news(f"{nick}님이 귀중한 파일을 공유하여 {reward:,}₩의 거액을 하사받았습니다!")
         f_url = f"{request.host_url.rstrip('/')}/uploads/{fname}"
         msg = f"📁 [파일 공유] {file.filename}\n🔗 다운로드: {f_url}"
-        socketio.emit('message', {'nickname': nick, 'msg': msg, 'type': 'chat', 'rank': '시스템', 'reward': f"+{reward:,}₩"}, room='main')
+        transport.broadcast('message', save_chat({'nickname': nick, 'msg': msg, 'type': 'chat', 'rank': '시스템', 'reward': f"+{reward:,}₩"}, room), room=room)
     return '', 204
 
-@socketio.on('join')
-def on_join(d):
-    join_room('main')
-    with sqlite3.connect(DB_FILE) as conn:
-        conn.row_factory = sqlite3.Row
-        for h in reversed(conn.execute("SELECT * FROM chats ORDER BY id DESC LIMIT 100").fetchall()):
-            emit('message', {'nickname': h['nickname'], 'msg': h['msg'], 'type': h['type'], 'rank': h['rank']})
+# --- [Socket.IO 이벤트] ---
+# 핸들러는 (sid, data, reply, host_url) 만 받으므로 threading/asyncio 서버 모드가 그대로 공유합니다.
+# reply(event, data) 는 보낸 사람에게만, transport.broadcast 는 방 전체에 전송합니다.
+# 접속은 채팅방 하나(기본 'main')에 들어가 있고, 시세/속보는 subscribe 로 켠 접속에만 갑니다.
+def enter_room(sid, room, reply):
+    """sid 를 room 으로 옮기고 방 정보와 그 방의 최근 메시지를 보냅니다."""
+    old = rooms.move(sid, room)
+    if old and old != room: transport.leave(sid, old)
+    transport.enter(sid, room)
+    msgs = rooms.history(room).recent()  # 메모리 버퍼에서 한 프레임으로
+    reply('room', {'room': room, 'members': rooms.count(room)})
+    reply('history', {'messages': msgs, 'has_more': len(msgs) >= HISTORY_SIZE, 'room': room})
+
+def subscribe(sid, topic, on=True):
+    if topic in TOPICS and rooms.subscribe(sid, topic, on):
+        (transport.enter if on else transport.leave)(sid, topic_room(topic))
+
+def on_join(sid, d, reply, host_url):
+    """d: {nickname, room(선택), topics(선택, 예: ['prices', 'news'])} - 재접속 시에도 다시 보냅니다."""
+    sessions[sid] = d.get('nickname')
+    for t in d.get('topics') or (): subscribe(sid, t)
+    room = d.get('room') or DEFAULT_ROOM
+    enter_room(sid, room if rooms.exists(room) else DEFAULT_ROOM, reply)
+
+def on_subscribe(sid, d, reply, host_url):
+    """d: {topic: 'prices' | 'news', on: bool}"""
+    subscribe(sid, d.get('topic'), bool(d.get('on', True)))
+
+def on_disconnect(sid, d, reply, host_url):
+    nick = sessions.pop(sid, None)
+    rooms.leave(sid)
+    # 같은 닉네임으로 남아 있는 접속이 없으면 뇌절 루프 종료
+    if nick and nick not in sessions.values(): noejul_stop(nick)
+
+def on_load_older(sid, d, reply, host_url):
+    # d: {before: 화면에서 가장 오래된 메시지 id} - 형식이 틀린 요청은 조용히 무시
+    if not isinstance(d, dict): return
+    try: before = min(int(d['before']), 2 ** 63 - 1)
+    except (KeyError, TypeError, ValueError, OverflowError): return
+    msgs = rooms.history(rooms.room_of(sid)).older(before, HISTORY_PAGE)
+    reply('history', {'messages': msgs, 'older': True, 'has_more': len(msgs) >= HISTORY_PAGE})
 
-@socketio.on('send_msg')
-def handle_msg(data):
+def on_microbit_event(sid, data, reply, host_url):
+    # data 예: {type:"IMG", payload:"99999/90009/90009/90009/99999"}
+    transport.broadcast("microbit_event", data, room=None)
+
+def on_microbit_telemetry(sid, data, reply, host_url):
+    # data: {device, t, window_s, readings: {키: [값, ...]}, room} - upload.py 브리지가 0.5초마다 장치별로
+    room = data.get('room') or DEFAULT_ROOM
+    telemetry.add(room if rooms.exists(room) else DEFAULT_ROOM, data)
+
+def handle_msg(sid, data, reply, host_url):
     # 1. 기본 데이터 추출 및 유저 정보 로드
     nick, raw = data['nickname'], data['msg'].strip()
     if not raw: return
+    room = rooms.room_of(sid)
     
     u = get_user(nick)
     
     # 2. 메시지 보상 계산 및 DB 업데이트
     if len(raw) > 500:
-        fname = f"msg_{int(time.time())}.txt"
-        path = os.path.join(UPLOAD_FOLDER, fname)
-        with open(path, "w", encoding="utf-8") as f: f.write(raw)
+        key = blobs.put(raw)  # 압축 저장, chats 에는 미리보기만
         reward = len(raw) * 100 
         update_db(nick, "money", reward)
-        raw = f"📄 대용량 메시지 감지 (파일 변환)\n🔗 다운로드: {request.host_url.rstrip('/')}/uploads/{fname}"
+        raw = f"📄 대용량 메시지 감지 ({len(raw):,}자)\n{blobs.preview(raw)}\n🔗 전체 보기: {host_url.rstrip('/')}/uploads/msg/{key}.txt"
     else:
         reward = len(raw) * 50
         update_db(nick, "money", reward)
@@ -134,7 +524,7 @@ def handle_msg(data):
 
     # [중요] 보상 수령 후 최신 유저 정보와 자산 다시 계산
     u = get_user(nick)
-    btc_v = int(u['btc_amount'] * crypto_prices['비트코인'])
+    btc_v = coin_value(nick)
     total = u['money'] + u['bank_money'] + btc_v
 
     parts = raw.split()
@@ -144,96 +534,143 @@ def handle_msg(data):
     
     if cmd == "!잔액":
         res = f"💰 {nick}님 자산\n💵 현금: {u['money']:,}₩\n🏦 은행: {u['bank_money']:,}₩\n🪙 코인: {btc_v:,}₩\n💳 총액: {total:,}₩"
-        emit('message', {'msg': res, 'type': 'system', 'total_asset': total})
+        reply('message', {'msg': res, 'type': 'system', 'total_asset': total})
     
     elif cmd == "!랭킹":
-        with sqlite3.connect(DB_FILE) as conn:
-            conn.row_factory = sqlite3.Row
-            users = conn.execute("SELECT * FROM users").fetchall()
-            rank_list = []
-            for row in users:
-                t = row['money'] + row['bank_money'] + int(row['btc_amount'] * crypto_prices['비트코인'])
-                rank_list.append({'nick': row['nickname'], 'total': t})
-            rank_list.sort(key=lambda x: x['total'], reverse=True)
-            top_msg = "🏆 [제국 자산 랭킹 TOP 5]\n"
-            for i, r in enumerate(rank_list[:5], 1):
-                medal = "🥇" if i==1 else "🥈" if i==2 else "🥉" if i==3 else "🎖️"
-                top_msg += f"{medal} {i}위: {r['nick']} ({r['total']:,}₩)\n"
-            socketio.emit('message', {'msg': top_msg, 'type': 'system', 'total_asset': total}, room='main')
+        # !랭킹 [페이지] - 페이지당 5명
+        pg = max(1, int(parts[1])) if len(parts)>1 and parts[1].isdigit() else 1
+        top_msg = "🏆 [제국 자산 랭킹 TOP 5]\n" if pg == 1 else f"🏆 [제국 자산 랭킹 {pg}페이지]\n"
+        for i, name, t in leaderboard.page((pg - 1) * 5, 5):
+            medal = "🥇" if i==1 else "🥈" if i==2 else "🥉" if i==3 else "🎖️"
+            top_msg += f"{medal} {i}위: {name} ({t:,}₩)\n"
+        transport.broadcast('message', {'nickname': nick, 'msg': top_msg, 'type': 'system', 'total_asset': total}, room=room)  # total_asset 은 요청한 사람 화면에만 반영
+
+    elif cmd == "!시세":
+        held = portfolios.held(nick)
+        res = "📊 [제국 코인 시세]\n" + "\n".join(
+            f"🪙 {n}: {p:,}₩" + (f"  (보유 {held[market.index[n]]:.6f}개)" if held[market.index[n]] else "")
+            for n, p in market.snapshot().items())
+        reply('message', {'msg': res, 'type': 'system', 'total_asset': total})
+
+    elif cmd == "!내순위":
+        r = leaderboard.rank_of(nick)
+        res = f"📍 {nick}님 순위: {r[0]:,}위 / {len(leaderboard):,}명 ({r[1]:,}₩)" if r else "📍 아직 랭킹에 없습니다."
+        reply('message', {'msg': res, 'type': 'system', 'total_asset': total})
 
+    # 경제 명령어는 조건부 UPDATE ... RETURNING 한 번으로 처리 (잔액 부족 시 None)
     elif cmd == "!저금":
-        amt = int(parts[1]) if len(parts)>1 else u['money']
-        if u['money'] >= amt: 
-            update_db(nick, "money", -amt); update_db(nick, "bank_money", amt)
-            u = get_user(nick) # 업데이트 후 다시 로드
-            total = u['money'] + u['bank_money'] + btc_v
-            emit('message', {'msg': f"🏦 {amt:,}₩ 저금됨", 'type': 'system', 'total_asset': total})
+        r = economy.deposit(ledger, nick, int(parts[1]) if len(parts)>1 else None)
+        if r:
+            amt, u = r
+            reply('message', {'msg': f"🏦 {amt:,}₩ 저금됨", 'type': 'system', 'total_asset': total_asset(u)})
 
     elif cmd == "!출금":
-        amt = int(parts[1]) if len(parts)>1 else u['bank_money']
-        if u['bank_money'] >= amt: 
-            update_db(nick, "bank_money", -amt); update_db(nick, "money", amt)
-            u = get_user(nick)
-            total = u['money'] + u['bank_money'] + btc_v
-            emit('message', {'msg': f"💸 {amt:,}₩ 출금됨", 'type': 'system', 'total_asset': total})
+        r = economy.withdraw(ledger, nick, int(parts[1]) if len(parts)>1 else None)
+        if r:
+            amt, u = r
+            reply('message', {'msg': f"💸 {amt:,}₩ 출금됨", 'type': 'system', 'total_asset': total_asset(u)})
 
     elif cmd == "!매수" and len(parts)>2:
         amt = int(parts[2])
-        if u['money'] >= amt:
-            btc_add = amt / crypto_prices['비트코인']
-            update_db(nick, "money", -amt); update_db(nick, "btc_amount", btc_add)
-            u = get_user(nick)
-            total = u['money'] + u['bank_money'] + int(u['btc_amount'] * crypto_prices['비트코인'])
-            emit('message', {'msg': f"🪙 비트코인 {btc_add:.8f}개 매수완료", 'type': 'system', 'total_asset': total})
+        coin = parts[1]
+        if coin not in market.index:
+            reply('message', {'msg': f"❓ 없는 종목입니다. ({', '.join(market.names)})", 'type': 'system', 'total_asset': total})
+            return
+        r = economy.buy(ledger, nick, coin, amt, market.price(coin))
+        if r:
+            btc_add, u = r
+            portfolios.add(nick, market.index[coin], btc_add)
+            share('holding', nickname=nick, asset=market.index[coin], qty=btc_add)
+            leaderboard.update(u)
+            reply('message', {'msg': f"🪙 {coin} {btc_add:.8f}개 매수완료", 'type': 'system', 'total_asset': total_asset(u)})
             if amt >= 10000000:
-                broadcast_news(f"시장 요동! {nick}님이 비트코인을 {btc_add:.4f}개 쓸어담으며 '큰 손'으로 등극했습니다!")
+                broadcast_news(f"시장 요동! {nick}님이 {coin}을(를) {btc_add:.4f}개 쓸어담으며 '큰 손'으로 등극했습니다!")
 
     elif cmd == "!가위바위보" and len(parts)>2:
         pick, amt = parts[1], int(parts[2])
-        if u['money'] >= amt:
-            bot = random.choice(["가위", "바위", "보"])
-            if pick == bot: res = "무승부"
-            elif (pick=="가위" and bot=="보") or (pick=="바위" and bot=="가위") or (pick=="보" and bot=="바위"):
-                update_db(nick, "money", amt); res = f"승리! (+{amt:,}₩)"
-            else: update_db(nick, "money", -amt); res = f"패배... (-{amt:,}₩)"
-            u = get_user(nick)
-            total = u['money'] + u['bank_money'] + int(u['btc_amount'] * crypto_prices['비트코인'])
-            emit('message', {'msg': f"🎮 {pick} vs {bot} -> {res}", 'type': 'system', 'total_asset': total})
+        bot = random.choice(["가위", "바위", "보"])
+        if pick == bot: delta, res = 0, "무승부"
+        elif (pick=="가위" and bot=="보") or (pick=="바위" and bot=="가위") or (pick=="보" and bot=="바위"):
+            delta, res = amt, f"승리! (+{amt:,}₩)"
+        else: delta, res = -amt, f"패배... (-{amt:,}₩)"
+        u = economy.wager(ledger, nick, amt, delta)
+        if u:
+            reply('message', {'msg': f"🎮 {pick} vs {bot} -> {res}", 'type': 'system', 'total_asset': total_asset(u)})
 
     elif cmd == "!무한뇌절":
-        if noejul_loops.get(nick): return
-        noejul_loops[nick] = True
-        def task():
-            while noejul_loops.get(nick):
-                update_db(nick, "money", 5000)
-                socketio.emit('message', {'nickname': nick, 'msg': "🌀 뇌절 적립중...", 'type': 'noejul'}, room='main')
-                if random.random() < 0.1:
-                    broadcast_news(f"{nick}님이 멈추지 않는 '무한 뇌절'로 시장 경제를 뒤흔들고 있습니다!")
-                time.sleep(2)
-        threading.Thread(target=task, daemon=True).start()
-
-    elif cmd in ["!뇌절정지", "!뇌절중단"]: noejul_loops[nick] = False
+        noejul_start(nick, room)
+
+    elif cmd in ["!뇌절정지", "!뇌절중단"]: noejul_stop(nick)
 
     elif cmd == "!gemini":
         prompt = " ".join(parts[1:])
+        pool = get_gemini() if prompt else None
         if not prompt:
-            emit('message', {'msg': "🤖 질문을 입력해주세요!", 'type': 'system', 'total_asset': total})
-        elif client is None:
-            emit('message', {'msg': "⚠️ Gemini API가 연결되지 않았습니다.", 'type': 'system', 'total_asset': total})
+            reply('message', {'msg': "🤖 질문을 입력해주세요!", 'type': 'system', 'total_asset': total})
+        elif pool is None:
+            reply('message', {'msg': "⚠️ Gemini API가 연결되지 않았습니다.", 'type': 'system', 'total_asset': total})
+        else:
+            # 워커 풀에 넘기고 바로 반환 - 답변은 'bot_stream' 으로 조각조각 도착
+            status = pool.submit(nick, prompt, room)
+            if status == 'user_busy':
+                reply('message', {'msg': "⏳ 이전 질문에 답하는 중입니다. 잠시만 기다려주세요!", 'type': 'system', 'total_asset': total})
+            elif status == 'busy':
+                reply('message', {'msg': "⏳ 황실 책사가 너무 바쁩니다. 잠시 후 다시 물어봐주세요!", 'type': 'system', 'total_asset': total})
+
+    elif cmd == "!검색":
+        # !검색 [단어...] [@닉네임] [#이전id] - 최신순 SEARCH_PAGE 개씩
+        words = [w for w in parts[1:] if not w.startswith(("@", "#"))]
+        who = next((w[1:] for w in parts[1:] if w.startswith("@") and len(w) > 1), None)
+        before = next((int(w[1:]) for w in parts[1:] if w.startswith("#") and w[1:].isdigit()), None)
+        if not words and not who:
+            reply('message', {'msg': "🔎 사용법: !검색 [단어] [@닉네임] [#이전id]", 'type': 'system', 'total_asset': total})
+            return
+        chat_writer.flush(1)
+        rows, nxt = chat_search.search(" ".join(words), who, before=before, limit=SEARCH_PAGE, room=room)  # 지금 있는 방에서만
+        query = " ".join(words + ([f"@{who}"] if who else []))
+        res = f"🔎 [검색: {query}]\n" + ("\n".join(
+            f"#{r['id']} {(r['time'] or '')[5:16]} {r['nickname']}: {' '.join(r['msg'].split())[:60]}" for r in rows) or "결과가 없습니다.")
+        if nxt: res += f"\n➡️ 더 보기: !검색 {query} #{nxt}"
+        reply('message', {'msg': res, 'type': 'system', 'total_asset': total})
+
+    elif cmd == "!라이프":
+        # !라이프 [패턴] [세대수] [한 화면당 세대] - 패턴: 내장 이름, patterns/ 의 파일 이름 또는 업로드한 파일 이름
+        import life  # init_core 에서 이미 불러 둠 (numpy)
+        if len(parts) < 2:
+            res = "🧬 사용법: !라이프 [패턴] [세대수=200] [건너뛰기=1], 멈춤: !라이프정지\n패턴: " + ", ".join(life.available([LIFE_DIR]))
+            reply('message', {'msg': res, 'type': 'system', 'total_asset': total})
+            return
+        gens = min(int(parts[2]), LIFE_MAX_GENS) if len(parts)>2 and parts[2].isdigit() else 200
+        step = max(1, int(parts[3])) if len(parts)>3 and parts[3].isdigit() else 1
+        try: board = life.Life(life.load(parts[1], [LIFE_DIR], lookup=uploads.find))  # 업로드는 해시 이름이라 file_names 로
+        except FileNotFoundError: res = f"🧬 '{parts[1]}' 패턴이 없습니다. (!라이프 로 목록 보기)"
+        except ValueError as e: res = f"🧬 패턴을 읽을 수 없습니다: {e}"
         else:
-            try:
-                res = client.models.generate_content(model="gemini-2.0-flash", contents=prompt)
-                socketio.emit('message', {
-                    'nickname': '🤖 Gemini AI', 
-                    'msg': res.text, 
-                    'type': 'bot', 
-                    'rank': '황실 책사'
-                }, room='main')
-            except Exception as e:
-                socketio.emit('message', {'msg': f"⚠️ Gemini 오류: {str(e)}", 'type': 'system'}, room='main')
+            status = life_streams.start(room, board, gens, step)
+            res = {'started': None, 'busy': "🧬 이 방에서 이미 라이프가 진행 중입니다. (!라이프정지)",
+                   'full': "🧬 진행 중인 라이프가 너무 많습니다. 잠시 후 다시 시도해주세요."}[status]
+        if res: reply('message', {'msg': res, 'type': 'system', 'total_asset': total})
+
+    elif cmd == "!라이프정지": life_streams.stop(room)
+
+    elif cmd == "!방만들기" and len(parts)>1:
+        if rooms.create(parts[1], nick): enter_room(sid, parts[1], reply)
+        else: reply('message', {'msg': "🚪 이미 있는 방이거나 쓸 수 없는 이름입니다. (영문/숫자/한글/_/- 20자 이내)", 'type': 'system', 'total_asset': total})
+
+    elif cmd == "!방입장" and len(parts)>1:
+        if rooms.exists(parts[1]): enter_room(sid, parts[1], reply)
+        else: reply('message', {'msg': f"🚪 '{parts[1]}' 방이 없습니다. (!방만들기 {parts[1]})", 'type': 'system', 'total_asset': total})
+
+    elif cmd == "!방나가기":
+        if room != DEFAULT_ROOM: enter_room(sid, DEFAULT_ROOM, reply)
+
+    elif cmd == "!방목록":
+        res = "🚪 [채팅방 목록] (이 서버 접속 수)\n" + "\n".join(
+            f"{'👉' if r == room else '▫️'} {r} ({n}명)" for r, n in rooms.listing())
+        reply('message', {'msg': res, 'type': 'system', 'total_asset': total})
 
     elif cmd == "!명령어":
-        emit('message', {'msg': "!잔액, !랭킹, !저금 [금액], !출금 [금액], !가위바위보 [패] [금액], !매수 비트코인 [금액], !무한뇌절, !뇌절중단, !gemini [질문]", 'type': 'system', 'total_asset': total})
+        reply('message', {'msg': "!잔액, !랭킹 [페이지], !내순위, !저금 [금액], !출금 [금액], !가위바위보 [패] [금액], !시세, !매수 [코인] [금액], !무한뇌절, !뇌절중단, !gemini [질문], !검색 [단어] [@닉네임], !방목록, !방만들기 [이름], !방입장 [이름], !방나가기, !라이프 [패턴] [세대수], !라이프정지", 'type': 'system', 'total_asset': total})
 
     # 4. 일반 채팅 메시지 처리 (중복 전송 버그 수정됨)
     else:
@@ -241,31 +678,122 @@ def handle_msg(data):
         elif total >= 10000000: rank = "초월자"
         else: rank = "평민"
         
-        with sqlite3.connect(DB_FILE) as conn:
-            conn.execute("INSERT INTO chats (nickname, msg, type, rank) VALUES (?, ?, ?, ?)", (nick, raw, 'chat', rank))
-        
-        # [수정] 단 한 번만 전송하며 total_asset을 포함합니다.
-        socketio.emit('message', {
+        # [수정] 단 한 번만 전송하며 total_asset을 포함합니다. (write-behind 로 저장하고 받은 id 를 함께 전송)
+        transport.broadcast('message', save_chat({
             'nickname': nick, 
             'msg': raw, 
             'type': 'chat', 
             'rank': rank, 
             'reward': f"+{reward:,}₩",
             'total_asset': total 
-        }, room='main')
+        }, room), room=room)
+
+EVENTS = {'join': on_join, 'subscribe': on_subscribe, 'disconnect': on_disconnect, 'load_older': on_load_older,
+          'send_msg': handle_msg, 'microbit_event': on_microbit_event, 'microbit_telemetry': on_microbit_telemetry}
+ECONOMY_COMMANDS = {"!잔액", "!랭킹", "!시세", "!내순위", "!저금", "!출금", "!매수", "!가위바위보",
+                    "!무한뇌절", "!뇌절정지", "!뇌절중단"}
+ROOM_COMMANDS = {"!방만들기", "!방입장", "!방나가기", "!방목록"}
+COMMANDS = ECONOMY_COMMANDS | ROOM_COMMANDS | {"!gemini", "!검색", "!라이프", "!라이프정지", "!명령어"}
+
+def command_of(data):
+    cmd = str((data or {}).get('msg', '')).split(maxsplit=1)[:1]
+    return cmd[0] if cmd and cmd[0] in COMMANDS else "chat"
+
+def command_kind(cmd):
+    """속도 제한 종류: chat / economy / gemini / search / life"""
+    if cmd == "!gemini": return "gemini"
+    if cmd == "!검색": return "search"
+    if cmd == "!라이프": return "life"
+    return "economy" if cmd in ECONOMY_COMMANDS else "chat"
+
+def _timed_event(name, fn):
+    """이벤트 처리 시간 (send_msg 는 명령어별로도) 을 히스토그램에 기록합니다. 서버의 첫 이벤트면 init_core 부터."""
+    def run(sid, data, reply, host_url):
+        init_core()
+        t0 = time.perf_counter()
+        try: return fn(sid, data, reply, host_url)
+        finally:
+            dt = time.perf_counter() - t0
+            EVENT_SECONDS.observe(dt, event=name)
+            if name == 'send_msg': COMMAND_SECONDS.observe(dt, command=command_of(data))
+    return run
+
+EVENTS = {name: _timed_event(name, fn) for name, fn in EVENTS.items()}
+
+# send_msg 속도 제한: 닉네임+명령 종류별 토큰 버킷 -> 접속별 입력 큐 (한 접속의 메시지는 순서대로 하나씩)
+limiter = RateLimiter(RATE_LIMITS if RATE_LIMIT else {})
+inbound = InboundQueues(INBOUND_QUEUE)
+metrics.gauge("inbound_pending", "접속별 입력 큐에서 처리 대기 중인 메시지 수", inbound.pending)
+
+def _throttled(fn):
+    def run(sid, data, reply, host_url):
+        nick = str((data or {}).get('nickname', ''))
+        if limiter.allow(nick, command_kind(command_of(data))) and inbound.submit(sid, lambda: fn(sid, data, reply, host_url)): return
+        if limiter.should_notify(nick):
+            reply('message', {'msg': "🐢 너무 빨라요! 잠시 후 다시 보내주세요.", 'type': 'system'})
+    return run
+
+EVENTS['send_msg'] = _throttled(EVENTS['send_msg'])
+metrics.gauge("socketio_sessions", "이 워커에 join 한 접속 수", lambda: len(sessions))
+
+# threading 모드: Flask-SocketIO 에 같은 핸들러를 등록
+def _flask_handler(name, fn):
+    def handler(data=None, *args):
+        fn(request.sid, data, emit, request.host_url)
+    socketio.on(name)(handler)
+
+for _name, _fn in EVENTS.items(): _flask_handler(_name, _fn)
 
 def microbit_test_sender():
     time.sleep(5)
-    socketio.emit("microbit_event", {
+    transport.broadcast("microbit_event", {
         "type": "IMG",
         "payload": "99999/90009/90009/90009/99999"
-    })
-    socketio.emit("microbit_event", {
+    }, room=None)
+    transport.broadcast("microbit_event", {
         "type": "TEXT",
         "payload": "HELLO BITJOY"
-    })
+    }, room=None)
+
+# --- [앱 생성] ---
+def start_services():
+    """배경 서비스를 한 번 시작합니다: 리더 선출, 시세/이자/측정값 엔진, 기존 업로드 .gz 사본, micro:bit 시험 전송.
+    init_core 까지 백그라운드 스레드에서 하므로 서버는 그동안에도 접속을 받습니다 (첫 요청은 준비가 끝날 때까지 대기)."""
+    global _services_started
+    with _core_lock:
+        if _services_started: return
+        _services_started = True
+    threading.Thread(target=_run_services, name="services", daemon=True).start()
 
-threading.Thread(target=microbit_test_sender, daemon=True).start()
+def _run_services():
+    global leader
+    init_core()
+    # 첫 요청은 init_core 를 기다리므로 예산은 import 부터 여기까지 (create_app 까지만 재면 DB 준비가 빠짐)
+    STARTUP['serving'] = time.perf_counter() - _T_IMPORT
+    ms = STARTUP['serving'] * 1000
+    print(f"⏱️ 요청 처리 준비 {ms:.0f}ms (예산 {COLD_START_BUDGET_MS}ms)" + (" - 예산 초과!" if ms > COLD_START_BUDGET_MS else ""))
+    t0 = time.perf_counter()
+    leader = backplane.Leader(bp, "engine-leader", WORKER_ID, LEADER_TTL_S)
+    atexit.register(leader.close)
+    metrics.gauge("engine_leader", "이 워커가 시세/이자 엔진 리더면 1", lambda: int(leader.is_leader))
+    precompressed.warm()
+    for fn in (market_engine, empire_background_engine, telemetry_engine, microbit_test_sender):
+        threading.Thread(target=fn, name=fn.__name__, daemon=True).start()
+    STARTUP['services'] = time.perf_counter() - t0
+
+def create_app(services=True):
+    """서버가 띄울 Flask 앱을 돌려줍니다 (라우트와 Socket.IO 핸들러는 모듈에 등록되어 있음).
+    services=False 면 배경 엔진 없이 - 요청/이벤트 처리에 필요한 DB 등은 첫 사용 때 init_core 가 준비합니다."""
+    if services: start_services()
+    STARTUP['ready'] = time.perf_counter() - _T_IMPORT
+    print(f"⏱️ 시작 준비 {STARTUP['ready'] * 1000:.0f}ms (DB 준비는 백그라운드에서 이어서)")
+    return app
 
 if __name__ == '__main__':
-    socketio.run(app, debug=True, port=PORT, host='0.0.0.0')
+    # 디버그 리로더는 감시용 부모 프로세스와 실제 서버 자식 프로세스로 나뉘므로 엔진은 자식에서만
+    create_app(services=not DEBUG or os.environ.get("WERKZEUG_RUN_MAIN") == "true")
+    if SERVER_MODE == "asyncio":
+        import asgi_server
+        asgi_server.run(app, EVENTS, host='0.0.0.0', port=PORT)
+    else:
+        socketio.run(app, debug=DEBUG, port=PORT, host='0.0.0.0', allow_unsafe_werkzeug=True)
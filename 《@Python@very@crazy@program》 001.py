@@ -1,10 +1,114 @@
-A = input()
-A = list(A)
-M = 0
+import argparse, io, os, subprocess, sys, time
+
 S = "[-:Minecraft BE_1.21.132v.exe&https://solwitter.top/ &http://127.0.0.1:5001/ &https://chatgpt.com/c/695f47a2-4efc-8320-ae12-48d38be7f8dc& https://crispiest-crunchingly-dani.ngrok-free.dev/ &Multiverse_Empire_32x32_Eternal_Core.life&chatapp.zip &Python_IDLE-3.14.exe&Midda&ect:-]"
+REPEAT = 4624
+CHUNK = 64 * 1024          # 스트리밍 모드에서 한 번에 쓰는 크기 (구분자 반복을 이만큼씩 묶음)
+BUFFER = 1024 * 1024       # 스트리밍 모드 출력 버퍼
+
+
+# 기존 방식: 매 줄마다 템플릿을 다시 만들고 몇 MB 짜리 문자열 전체를 만든 뒤 print
+def legacy(A, limit=None):
+  M = 0
+  n = 0
+  while limit is None or n < limit:
+    M += (len(A)+len(S))
+    print((f'[:[^].[A]:]~[:[{S}].[{M}₩/$]:]' * REPEAT).join(A))
+    n += 1
+
+
+class _Done(Exception):
+  pass
+
+
+class _Out:
+  """버퍼 큰 바이너리 출력 + 바이트 상한 (상한에 닿으면 정확히 그만큼만 쓰고 _Done)."""
+  def __init__(self, raw, max_bytes=None):
+    self.w = io.BufferedWriter(raw, buffer_size=BUFFER)
+    self.left = max_bytes
+  def write(self, b):
+    if self.left is not None:
+      if len(b) >= self.left:
+        self.w.write(b[:self.left]); self.left = 0
+        raise _Done
+      self.left -= len(b)
+    self.w.write(b)
+
+
+# 스트리밍 방식: 템플릿은 M 앞/뒤 조각을 한 번만 인코딩해 두고, 줄마다 M 만 끼워서
+# 구분자를 CHUNK 크기 덩어리로 나눠 씁니다 (메모리는 줄 길이와 상관없이 CHUNK + BUFFER 정도)
+def stream(A, limit=None, max_bytes=None, raw=None):
+  enc = sys.stdout.encoding or "utf-8"
+  head = f'[:[^].[A]:]~[:[{S}].['.encode(enc)
+  tail = '₩/$]:]'.encode(enc)
+  chars = [c.encode(enc) for c in A]
+  out = _Out(raw or io.FileIO(sys.stdout.fileno(), "wb", closefd=False), max_bytes)
+  M = 0
+  n = 0
+  try:
+    while limit is None or n < limit:
+      M += (len(A)+len(S))
+      unit = head + str(M).encode(enc) + tail
+      per = max(1, CHUNK // len(unit))
+      chunk, (full, rest) = unit * per, divmod(REPEAT, per)
+      rest = unit * rest
+      for i, c in enumerate(chars):
+        if i:
+          for _ in range(full): out.write(chunk)
+          out.write(rest)
+        out.write(c)
+      out.write(b"\n")
+      n += 1
+  except (_Done, BrokenPipeError):
+    pass
+  finally:
+    try: out.w.flush()
+    except BrokenPipeError: pass
+
+
+def peak_rss_kb():
+  try:
+    import resource
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r // 1024 if sys.platform == "darwin" else r  # macOS 는 바이트, Linux 는 KB
+  except ImportError:  # Windows
+    try:
+      import psutil
+      return psutil.Process().memory_info().peak_wset // 1024
+    except ImportError:
+      return None
+
+
+# 벤치마크: 두 방식을 각각 새 프로세스로 같은 입력/줄 수만큼 돌려 (출력은 버림) 처리량과 최대 메모리 비교
+def bench(text, lines):
+  step = len(text)+len(S)
+  out_bytes = sum(len(text.encode()) + 1 + max(0, len(text)-1) * REPEAT * len(f'[:[^].[A]:]~[:[{S}].[{step*i}₩/$]:]'.encode())
+                  for i in range(1, lines+1))  # 두 방식 출력은 같음
+  print(f"입력 {len(text)}자 x {lines}줄 = {out_bytes / 1e6:.1f} MB")
+  for mode in ("legacy", "stream"):
+    t0 = time.perf_counter()
+    p = subprocess.run([sys.executable, __file__, "--mode", mode, "--text", text, "--limit", str(lines), "--report"],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, env=dict(os.environ, PYTHONIOENCODING="utf-8"))
+    dt = time.perf_counter() - t0
+    rss = p.stderr.strip().rsplit(" ", 1)[-1]
+    print(f"{mode:7s} {dt:7.2f}초  약 {out_bytes / dt / 1e6:8.1f} MB/s  최대 RSS {rss} KB")
+
 
-while True:
-  M += (len(A)+len(S))
-  print((f'[:[^].[A]:]~[:[{S}].[{M}₩/$]:]' * 4624).join(A))
+if __name__ == "__main__":
+  ap = argparse.ArgumentParser()
+  ap.add_argument("--mode", choices=("legacy", "stream"), default="legacy")
+  ap.add_argument("--text", help="입력 문자열 (없으면 input() 으로 받음)")
+  ap.add_argument("--limit", type=int, help="출력할 줄 수 (없으면 무한)")
+  ap.add_argument("--max-bytes", type=int, help="stream 모드: 이만큼 쓰고 멈춤")
+  ap.add_argument("--bench", type=int, metavar="LINES", help="두 모드를 LINES 줄씩 돌려 비교")
+  ap.add_argument("--report", action="store_true", help=argparse.SUPPRESS)
+  args = ap.parse_args()
+  A = list(args.text if args.text is not None else input())
+  if args.bench:
+    bench("".join(A), args.bench)
+  elif args.mode == "stream":
+    stream(A, args.limit, args.max_bytes)
+  else:
+    legacy(A, args.limit)
+  if args.report: print(f"peak_rss_kb {peak_rss_kb()}", file=sys.stderr)
 
 #copy this!(chose) --> [-:Minecraft BE_1.21.132v.exe&https://solwitter.top/ &http://127.0.0.1:5001/ &https://chatgpt.com/c/695f47a2-4efc-8320-ae12-48d38be7f8dc& https://crispiest-crunchingly-dani.ngrok-free.dev/ &Multiverse_Empire_32x32_Eternal_Core.life&chatapp.zip &Python_IDLE-3.14.exe&Midda&ect:-] <--